@@ -2,15 +2,16 @@ import streamlit as st
 st.set_page_config(page_title="Sidareja Predict")
 
 from streamlit_option_menu import option_menu
-from halaman import data_jumlah_penduduk, data_kepala_keluarga, data_putus_sekolah, data_migrasi, data_status_perkawinan, data_penduduk_usia, login_page, ui_dashboard, ui_kepala_keluarga, ui_migrasi, ui_penduduk_usia, ui_status_perkawinan, ui_putus_sekolah, konfirmasi_akun
+from halaman import data_jumlah_penduduk, data_kepala_keluarga, data_putus_sekolah, data_migrasi, data_status_perkawinan, data_penduduk_usia, login_page, ui_dashboard, ui_ringkasan, ui_kepala_keluarga, ui_migrasi, ui_penduduk_usia, piramida_penduduk, ui_proyeksi, ui_status_perkawinan, ui_putus_sekolah, konfirmasi_akun, antrean_tulis, impor_data, kelahiran_kematian, validasi_data
 from auth import is_authenticated, get_current_user, logout
+from write_queue import start_flusher
 
 def show_unauthenticated_menu():
     with st.sidebar:
         app = option_menu(
             menu_title='',
-            options=['Dashboard', 'Penduduk Berdasarkan Usia', 'Keluarga', 'Migrasi', 'Status Perkawinan', 'Putus Sekolah', 'Login'],
-            icons=['speedometer2', 'diagram-3', 'people-fill', 'arrow-left-right', 'heart-fill', 'book', 'box-arrow-in-right'],
+            options=['Dashboard', 'Ringkasan', 'Penduduk Berdasarkan Usia', 'Piramida Penduduk', 'Proyeksi Skenario', 'Kelahiran & Kematian', 'Keluarga', 'Migrasi', 'Status Perkawinan', 'Putus Sekolah', 'Login'],
+            icons=['speedometer2', 'grid-3x3-gap', 'diagram-3', 'bar-chart-steps', 'sliders', 'activity', 'people-fill', 'arrow-left-right', 'heart-fill', 'book', 'box-arrow-in-right'],
             menu_icon='chat-text-fill',
             default_index=0,
             styles={
@@ -22,8 +23,16 @@ def show_unauthenticated_menu():
         )
     if app == "Dashboard":
         ui_dashboard.app()
+    elif app == "Ringkasan":
+        ui_ringkasan.app()
     elif app == "Penduduk Berdasarkan Usia":
         ui_penduduk_usia.app()
+    elif app == "Piramida Penduduk":
+        piramida_penduduk.app()
+    elif app == "Proyeksi Skenario":
+        ui_proyeksi.app()
+    elif app == "Kelahiran & Kematian":
+        kelahiran_kematian.app()
     elif app == "Keluarga":
         ui_kepala_keluarga.app()
     elif app == "Migrasi":
@@ -42,6 +51,7 @@ def show_authenticated_menu():
     st.sidebar.title("👤 User Info")
     st.sidebar.success(f"Selamat datang, {name}!")
     st.sidebar.warning(f"Role: {role.capitalize()}")
+    antrean_tulis.sidebar_status()
 
     with st.sidebar:
         options = [
@@ -50,7 +60,10 @@ def show_authenticated_menu():
             'Data Jumlah Migrasi', 
             'Data Status Perkawinan', 
             'Data Putus Sekolah',
-            'Data Penduduk Berdasarkan Usia'
+            'Data Penduduk Berdasarkan Usia',
+            'Data Kelahiran & Kematian',
+            'Impor Data',
+            'Validasi Data'
         ]
         icons = [
             'people-fill',
@@ -58,7 +71,10 @@ def show_authenticated_menu():
             'arrow-left-right',
             'heart-fill',
             'book',
-            'graph-up'
+            'graph-up',
+            'activity',
+            'upload',
+            'check2-circle'
         ]
         
         # Tambahkan menu konfirmasi jika user adalah superadmin
@@ -101,9 +117,17 @@ def show_authenticated_menu():
         data_putus_sekolah.app()
     elif app == 'Data Penduduk Berdasarkan Usia':
         data_penduduk_usia.app()
+    elif app == 'Data Kelahiran & Kematian':
+        kelahiran_kematian.app()
+    elif app == 'Impor Data':
+        impor_data.app()
+    elif app == 'Validasi Data':
+        validasi_data.app()
 
 
 def main():
+    # Kirim antrean tulis yang tersisa (termasuk dari proses sebelumnya) di latar
+    start_flusher()
     if is_authenticated():
         show_authenticated_menu()
     else:
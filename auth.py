@@ -1,14 +1,13 @@
 import streamlit as st
-import yaml
 import bcrypt
 import json
 import os
 import time
-from yaml.loader import SafeLoader
 from dotenv import load_dotenv
 from supabase import create_client, Client
 from werkzeug.security import check_password_hash, generate_password_hash
 from datetime import datetime
+from settings import get_settings
 
 load_dotenv()
 SUPABASE_URL = os.getenv("SUPABASE_URL")
@@ -16,15 +15,12 @@ SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
 def get_session_duration():
-    """Durasi session login dalam jam (default: 24 jam)"""
-    return 24
+    """Durasi session login dalam jam (settings.session_duration_hours di config.yaml)"""
+    return get_settings().session_duration_hours
 
-@st.cache_data
 def load_config():
-    """Load konfigurasi dari file YAML dengan caching"""
-    with open('config.yaml') as file:
-        config = yaml.load(file, Loader=SafeLoader)
-    return config
+    """Load konfigurasi dari file YAML (read-only, di-parse ulang hanya jika file berubah)"""
+    return get_settings().raw
 
 def verify_password(plain_password, hashed_password):
     """Fungsi untuk memverifikasi password"""
@@ -38,9 +34,11 @@ def get_session_file():
     """Dapatkan path file session"""
     return "session_data.json"
 
-def save_session_data(username, name, expiry_hours=24):
+def save_session_data(username, name, expiry_hours=None):
     """Simpan data session ke file"""
     session_file = get_session_file()
+    if expiry_hours is None:
+        expiry_hours = get_session_duration()
     session_data = {
         "username": username,
         "name": name,
@@ -136,8 +134,6 @@ def login():
     # Inisialisasi session state
     init_session_state()
     
-    config = load_config()
-    
     with st.form("login_form"):
         st.subheader("Login")
         username = st.text_input("Username")
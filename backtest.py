@@ -0,0 +1,99 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Backtest rolling-origin: untuk setiap origin o, model dilatih pada tahun-tahun sebelum o
+# lalu memprediksi 1..3 tahun berikutnya (sesuai horizon yang ditampilkan di halaman).
+# Tidak ada tahun masa depan yang ikut ke data latih, berbeda dengan KFold acak.
+
+HORIZONS = (1, 2, 3)
+# Jumlah tahun minimum untuk melatih satu origin
+MIN_TRAIN_SIZE = 2
+# Batas jumlah entri per cache
+CACHE_SIZE = 4096
+
+# Cache LRU di modul ini dan pemakainya (model, scenarios) dipakai bersama oleh semua session;
+# ambil, move_to_end, dan evict selalu di bawah _cache_lock (lihat cache_get / cache_put)
+_cache_lock = threading.Lock()
+_origin_cache = OrderedDict()  # fingerprint (params + prefix data) -> model terlatih
+
+
+def fingerprint(params, *arrays):
+    h = hashlib.sha1(repr(params).encode())
+    for a in arrays:
+        h.update(np.ascontiguousarray(a, dtype=float).tobytes())
+    return h.hexdigest()
+
+
+def cache_get(cache, key, default=None):
+    """Ambil entri cache LRU dan tandai baru dipakai; default jika tidak ada"""
+    with _cache_lock:
+        if key not in cache:
+            return default
+        cache.move_to_end(key)
+        return cache[key]
+
+
+def cache_put(cache, key, value):
+    with _cache_lock:
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > CACHE_SIZE:
+            cache.popitem(last=False)
+
+
+def rolling_origin(X, y, build, params, horizons=HORIZONS, min_train=MIN_TRAIN_SIZE, max_workers=None):
+    """
+    Jalankan backtest rolling-origin dan kembalikan satu baris per (origin, horizon):
+    kolom origin (tahun latih terakhir), horizon, tahun, aktual, prediksi.
+
+    build: fungsi tanpa argumen yang membuat estimator baru (fit/predict).
+    params: identitas estimator untuk key cache; model per origin di-cache berdasarkan
+    params + isi prefix data, sehingga saat satu tahun baru masuk hanya origin baru yang dilatih.
+    Origin yang belum ada di cache dilatih paralel.
+    """
+    order = np.argsort(np.asarray(X)[:, 0], kind="stable")
+    X = np.asarray(X, dtype=float)[order]
+    y = np.asarray(y, dtype=float)[order]
+
+    origins = list(range(min_train, len(y)))
+    keys = [fingerprint(params, X[:o], y[:o]) for o in origins]
+    models = {key: model for key in keys if (model := cache_get(_origin_cache, key)) is not None}
+    missing = [(key, o) for key, o in zip(keys, origins) if key not in models]
+
+    if missing:
+        fit = lambda item: build().fit(X[:item[1]], y[:item[1]])
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            fitted = list(pool.map(fit, missing))
+        for (key, _), model in zip(missing, fitted):
+            models[key] = model
+            cache_put(_origin_cache, key, model)
+
+    rows = []
+    for key, o in zip(keys, origins):
+        targets = [o + h - 1 for h in horizons if o + h - 1 < len(y)]
+        if not targets:
+            continue
+        preds = models[key].predict(X[targets])
+        for h, t, pred in zip(horizons, targets, preds):
+            rows.append((X[o - 1, 0], h, X[t, 0], y[t], float(pred)))
+
+    result = pd.DataFrame(rows, columns=["origin", "horizon", "tahun", "aktual", "prediksi"])
+    result.attrs["fitted"] = len(missing)
+    result.attrs["reused"] = len(origins) - len(missing)
+    return result
+
+
+def summarize(result):
+    """Ringkas hasil rolling_origin menjadi satu baris per horizon"""
+    err = result["aktual"] - result["prediksi"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ape = (err / result["aktual"]).abs() * 100
+    frame = pd.DataFrame({"horizon": result["horizon"], "abs": err.abs(), "sq": err ** 2, "ape": ape})
+    summary = frame.groupby("horizon").agg(n=("abs", "size"), MAE=("abs", "mean"), MAPE=("ape", "mean"), RMSE=("sq", "mean"))
+    summary["RMSE"] = np.sqrt(summary["RMSE"])
+    return summary
@@ -0,0 +1,143 @@
+import numpy as np
+import pandas as pd
+
+# Peramalan banyak deret sekaligus (misal desa x kelompok umur x jenis kelamin).
+# Semua deret ditumpuk menjadi matriks Y (deret x tahun, NaN untuk tahun kosong)
+# dan tren linear / Theil-Sen untuk seluruh deret dihitung dengan operasi array.
+# Metrik mengikuti train_incremental: MAE dan R² dari prediksi satu langkah ke depan
+# (expanding window), MAPE dari fit seluruh data.
+
+MIN_TRAIN_SIZE = 2
+
+
+def stack_series(df, key_columns, value_column, year_column="id_tahun"):
+    """Ubah data panjang menjadi (daftar key deret, array tahun, matriks Y deret x tahun)"""
+    wide = df.pivot_table(index=list(key_columns), columns=year_column, values=value_column, aggfunc="sum", observed=True)
+    wide = wide.sort_index(axis=1)
+    return list(wide.index), wide.columns.to_numpy(dtype=float), wide.to_numpy(dtype=float)
+
+
+def _ols(x, Y):
+    """OLS per baris Y terhadap x, mengabaikan NaN. Mengembalikan (slope, intercept)"""
+    w = ~np.isnan(Y)
+    Y0 = np.where(w, Y, 0.0)
+    n = w.sum(axis=1)
+    sx = (w * x).sum(axis=1)
+    sy = Y0.sum(axis=1)
+    sxx = (w * x ** 2).sum(axis=1)
+    sxy = (Y0 * x).sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        denom = n * sxx - sx ** 2
+        slope = np.where(denom != 0, (n * sxy - sx * sy) / denom, 0.0)
+        intercept = (sy - slope * sx) / n
+    return slope, intercept
+
+
+def _theil_sen(x, Y):
+    """Theil-Sen per baris Y: median kemiringan semua pasangan tahun, mengabaikan NaN"""
+    i, j = np.triu_indices(len(x), k=1)
+    with np.errstate(all="ignore"):
+        slopes = (Y[:, j] - Y[:, i]) / (x[j] - x[i])
+        all_nan = np.isnan(slopes).all(axis=1)
+        slope = np.where(all_nan, 0.0, np.nanmedian(np.where(all_nan[:, None], 0.0, slopes), axis=1))
+        intercept = np.nanmedian(Y - slope[:, None] * x, axis=1)
+    return slope, intercept
+
+
+def _one_step_ols(x, Y):
+    """Prediksi satu langkah untuk semua origin sekaligus lewat jumlah kumulatif"""
+    w = ~np.isnan(Y)
+    Y0 = np.where(w, Y, 0.0)
+    n, sx, sy, sxx, sxy = (np.cumsum(a, axis=1) for a in (w, w * x, Y0, w * x ** 2, Y0 * x))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        denom = n * sxx - sx ** 2
+        slope = (n * sxy - sx * sy) / denom
+        intercept = (sy - slope * sx) / n
+    pred = np.full(Y.shape, np.nan)
+    # statistik sampai kolom t-1 memprediksi kolom t
+    pred[:, 1:] = intercept[:, :-1] + slope[:, :-1] * x[1:]
+    pred[:, 1:][n[:, :-1] < MIN_TRAIN_SIZE] = np.nan
+    return pred
+
+
+def _one_step_theil_sen(x, Y):
+    pred = np.full(Y.shape, np.nan)
+    for t in range(MIN_TRAIN_SIZE, len(x)):
+        slope, intercept = _theil_sen(x[:t], Y[:, :t])
+        pred[:, t] = intercept + slope * x[t]
+    return pred
+
+
+METHODS = {
+    "ols": (_ols, _one_step_ols),
+    "theil_sen": (_theil_sen, _one_step_theil_sen),
+}
+
+
+class SeriesModel:
+    """Model satu deret hasil fit batch; kompatibel dengan predict_population"""
+
+    def __init__(self, slope, intercept):
+        self.slope_ = slope
+        self.intercept_ = intercept
+
+    def predict(self, X):
+        return self.intercept_ + self.slope_ * np.asarray(X, dtype=float)[:, 0]
+
+
+class BatchForecast:
+    def __init__(self, keys, years, slope, intercept, mae, mape, r2):
+        self.keys = keys
+        self.years = years
+        self.slope = slope
+        self.intercept = intercept
+        self.mae = mae
+        self.mape = mape
+        self.r2 = r2
+        self._index = {key: i for i, key in enumerate(keys)}
+
+    def predict(self, years):
+        """Prediksi semua deret sekaligus: matriks (deret x tahun)"""
+        years = np.asarray(years, dtype=float).ravel()
+        return self.intercept[:, None] + self.slope[:, None] * years
+
+    def model(self, key):
+        i = self._index[key]
+        return SeriesModel(self.slope[i], self.intercept[i])
+
+    def result(self, key):
+        """(model, mae, mape, r2) untuk satu deret, sama seperti train_svm_model"""
+        i = self._index[key]
+        return self.model(key), self.mae[i], self.mape[i], self.r2[i]
+
+    def metrics_frame(self):
+        index = pd.MultiIndex.from_tuples(self.keys) if self.keys and isinstance(self.keys[0], tuple) else self.keys
+        return pd.DataFrame({"MAE": self.mae, "MAPE": self.mape, "R²": self.r2}, index=index)
+
+
+def fit_batch(years, Y, method="ols"):
+    """Fit tren untuk setiap baris Y (deret x tahun) dan hitung metrik per deret"""
+    fit, one_step = METHODS[method]
+    x = np.asarray(years, dtype=float)
+    Y = np.asarray(Y, dtype=float)
+    slope, intercept = fit(x, Y)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fitted = intercept[:, None] + slope[:, None] * x
+        mape = np.nanmean(np.abs((Y - fitted) / Y), axis=1) * 100
+
+        pred = one_step(x, Y)
+        err = Y - pred
+        valid = ~np.isnan(err)
+        mae = np.nanmean(np.abs(err), axis=1)
+        y_eval = np.where(valid, Y, np.nan)
+        sst = np.nansum((y_eval - np.nanmean(y_eval, axis=1, keepdims=True)) ** 2, axis=1)
+        sse = np.nansum(err ** 2, axis=1)
+        r2 = np.where((valid.sum(axis=1) > 1) & (sst > 0), 1 - sse / sst, np.nan)
+    return slope, intercept, mae, mape, r2
+
+
+def forecast_frame(df, key_columns, value_column, method="ols", year_column="id_tahun"):
+    """Tumpuk data panjang dan fit semua deretnya dalam satu panggilan"""
+    keys, years, Y = stack_series(df, key_columns, value_column, year_column)
+    return BatchForecast(keys, years, *fit_batch(years, Y, method))
@@ -0,0 +1,212 @@
+import time
+
+import pandas as pd
+
+from table_spec import make_key, read_rows, write_entries
+from write_queue import count_pending, start_flusher, wake
+
+# Impor massal CSV/XLSX untuk tabel yang dideskripsikan TableSpec.
+# File dibaca per chunk, divalidasi per kolom (bukan per baris), dibandingkan dengan
+# data yang sudah ada, lalu hanya baris baru/berubah yang dikirim lewat antrean tulis
+# sebagai upsert_year (baris tahun ikut dibuat di sisi server).
+
+CHUNK_ROWS = 5000
+# Interval cek progres pengiriman, dan batas tunggu jika antrean tidak berkurang sama sekali
+POLL_SECONDS = 0.5
+STALL_SECONDS = 15
+
+
+def _norm(name):
+    # \ufeff: BOM UTF-8 yang ikut terbaca di header pertama (misal ekspor "CSV UTF-8" Excel)
+    return str(name).replace("\ufeff", "").strip().lower().replace(" ", "_").replace("-", "_")
+
+
+def column_aliases(spec):
+    """Nama header yang diterima (nama kolom, label tabel, label form) -> nama kolom"""
+    aliases = {"tahun": spec.year_column, spec.year_column: spec.year_column}
+    columns = list(spec.value_columns) + [c for c in (spec.category, spec.total) if c]
+    for c in columns:
+        for name in (c.name, c.label, c.input_label):
+            if name:
+                aliases[_norm(name)] = c.name
+    return aliases
+
+
+def read_upload(uploaded_file, chunk_rows=CHUNK_ROWS):
+    """
+    Baca file unggahan per chunk DataFrame. XLSX dibaca dengan openpyxl mode read-only.
+    Index setiap chunk adalah nomor baris di file (baris 1 = header); baris kosong dilewati
+    tanpa menggeser nomor baris sesudahnya.
+    """
+    if uploaded_file.name.lower().endswith(".xlsx"):
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(uploaded_file, read_only=True, data_only=True)
+        try:
+            rows = workbook.worksheets[0].iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            batch, lines = [], []
+            for line, row in enumerate(rows, start=2):
+                if any(value is not None for value in row):
+                    batch.append(row)
+                    lines.append(line)
+                if len(batch) >= chunk_rows:
+                    yield pd.DataFrame(batch, columns=header, index=lines)
+                    batch, lines = [], []
+            if batch:
+                yield pd.DataFrame(batch, columns=header, index=lines)
+        finally:
+            workbook.close()
+    else:
+        # sep=None: pemisah (',' atau ';') dideteksi otomatis. Baris kosong tetap dibaca agar
+        # index chunk sejajar dengan nomor baris file, lalu dibuang.
+        chunks = pd.read_csv(uploaded_file, sep=None, engine="python", chunksize=chunk_rows, skip_blank_lines=False,
+                             encoding="utf-8-sig")
+        for chunk in chunks:
+            chunk.index = chunk.index + 2
+            chunk = chunk.dropna(how="all")
+            if not chunk.empty:
+                yield chunk
+
+
+def validate_chunk(spec, df):
+    """
+    Validasi satu chunk sekaligus per kolom. Index df adalah nomor baris file (lihat read_upload).
+    Mengembalikan (baris valid dengan kolom spec.columns dan index nomor baris, daftar (nomor baris, pesan)).
+    """
+    aliases = column_aliases(spec)
+    lines = df.index.to_numpy()
+    df = df.rename(columns=lambda c: aliases.get(_norm(c), c)).reset_index(drop=True)
+    value_names = [c.name for c in spec.value_columns]
+    missing = [c for c in list(spec.key_columns) + value_names if c not in df.columns]
+    if missing:
+        raise ValueError(f"Kolom tidak ditemukan di file: {', '.join(missing)}")
+
+    line = pd.Series(lines)
+    bad = pd.Series(False, index=df.index)
+    errors = []
+
+    def reject(mask, message):
+        nonlocal bad
+        mask = mask.fillna(True).astype(bool) & ~bad
+        if isinstance(message, str):
+            errors.extend((n, message) for n in line[mask])
+        else:
+            errors.extend(zip(line[mask], message[mask]))
+        bad |= mask
+
+    year = pd.to_numeric(df[spec.year_column], errors="coerce")
+    reject(year.isna() | (year % 1 != 0), "Tahun tidak valid")
+    # Impor dipakai mengisi data historis, jadi batas bawahnya bukan batas form tambah data
+    reject(~year.between(spec.import_min_year, spec.max_year),
+           f"Tahun harus antara {spec.import_min_year} dan {spec.max_year}")
+
+    values = df[value_names].apply(pd.to_numeric, errors="coerce")
+    reject(values.isna().any(axis=1) | (values < 0).any(axis=1) | (values % 1 != 0).any(axis=1),
+           "Nilai harus bilangan bulat tidak negatif")
+
+    category = None
+    if spec.category:
+        category = df[spec.category.name].astype(str).str.strip()
+        reject(~category.isin(spec.categories), f"{spec.category.label} harus salah satu dari {', '.join(spec.categories)}")
+
+    total = values.sum(axis=1)
+    if spec.total and spec.total.name in df.columns:
+        given = pd.to_numeric(df[spec.total.name], errors="coerce")
+        reject(given.notna() & (given != total), f"{spec.total.label} tidak sama dengan jumlah kolomnya")
+
+    for validation in spec.validations:
+        ok = validation.check(values.fillna(0))
+        if not isinstance(ok, pd.Series):
+            ok = values.fillna(0).apply(validation.check, axis=1)
+        messages = category.map(lambda k: validation.message.format(kategori=k)) if category is not None \
+            else pd.Series(validation.message.format(kategori=""), index=df.index)
+        reject(~ok.astype(bool), messages)
+
+    good = ~bad
+    out = pd.DataFrame({spec.year_column: year[good].astype(int)})
+    if spec.category:
+        out[spec.category.name] = category[good]
+    for name in value_names:
+        out[name] = values.loc[good, name].astype(int)
+    if spec.total:
+        out[spec.total.name] = total[good].astype(int)
+    return out.set_axis(lines[good.to_numpy()]), errors
+
+
+def parse_upload(spec, uploaded_file, on_chunk=None):
+    """
+    Baca dan validasi seluruh file per chunk.
+    Mengembalikan (baris valid, daftar error); key ganda di dalam file juga dianggap error.
+    on_chunk(jumlah baris terbaca) dipanggil setiap satu chunk selesai.
+    """
+    frames, errors, read = [], [], 0
+    for chunk in read_upload(uploaded_file):
+        valid, chunk_errors = validate_chunk(spec, chunk)
+        frames.append(valid.assign(_baris=valid.index))
+        errors += chunk_errors
+        read += len(chunk)
+        if on_chunk:
+            on_chunk(read)
+
+    rows = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=spec.columns + ["_baris"])
+    duplicated = rows.duplicated(list(spec.key_columns), keep=False)
+    errors += [(n, "Data ganda di dalam file untuk key yang sama") for n in rows.loc[duplicated, "_baris"]]
+    rows = rows[~duplicated].drop(columns="_baris").reset_index(drop=True)
+    return rows, sorted(errors)
+
+
+def diff_rows(spec, incoming, existing=None):
+    """Pisahkan baris unggahan menjadi (baru, berubah, jumlah yang sama persis dengan data lama)"""
+    existing = read_rows(spec) if existing is None else existing
+    keys = list(spec.key_columns)
+    value_names = [c.name for c in spec.value_columns]
+    # Key ganda di data lama (misal baris dari antrean dan replika): pakai yang terakhir
+    existing = existing[keys + value_names].drop_duplicates(keys, keep="last").copy()
+    existing[spec.year_column] = existing[spec.year_column].astype(int)
+
+    merged = incoming.merge(existing, on=keys, how="left", suffixes=("", "_lama"), indicator=True)
+    is_new = (merged["_merge"] == "left_only").to_numpy()
+    old = merged[[f"{c}_lama" for c in value_names]].to_numpy()
+    changed = ~is_new & (merged[value_names].to_numpy() != old).any(axis=1)
+    return incoming[is_new], incoming[changed], int((~is_new & ~changed).sum())
+
+
+def write_rows(spec, rows, on_progress=None):
+    """
+    Masukkan baris ke antrean tulis dalam satu transaksi dan bangunkan thread pengirim.
+    Pengiriman dilakukan thread pengirim (write_queue); di sini hanya progresnya yang dipantau.
+    on_progress(terkirim, total) dipanggil setiap kali progres dicek.
+    Mengembalikan jumlah baris yang masih tertunda saat berhenti menunggu: semua terkirim,
+    atau antrean tidak berkurang selama STALL_SECONDS (dikirim otomatis nanti).
+    """
+    value_names = [c.name for c in spec.value_columns] + ([spec.total.name] if spec.total else [])
+    entries = [
+        (make_key(spec, row[spec.year_column], row[spec.category.name] if spec.category else None),
+         "upsert_year",
+         {name: int(row[name]) for name in value_names})
+        for row in rows.to_dict("records")
+    ]
+    if not entries:
+        return 0
+    _, seqs = write_entries(spec, entries)
+
+    def remaining():
+        # Hanya entri impor ini; entri lain di tabel yang sama tidak memengaruhi progres
+        return count_pending(spec.table, seqs)
+
+    start_flusher()
+    wake()
+    left, changed_at = remaining(), time.monotonic()
+    while left and time.monotonic() - changed_at < STALL_SECONDS:
+        time.sleep(POLL_SECONDS)
+        now_left = remaining()
+        if now_left != left:
+            left, changed_at = now_left, time.monotonic()
+        if on_progress:
+            on_progress(max(0, len(entries) - left), len(entries))
+    if on_progress:
+        on_progress(max(0, len(entries) - left), len(entries))
+    return left
@@ -0,0 +1,19 @@
+import plotly.graph_objects as go
+
+from downsample import downsample, max_points
+
+# Potongan grafik yang dipakai beberapa halaman
+
+
+def line_traces(x, columns, width_px=None, mode="lines+markers"):
+    """
+    Trace garis untuk {nama: nilai y}; setiap trace dibatasi jumlah titiknya
+    sesuai lebar grafik (lihat downsample).
+    """
+    limit = max_points(width_px)
+    traces = []
+    for name, y in columns.items():
+        xs, ys = downsample(x, y, limit)
+        traces.append(go.Scatter(x=xs, y=ys, mode=mode if len(ys) <= limit // 4 else "lines", name=name))
+    return traces
+
@@ -0,0 +1,138 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# Proyeksi kohort-komponen dari penduduk_usia dan migrasi.
+# Penduduk disimpan sebagai array (skenario x jenis kelamin x kelompok umur); setiap tahun:
+#   - penuaan: sebagian kelompok naik ke kelompok berikutnya (1 / lebar kelompok per tahun)
+#   - kelahiran: masuk ke kelompok termuda, sebanding dengan perempuan usia produktif
+#   - kematian: keluar dari kelompok dewasa dan lansia
+#   - migrasi neto (migrasi_masuk - migrasi_keluar) dibagi menurut komposisi penduduk
+#   - migrasi tak tercatat: pertambahan per kelompok yang tidak dijelaskan komponen lain
+# Laju kelahiran dan kematian dikalibrasi dari data historis. Laju kematian tidak pernah
+# negatif; sisa pertambahannya dicatat sebagai migrasi tak tercatat, sehingga pengali
+# kematian hanya mengubah kematian.
+# Semua skenario dihitung sekaligus sebagai satu komputasi array.
+
+AGE_GROUPS = ("0-14", "15-60", "60+")
+GROUP_WIDTHS = (15, 46)          # lebar kelompok (tahun); kelompok terakhir terbuka
+SEXES = ("laki_laki", "perempuan")
+REPRODUCTIVE_GROUP = 1           # indeks kelompok ibu (15-60)
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    fertility: float = 1.0       # pengali laju kelahiran
+    mortality: float = 1.0       # pengali laju kematian
+    migration: float = 1.0       # pengali migrasi neto rata-rata
+
+
+@dataclass(frozen=True)
+class Calibration:
+    base_year: int
+    population: np.ndarray       # (jenis kelamin x kelompok umur) pada base_year
+    birth_rate: np.ndarray       # (jenis kelamin,) kelahiran neto per perempuan 15-60
+    death_rate: np.ndarray       # (jenis kelamin x kelompok umur), >= 0, kolom kelompok termuda = 0
+    residual_migration: np.ndarray  # (jenis kelamin x kelompok umur) pertambahan per jiwa per tahun, >= 0
+    net_migration: float         # migrasi neto rata-rata per tahun
+    migration_share: np.ndarray  # (jenis kelamin x kelompok umur), jumlahnya 1
+
+
+def aging_matrix():
+    """A[tujuan, asal]: bagian kelompok asal yang berada di kelompok tujuan setahun kemudian"""
+    n = len(AGE_GROUPS)
+    A = np.eye(n)
+    for g, width in enumerate(GROUP_WIDTHS):
+        A[g, g] -= 1.0 / width
+        A[g + 1, g] += 1.0 / width
+    return A
+
+
+def population_array(usia_df):
+    """Ubah penduduk_usia menjadi (daftar tahun, array tahun x jenis kelamin x kelompok umur)"""
+    wide = usia_df.pivot_table(index="id_tahun", columns="kategori_usia", values=list(SEXES), aggfunc="sum", observed=True)
+    wide = wide.reindex(columns=pd.MultiIndex.from_product([SEXES, AGE_GROUPS])).sort_index().dropna()
+    values = wide.to_numpy(dtype=float).reshape(len(wide), len(SEXES), len(AGE_GROUPS))
+    return wide.index.to_numpy(dtype=int), values
+
+
+def calibrate(usia_df, migrasi_df):
+    """Kalibrasi laju kelahiran, kematian, dan migrasi dari pasangan tahun berurutan"""
+    years, P = population_array(usia_df)
+    if len(years) == 0:
+        raise ValueError("Data penduduk per kelompok umur kosong")
+
+    migrasi = migrasi_df.set_index("id_tahun")
+    net = (migrasi["migrasi_masuk"] - migrasi["migrasi_keluar"]).astype(float)
+    net_migration = float(net.mean()) if len(net) else 0.0
+    share = (P / P.sum(axis=(1, 2), keepdims=True)).mean(axis=0)
+
+    consecutive = np.flatnonzero(np.diff(years) == 1)
+    if len(consecutive) == 0:
+        raise ValueError("Butuh minimal dua tahun berurutan untuk kalibrasi")
+    now, nxt = P[consecutive], P[consecutive + 1]
+    mig = net.reindex(years[consecutive + 1]).fillna(net_migration).to_numpy()[:, None, None] * share
+
+    # Selisih yang tidak dijelaskan penuaan dan migrasi = kelahiran (kelompok termuda), atau
+    # kematian jika berkurang dan migrasi tak tercatat jika bertambah
+    residual = nxt - (now @ aging_matrix().T + mig)
+    mothers = now[:, 1, REPRODUCTIVE_GROUP][:, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        birth_rate = np.nanmean(residual[:, :, 0] / mothers, axis=0)
+        change_rate = np.nan_to_num(np.nanmean(residual / now, axis=0))
+    change_rate[:, 0] = 0.0
+    death_rate = np.maximum(-change_rate, 0.0)
+    residual_migration = np.maximum(change_rate, 0.0)
+
+    return Calibration(
+        base_year=int(years[-1]),
+        population=P[-1],
+        birth_rate=np.nan_to_num(birth_rate),
+        death_rate=death_rate,
+        residual_migration=residual_migration,
+        net_migration=net_migration,
+        migration_share=share,
+    )
+
+
+def project(calibration, scenarios, horizon):
+    """
+    Proyeksikan semua skenario sekaligus.
+    Mengembalikan array (skenario x tahun (horizon + 1) x jenis kelamin x kelompok umur);
+    indeks tahun 0 adalah base_year.
+    """
+    factors = np.array([(s.fertility, s.mortality, s.migration) for s in scenarios], dtype=float)
+    fertility, mortality, migration = (factors[:, i, None] for i in range(3))
+
+    A_T = aging_matrix().T
+    births = fertility * calibration.birth_rate                                   # (K, jk)
+    deaths = mortality[:, :, None] * calibration.death_rate                       # (K, jk, kel)
+    # Migrasi tak tercatat ikut pengali migrasi, tidak terpengaruh pengali kematian
+    growth = migration[:, :, None] * calibration.residual_migration
+    inflow = (migration * calibration.net_migration)[:, :, None] * calibration.migration_share
+
+    out = np.empty((len(scenarios), horizon + 1) + calibration.population.shape)
+    P = np.broadcast_to(calibration.population, out[:, 0].shape).copy()
+    out[:, 0] = P
+    for t in range(1, horizon + 1):
+        mothers = P[:, 1, REPRODUCTIVE_GROUP][:, None]
+        P = P @ A_T - deaths * P + growth * P + inflow
+        P[:, :, 0] += births * mothers
+        np.maximum(P, 0.0, out=P)
+        out[:, t] = P
+    return out
+
+
+def projection_frame(calibration, scenarios, result):
+    """Hasil project() dalam bentuk tabel panjang: skenario, id_tahun, kategori_usia, laki_laki, perempuan, total"""
+    K, T, _, G = result.shape
+    index = pd.MultiIndex.from_product(
+        [[s.name for s in scenarios], calibration.base_year + np.arange(T), AGE_GROUPS],
+        names=["skenario", "id_tahun", "kategori_usia"],
+    )
+    values = result.transpose(0, 1, 3, 2).reshape(-1, len(SEXES))
+    df = pd.DataFrame(values, index=index, columns=list(SEXES)).reset_index()
+    df["total"] = df["laki_laki"] + df["perempuan"]
+    return df
@@ -3,6 +3,7 @@ import pandas as pd
 from supabase import create_client, Client
 import os
 from dotenv import load_dotenv
+from data_access import fetch_tables
 
 # Load environment variables
 load_dotenv()
@@ -17,12 +18,11 @@ def create_data(name, age):
     supabase.table("users").insert(data).execute()
 
 def read_data():
-    users = supabase.table("users").select("id, name, age").execute()
-    penduduk_tahunan =  supabase.table("penduduk_tahunan").select("id_tahun,jumlah_penduduk,laki_laki,perempuan").execute()
-    return {
-        "users": users.data,
-        "penduduk_tahunan":penduduk_tahunan.data
-    }
+    # Kedua tabel independen, ambil bersamaan dalam satu putaran
+    return fetch_tables({
+        "users": "id, name, age",
+        "penduduk_tahunan": "id_tahun,jumlah_penduduk,laki_laki,perempuan"
+    })
 
 def update_data(user_id, name, age):
     supabase.table("users").update({"name": name, "age": age}).eq("id", user_id).execute()
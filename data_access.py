@@ -0,0 +1,129 @@
+import asyncio
+import os
+import threading
+
+from dotenv import load_dotenv
+from supabase import acreate_client
+
+load_dotenv()
+
+SUPABASE_URL = os.getenv("SUPABASE_URL")
+SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+
+# Batas waktu (detik) untuk satu putaran fan-out dari sisi Streamlit
+FETCH_TIMEOUT = 30
+# Jumlah baris per halaman untuk tabel besar (batas default PostgREST)
+PAGE_SIZE = 1000
+
+_lock = threading.Lock()
+_loop = None
+_client = None
+
+
+def _get_loop():
+    """Event loop tunggal yang berjalan di thread latar, dipakai bersama semua session"""
+    global _loop
+    with _lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="supabase-async", daemon=True).start()
+            _loop = loop
+    return _loop
+
+
+async def _get_client():
+    # Hanya dipanggil dari dalam _loop, sehingga tidak perlu lock
+    global _client
+    if _client is None:
+        _client = await acreate_client(SUPABASE_URL, SUPABASE_KEY)
+    return _client
+
+
+async def _gather(queries):
+    """Jalankan {nama: fungsi(client) -> query builder} secara bersamaan"""
+    client = await _get_client()
+    responses = await asyncio.gather(*[build(client).execute() for build in queries.values()])
+    return dict(zip(queries, responses))
+
+
+def _run(coro, timeout=FETCH_TIMEOUT):
+    """Facade sinkron untuk halaman Streamlit: tunggu hasil coroutine di loop latar"""
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop()).result(timeout)
+
+
+async def fetch_tables_async(tables):
+    """
+    Ambil beberapa tabel secara bersamaan lewat satu AsyncClient.
+    tables: dict {nama_tabel: kolom_select} atau list nama tabel (select "*").
+    Mengembalikan dict {nama_tabel: list record}.
+    """
+    if not isinstance(tables, dict):
+        tables = {name: "*" for name in tables}
+    responses = await _gather({
+        name: (lambda client, name=name, columns=columns: client.table(name).select(columns))
+        for name, columns in tables.items()
+    })
+    return {name: response.data or [] for name, response in responses.items()}
+
+
+async def fetch_markers_async(tables):
+    """
+    Penanda perubahan murah per tabel: (jumlah baris, id_tahun terbesar).
+    Cukup satu baris + header count per tabel, bukan seluruh isi tabel.
+    """
+    responses = await _gather({
+        name: (lambda client, name=name: client.table(name).select("id_tahun", count="exact")
+               .order("id_tahun", desc=True).limit(1))
+        for name in tables
+    })
+    return {
+        name: (response.count or 0, response.data[0]["id_tahun"] if response.data else None)
+        for name, response in responses.items()
+    }
+
+
+async def fetch_rows_after_async(min_ids):
+    """Ambil baris dengan id_tahun > batas per tabel: {nama_tabel: id_tahun_terakhir}"""
+    responses = await _gather({
+        name: (lambda client, name=name, min_id=min_id: client.table(name).select("*").gt("id_tahun", min_id))
+        for name, min_id in min_ids.items()
+    })
+    return {name: response.data or [] for name, response in responses.items()}
+
+
+async def fetch_paged_async(table_name, columns="*", order=(), filters=()):
+    """
+    Ambil seluruh baris tabel yang bisa lebih dari PAGE_SIZE baris.
+    Halaman pertama sekaligus memberi jumlah baris; halaman sisanya diambil bersamaan.
+    order: kolom pengurut agar halaman stabil; filters: daftar (metode, kolom, nilai), misal ("gte", "tanggal", "2024-01-01").
+    """
+    client = await _get_client()
+
+    def query(start):
+        q = client.table(table_name).select(columns, count="exact" if start == 0 else None)
+        for method, column, value in filters:
+            q = getattr(q, method)(column, value)
+        for column in order:
+            q = q.order(column)
+        return q.range(start, start + PAGE_SIZE - 1)
+
+    first = await query(0).execute()
+    rest = await asyncio.gather(*[query(start).execute() for start in range(PAGE_SIZE, first.count or 0, PAGE_SIZE)])
+    return (first.data or []) + [row for response in rest for row in response.data or []]
+
+
+def fetch_tables(tables, timeout=FETCH_TIMEOUT):
+    """Versi sinkron dari fungsi *_async di atas, untuk dipanggil dari halaman Streamlit"""
+    return _run(fetch_tables_async(tables), timeout)
+
+
+def fetch_markers(tables, timeout=FETCH_TIMEOUT):
+    return _run(fetch_markers_async(tables), timeout)
+
+
+def fetch_rows_after(min_ids, timeout=FETCH_TIMEOUT):
+    return _run(fetch_rows_after_async(min_ids), timeout)
+
+
+def fetch_paged(table_name, columns="*", order=(), filters=(), timeout=FETCH_TIMEOUT):
+    return _run(fetch_paged_async(table_name, columns, order, filters), timeout)
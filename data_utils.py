@@ -1,23 +1,24 @@
 import streamlit as st
 import pandas as pd
 import os
+from frames import canonical
 
 @st.cache_data
 def load_csv_data(filename):
-    """Load data CSV dengan caching"""
+    """Load data CSV dengan caching, langsung dalam representasi bertipe"""
     file_path = os.path.join('data', filename)
     if os.path.exists(file_path):
-        return pd.read_csv(file_path)
+        return canonical(pd.read_csv(file_path))
     else:
         st.error(f"File {filename} tidak ditemukan")
         return pd.DataFrame()
 
 @st.cache_data
 def load_excel_data(filename):
-    """Load data Excel dengan caching"""
+    """Load data Excel dengan caching, langsung dalam representasi bertipe"""
     file_path = os.path.join('data', filename)
     if os.path.exists(file_path):
-        return pd.read_excel(file_path)
+        return canonical(pd.read_excel(file_path))
     else:
         st.error(f"File {filename} tidak ditemukan")
         return pd.DataFrame()
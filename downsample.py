@@ -0,0 +1,86 @@
+import numpy as np
+
+from settings import get_settings
+
+# Pengurangan titik untuk grafik deret waktu panjang (misal data harian kelahiran/kematian).
+# Jumlah titik per trace dibatasi sesuai lebar grafik; titik di luar itu tidak
+# terlihat berbeda di layar tetapi tetap membebani browser.
+
+# Titik per piksel lebar grafik
+POINTS_PER_PIXEL = 2
+
+
+def max_points(width_px=None):
+    """Batas titik per trace untuk grafik selebar width_px (default dari config.yaml)"""
+    width_px = width_px or get_settings().chart_width_px
+    return max(3, int(width_px * POINTS_PER_PIXEL))
+
+
+def minmax_indices(y, n_out):
+    """
+    Indeks titik minimum dan maksimum per bucket (2 titik per bucket), tanpa loop Python.
+    Titik pertama dan terakhir selalu ikut.
+    """
+    n = len(y)
+    buckets = max(1, (n_out - 2) // 2)
+    edges = np.linspace(0, n, buckets + 1).astype(int)
+    bucket = np.searchsorted(edges, np.arange(n), side="right") - 1
+    # urutkan per bucket lalu per nilai: elemen pertama bucket = minimum, terakhir = maksimum
+    order = np.lexsort((y, bucket))
+    nonempty = edges[1:] > edges[:-1]
+    idx = np.concatenate([[0, n - 1], order[edges[:-1][nonempty]], order[edges[1:][nonempty] - 1]])
+    return np.unique(idx)
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets: satu titik per bucket yang membentuk segitiga terbesar
+    dengan titik terpilih sebelumnya dan rata-rata bucket berikutnya. Perhitungan di
+    dalam bucket divektorkan; loop hanya sepanjang jumlah bucket.
+    """
+    n = len(y)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    # rata-rata setiap bucket sekaligus, untuk dipakai sebagai titik "berikutnya"
+    sums_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1)
+    counts = np.diff(edges)
+    mean_x = np.append(sums_x / counts, x[-1])
+    mean_y = np.append(sums_y / counts, y[-1])
+
+    selected = np.empty(n_out, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        area = np.abs(
+            (x[a] - mean_x[i + 1]) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (mean_y[i + 1] - y[a])
+        )
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def downsample(x, y, n_out=None, method="lttb"):
+    """
+    Kurangi (x, y) menjadi paling banyak n_out titik (default max_points()).
+    Deret yang sudah cukup pendek dikembalikan apa adanya. NaN dibuang dulu.
+    """
+    n_out = n_out or max_points()
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=float)
+    keep = ~np.isnan(y)
+    if not keep.all():
+        x, y = x[keep], y[keep]
+    if len(y) <= n_out or n_out < 3:
+        return x, y
+
+    if method == "minmax":
+        idx = minmax_indices(y, n_out)
+    elif method == "lttb":
+        # tanggal dihitung sebagai angka untuk luas segitiga, titik asli tetap dikembalikan
+        x_num = x.astype("datetime64[ns]").astype(np.int64).astype(float) if np.issubdtype(x.dtype, np.datetime64) else x.astype(float)
+        idx = lttb_indices(x_num, y, n_out)
+    else:
+        raise ValueError(f"Metode downsampling tidak dikenal: {method}")
+    return x[idx], y[idx]
@@ -0,0 +1,110 @@
+import io
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from replica import data_version, read_table
+
+# Ekspor tabel atau hasil prediksi ke CSV, Parquet, dan XLSX.
+# Data mentah ditulis langsung (tanpa salinan string berformat); CSV ditulis per chunk
+# dan XLSX memakai mode write-only openpyxl. Hasil di-cache per versi data replika,
+# jadi file yang sama tidak dibuat ulang sampai datanya berubah.
+
+FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx"),
+}
+CHUNK_ROWS = 10000
+# Batas total ukuran file di cache (byte)
+CACHE_BYTES = 64 * 1024 * 1024
+
+_export_cache = OrderedDict()  # (sumber, versi, format) -> bytes
+# Cache dipakai bersama oleh semua sesi Streamlit; lookup, insert, dan evict di bawah lock ini
+_export_lock = threading.Lock()
+
+
+def _to_csv(df):
+    buffer = io.StringIO()
+    for start in range(0, len(df), CHUNK_ROWS):
+        df.iloc[start:start + CHUNK_ROWS].to_csv(buffer, index=False, header=start == 0)
+    if df.empty:
+        df.to_csv(buffer, index=False)
+    return buffer.getvalue().encode("utf-8")
+
+
+def _to_parquet(df):
+    buffer = io.BytesIO()
+    try:
+        df.to_parquet(buffer, index=False)
+    except ImportError as e:
+        raise ValueError("Ekspor Parquet membutuhkan paket pyarrow") from e
+    return buffer.getvalue()
+
+
+def _to_xlsx(df, sheet_name="Data"):
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_name)
+    sheet.append([str(c) for c in df.columns])
+    for row in df.itertuples(index=False, name=None):
+        sheet.append([None if pd.isna(v) else v.item() if hasattr(v, "item") else v for v in row])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+WRITERS = {"csv": _to_csv, "parquet": _to_parquet, "xlsx": _to_xlsx}
+
+
+def _cache_get(key):
+    with _export_lock:
+        data = _export_cache.get(key)
+        if data is not None:
+            _export_cache.move_to_end(key)
+        return data
+
+
+def _cache_put(key, data):
+    with _export_lock:
+        _export_cache[key] = data
+        _export_cache.move_to_end(key)
+        while len(_export_cache) > 1 and sum(len(v) for v in _export_cache.values()) > CACHE_BYTES:
+            _export_cache.popitem(last=False)
+
+
+def export_frame(df, fmt, source=None, version=None):
+    """
+    Tulis df ke format fmt dan kembalikan bytes-nya.
+    Jika source dan version diberikan, hasil di-cache dengan key (source, version, fmt).
+    """
+    if fmt not in WRITERS:
+        raise ValueError(f"Format ekspor tidak dikenal: {fmt}")
+    key = (source, version, fmt)
+    if source is not None:
+        data = _cache_get(key)
+        if data is not None:
+            return data
+    data = WRITERS[fmt](df)
+    if source is not None:
+        _cache_put(key, data)
+    return data
+
+
+def export_table(table_name, fmt):
+    """Ekspor satu tabel replika; di-cache sampai versi data berubah"""
+    version = data_version()
+    data = _cache_get((table_name, version, fmt))
+    if data is not None:
+        return data
+    return export_frame(read_table(table_name), fmt, source=table_name, version=version)
+
+
+def file_name(name, fmt):
+    return f"{name}.{FORMATS[fmt][1]}"
+
+
+def mime_type(fmt):
+    return FORMATS[fmt][0]
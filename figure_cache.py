@@ -0,0 +1,53 @@
+import threading
+from collections import OrderedDict
+
+import plotly.io as pio
+
+from replica import data_version
+
+# Cache figure Plotly yang dipakai bersama oleh semua sesi dalam satu proses.
+# Figure disimpan sebagai JSON dengan key (jenis grafik, versi data, parameter), jadi
+# figure hanya dibangun ulang saat datanya berubah, bukan untuk setiap pengunjung.
+
+# Batas total ukuran JSON di cache (byte)
+CACHE_BYTES = 32 * 1024 * 1024
+
+_lock = threading.Lock()
+_figures = OrderedDict()  # (jenis grafik, versi data, parameter) -> JSON figure
+_state = {"bytes": 0}
+
+
+def cached_figure_json(chart_type, params, build, version=None):
+    """
+    JSON figure untuk (chart_type, versi data, params); build() membuat go.Figure
+    jika belum ada di cache. params harus hashable.
+    version adalah versi data yang dipakai build(); untuk data dari snapshot berikan
+    source_version-nya (snapshot.get_table_version). Default versi replika saat ini hanya
+    tepat jika build() membaca replika langsung.
+    """
+    key = (chart_type, data_version() if version is None else version, params)
+    with _lock:
+        if key in _figures:
+            _figures.move_to_end(key)
+            return _figures[key]
+
+    value = build().to_json()
+    with _lock:
+        if key not in _figures:
+            _figures[key] = value
+            _state["bytes"] += len(value)
+        while len(_figures) > 1 and _state["bytes"] > CACHE_BYTES:
+            _, old = _figures.popitem(last=False)
+            _state["bytes"] -= len(old)
+    return value
+
+
+def cached_figure(chart_type, params, build, version=None):
+    """Seperti cached_figure_json, tetapi mengembalikan objek figure siap ditampilkan"""
+    return pio.from_json(cached_figure_json(chart_type, params, build, version))
+
+
+def clear():
+    with _lock:
+        _figures.clear()
+        _state["bytes"] = 0
@@ -0,0 +1,164 @@
+import numpy as np
+
+from backtest import HORIZONS, rolling_origin, summarize
+from model import ClosedFormLinearSVR, TunedSVR, estimator_factory, train_incremental, train_svm_model, tuned_params
+from settings import get_settings
+
+# Backend peramalan yang bisa dipertukarkan. Semua backend punya fit(X, y) dan
+# predict(X) dengan X berupa array (n, 1) berisi tahun, sehingga bisa dipakai
+# langsung oleh predict_population dan dievaluasi oleh train_incremental.
+
+
+class OLSTrend:
+    """Tren linear ordinary least squares (solusi tertutup)"""
+
+    def fit(self, X, y):
+        x = np.asarray(X, dtype=float)[:, 0]
+        y = np.asarray(y, dtype=float)
+        x_mean, y_mean = x.mean(), y.mean()
+        sxx = ((x - x_mean) ** 2).sum()
+        self.slope_ = ((x - x_mean) * (y - y_mean)).sum() / sxx if sxx else 0.0
+        self.intercept_ = y_mean - self.slope_ * x_mean
+        return self
+
+    def predict(self, X):
+        return self.intercept_ + self.slope_ * np.asarray(X, dtype=float)[:, 0]
+
+
+class TheilSenTrend(OLSTrend):
+    """Tren linear robust: median kemiringan semua pasangan titik"""
+
+    def fit(self, X, y):
+        x = np.asarray(X, dtype=float)[:, 0]
+        y = np.asarray(y, dtype=float)
+        i, j = np.triu_indices(len(x), k=1)
+        dx = x[j] - x[i]
+        valid = dx != 0
+        self.slope_ = np.median((y[j] - y[i])[valid] / dx[valid]) if valid.any() else 0.0
+        self.intercept_ = np.median(y - self.slope_ * x)
+        return self
+
+
+class HoltSmoothing:
+    """
+    Exponential smoothing dengan tren (Holt).
+    alpha dan beta dipilih dari grid dengan SSE satu langkah terkecil; seluruh grid
+    dihitung sekaligus sebagai array sehingga hanya ada satu loop sepanjang tahun.
+    """
+    GRID = np.linspace(0.1, 0.9, 9)
+
+    def fit(self, X, y):
+        x = np.asarray(X, dtype=float)[:, 0]
+        y = np.asarray(y, dtype=float)
+        alpha, beta = np.meshgrid(self.GRID, self.GRID, indexing="ij")
+        level = np.full(alpha.shape, y[0])
+        trend = np.full(alpha.shape, y[1] - y[0] if len(y) > 1 else 0.0)
+        sse = np.zeros(alpha.shape)
+        fitted = np.empty((len(y),) + alpha.shape)
+        fitted[0] = y[0]
+        for t in range(1, len(y)):
+            forecast = level + trend
+            fitted[t] = forecast
+            sse += (y[t] - forecast) ** 2
+            new_level = alpha * y[t] + (1 - alpha) * forecast
+            trend = beta * (new_level - level) + (1 - beta) * trend
+            level = new_level
+
+        best = np.unravel_index(np.argmin(sse), sse.shape)
+        self.alpha_, self.beta_ = alpha[best], beta[best]
+        self.level_, self.trend_ = level[best], trend[best]
+        self.x_ = x
+        self.fitted_ = fitted[(slice(None),) + best]
+        return self
+
+    def predict(self, X):
+        x = np.asarray(X, dtype=float)[:, 0]
+        last_x = self.x_[-1]
+        ahead = self.level_ + self.trend_ * (x - last_x)
+        return np.where(x <= last_x, np.interp(x, self.x_, self.fitted_), ahead)
+
+
+class CohortGrowth:
+    """Pertumbuhan geometrik konstan: rata-rata laju pertumbuhan log per tahun"""
+
+    def fit(self, X, y):
+        x = np.asarray(X, dtype=float)[:, 0]
+        y = np.asarray(y, dtype=float)
+        self.x_last_, self.y_last_ = x[-1], y[-1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rates = np.diff(np.log(y)) / np.diff(x)
+        rates = rates[np.isfinite(rates)]
+        self.rate_ = rates.mean() if len(rates) else 0.0
+        return self
+
+    def predict(self, X):
+        x = np.asarray(X, dtype=float)[:, 0]
+        return self.y_last_ * np.exp(self.rate_ * (x - self.x_last_))
+
+
+class LinearSVRClosedForm(ClosedFormLinearSVR):
+    """ClosedFormLinearSVR dengan C dari config.yaml, agar bisa dibuat tanpa argumen"""
+    SETTINGS = ("svr_c",)   # field config.yaml yang dibaca, untuk key cache (model.estimator_factory)
+
+    def __init__(self):
+        super().__init__(C=get_settings().svr_c)
+
+
+BACKENDS = {
+    "svr": None,   # Pipeline(StandardScaler, SVR) dari model.py
+    "svr_tuned": None,   # Pipeline yang sama dengan hyperparameter hasil tune_svm_model
+    "svr_closed_form": LinearSVRClosedForm,
+    "ols": OLSTrend,
+    "theil_sen": TheilSenTrend,
+    "holt": HoltSmoothing,
+    "growth": CohortGrowth,
+}
+
+BACKEND_LABELS = {
+    "svr": "SVR (linear)",
+    "svr_tuned": "SVR (tuning otomatis)",
+    "svr_closed_form": "SVR linear (cepat, tertutup)",
+    "ols": "Regresi Linear (OLS)",
+    "theil_sen": "Theil-Sen (robust)",
+    "holt": "Exponential Smoothing (Holt)",
+    "growth": "Laju Pertumbuhan Konstan",
+}
+
+
+def train_model(feature_columns, target_column, data, backend="svr", incremental=True):
+    """
+    Latih satu backend peramalan dengan kontrak metrik yang sama seperti
+    train_svm_model: (model, mae, mape, r2).
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend tidak dikenal: {backend}")
+    if backend == "svr":
+        return train_svm_model(feature_columns, target_column, data=data, incremental=incremental)
+    if backend == "svr_tuned":
+        return train_svm_model(feature_columns, target_column, data=data, tune=True)
+    X = data[feature_columns].values
+    y = data[target_column].values
+    return train_incremental(X, y, backend=BACKENDS[backend])
+
+
+def backtest_series(feature_columns, target_column, data, backend="svr", horizons=HORIZONS):
+    """
+    Backtest rolling-origin satu backend untuk horizon 1..3 tahun.
+    Mengembalikan satu baris per (origin, horizon); lihat backtest.rolling_origin.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend tidak dikenal: {backend}")
+    X = data[feature_columns].values
+    y = data[target_column].values
+    if backend == "svr_tuned":
+        # Tuning diulang di setiap origin hanya dengan tahun sebelum origin; key cache origin
+        # (params + isi prefix) menentukan hasil tuning-nya
+        params, build = tuned_params(), TunedSVR
+    else:
+        params, build = estimator_factory(backend=BACKENDS[backend])
+    return rolling_origin(X, y, build, params, horizons=horizons)
+
+
+def backtest_model(feature_columns, target_column, data, backend="svr", horizons=HORIZONS):
+    """Tabel ringkas backtest per horizon (n, MAE, MAPE, RMSE)"""
+    return summarize(backtest_series(feature_columns, target_column, data, backend, horizons))
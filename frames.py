@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+# Representasi bertipe untuk tabel sensus di memori.
+# Dikonversi sekali saat data masuk (replika, fetch_data, file CSV): tahun int16, jumlah int32,
+# dimensi (misal kategori_usia) categorical. Kolom yang berisi nilai kosong memakai tipe
+# nullable (Int16/Int32) sehingga tidak perlu mengganti NaN/inf dengan 0 di setiap halaman.
+
+YEAR_COLUMNS = ("id_tahun", "tahun")
+DIMENSION_COLUMNS = ("kategori_usia",)
+YEAR_DTYPE = "int16"
+COUNT_DTYPE = "int32"
+
+_LIMITS = {dtype: np.iinfo(dtype) for dtype in (YEAR_DTYPE, COUNT_DTYPE)}
+
+
+def _integer(series, dtype):
+    """Series sebagai dtype jika semua nilainya bilangan bulat dalam jangkauan; None jika tidak"""
+    values = pd.to_numeric(series, errors="coerce")
+    missing = values.isna().to_numpy()
+    if missing.sum() != series.isna().sum():
+        return None  # ada teks yang bukan angka
+    present = values.to_numpy(dtype=float)[~missing]
+    limits = _LIMITS[dtype]
+    if present.size and (
+        not np.isfinite(present).all()
+        or (present != np.round(present)).any()
+        or present.min() < limits.min or present.max() > limits.max
+    ):
+        return None
+    if not missing.any():
+        return values.astype(dtype)
+    # Ada nilai kosong: tipe nullable (Int16/Int32), bukan float berisi NaN
+    return values.astype(dtype.capitalize())
+
+
+def canonical(df):
+    """
+    Konversi DataFrame mentah ke representasi bertipe. Kolom yang tidak dikenali atau
+    tidak bisa dikonversi tanpa kehilangan nilai dibiarkan apa adanya.
+    """
+    if df.empty:
+        return df
+    converted = {}
+    for column in df.columns:
+        series = df[column]
+        if column in YEAR_COLUMNS:
+            typed = _integer(series, YEAR_DTYPE)
+        elif column in DIMENSION_COLUMNS:
+            typed = series.astype("category")
+        elif pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series) and not str(column).startswith("id"):
+            typed = _integer(series, COUNT_DTYPE)
+        else:
+            typed = None
+        if typed is not None:
+            converted[column] = typed
+    return df.assign(**converted) if converted else df
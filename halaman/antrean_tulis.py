@@ -0,0 +1,46 @@
+import streamlit as st
+from write_queue import pending_writes, retry_failed, discard, flush
+
+OP_LABELS = {
+    "insert": "Tambah",
+    "insert_ignore": "Tambah",
+    "upsert": "Ganti",
+    "update": "Perbarui",
+    "delete": "Hapus",
+    "insert_year": "Tambah",
+    "upsert_year": "Ganti",
+}
+
+def sidebar_status():
+    """Status antrean tulis untuk admin di sidebar"""
+    df = pending_writes()
+    if df.empty:
+        st.sidebar.caption("✅ Semua perubahan sudah tersimpan di database")
+        return
+
+    failed = df[df["status"] == "failed"]
+    pending = df[df["status"] == "pending"]
+    if not pending.empty:
+        st.sidebar.info(f"⏳ {len(pending)} perubahan menunggu dikirim ke database")
+    if not failed.empty:
+        st.sidebar.error(f"⚠️ {len(failed)} perubahan gagal dikirim")
+
+    with st.sidebar.expander("Detail Antrean"):
+        for i, row in df.iterrows():
+            key = ", ".join(f"{k}={v}" for k, v in row["key"].items())
+            st.write(f"**{OP_LABELS.get(row['op'], row['op'])}** {row['table_name']} ({key})")
+            if row["attempts"]:
+                st.caption(f"Percobaan ke-{row['attempts']}: {row['last_error']}")
+            if row["status"] == "failed" and st.button("Buang", key=f"discard_{i}"):
+                discard(row["table_name"], row["key"])
+                st.rerun()
+
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("Kirim Sekarang"):
+                flush()
+                st.rerun()
+        with col2:
+            if not failed.empty and st.button("Coba Lagi"):
+                retry_failed()
+                st.rerun()
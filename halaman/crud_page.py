@@ -0,0 +1,190 @@
+import streamlit as st
+from settings import get_settings
+from write_queue import failed_writes
+from table_spec import read_rows, year_exists, validate, add_year, update_row, delete_row, make_key, describe_key
+
+# Halaman CRUD generik untuk semua tabel data tahunan (lihat table_spec.TableSpec)
+
+def show_result(success, message, warning=""):
+    if success:
+        st.success(message)
+    else:
+        st.error(message)
+    if warning:
+        st.warning(warning)
+
+@st.dialog("Konfirmasi Perubahan")
+def confirm_update(spec, key, values):
+    st.write(f"Apakah Anda yakin ingin memperbarui data {describe_key(spec, key)}?")
+    if st.button("Ya, Perbarui"):
+        show_result(*update_row(spec, key, values))
+        st.rerun()
+
+@st.dialog("Konfirmasi Penghapusan")
+def confirm_delete(spec, key):
+    st.write(f"Apakah Anda yakin ingin menghapus data {describe_key(spec, key)}?")
+    if st.button("Ya, Hapus"):
+        success, message, warning = delete_row(spec, key)
+        show_result(success, message, warning)
+        if success:
+            st.session_state[f"{spec.table}_page"] = 1
+        st.rerun()
+
+@st.dialog("Konfirmasi Penambahan")
+def confirm_tambah(spec, id_tahun, values_by_category):
+    st.write(f"Apakah Anda yakin ingin menambahkan data untuk tahun {id_tahun}?")
+    if spec.category:
+        st.write("**Data yang akan ditambahkan:**")
+        for category, values in values_by_category.items():
+            detail = ", ".join(f"{c.label} {values[c.name]}" for c in spec.value_columns)
+            st.write(f"- {category}: {detail}")
+    if st.button("Ya, Tambah"):
+        success, message, warning = add_year(spec, id_tahun, values_by_category)
+        show_result(success, message, warning)
+        if success:
+            # Reset form setelah berhasil menambah data
+            st.session_state.form_key += 1
+            st.session_state[f"{spec.table}_page"] = 1
+        st.rerun()
+
+def paginate(spec, df):
+    """Potong df sesuai halaman aktif; kembalikan df yang ditampilkan"""
+    if st.checkbox("Tampilkan Semua Data", value=False, key=f"{spec.table}_show_all"):
+        st.info(f"Menampilkan semua {len(df)} data")
+        return df
+
+    page_key = f"{spec.table}_page"
+    if page_key not in st.session_state:
+        st.session_state[page_key] = 1
+    items_per_page = get_settings().items_per_page
+    total_pages = max(1, (len(df) + items_per_page - 1) // items_per_page)
+    st.session_state[page_key] = min(st.session_state[page_key], total_pages)
+
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        if st.button("Sebelumnya") and st.session_state[page_key] > 1:
+            st.session_state[page_key] -= 1
+            st.rerun()
+    with col2:
+        st.write(f"Halaman {st.session_state[page_key]} dari {total_pages} | Total Data: {len(df)}")
+    with col3:
+        if st.button("Berikutnya") and st.session_state[page_key] < total_pages:
+            st.session_state[page_key] += 1
+            st.rerun()
+
+    offset = (st.session_state[page_key] - 1) * items_per_page
+    return df.iloc[offset:offset + items_per_page]
+
+def render_table(spec, df):
+    """Tabel yang bisa diedit langsung, dengan tombol hapus per baris"""
+    columns = [("Tahun", 2)]
+    if spec.category:
+        columns.append((spec.category.label, 2))
+    columns += [(c.label, 3 if len(spec.value_columns) < 3 else 2) for c in spec.value_columns]
+    if spec.total:
+        columns.append((spec.total.label, 2 if spec.category else 3))
+    columns.append(("Hapus", 2))
+
+    cols = st.columns([width for _, width in columns])
+    for col, (label, _) in zip(cols, columns):
+        with col:
+            st.write(label)
+
+    prefix = spec.table
+    for index, row in df.iterrows():
+        i = 0
+        with cols[i]:
+            st.number_input("", value=int(row[spec.year_column]), key=f"{prefix}_tahun_{index}", label_visibility='collapsed', step=1, format="%d", disabled=True)
+        if spec.category:
+            i += 1
+            with cols[i]:
+                st.text_input("", value=row[spec.category.name], key=f"{prefix}_kategori_{index}", label_visibility='collapsed', disabled=True)
+
+        values = {}
+        for c in spec.value_columns:
+            i += 1
+            with cols[i]:
+                values[c.name] = st.number_input("", value=int(row[c.name]), key=f"{prefix}_{c.name}_{index}", label_visibility='collapsed', step=1, format="%d")
+        if spec.total:
+            i += 1
+            with cols[i]:
+                # Hitung total otomatis dan tampilkan
+                st.number_input("", value=int(sum(values.values())), key=f"{prefix}_total_{index}", label_visibility='collapsed', step=1, format="%d", disabled=True)
+
+        key = make_key(spec, row[spec.year_column], row[spec.category.name] if spec.category else None)
+        with cols[i + 1]:
+            if st.button("Hapus", key=f"{prefix}_hapus_{index}"):
+                confirm_delete(spec, key)
+
+        # Jika ada perubahan data, tampilkan dialog konfirmasi update
+        if any(values[c.name] != row[c.name] for c in spec.value_columns):
+            confirm_update(spec, key, values)
+
+def number_inputs(spec, suffix=""):
+    """Input nilai untuk satu baris, dua kolom per baris seperti form aslinya"""
+    form_key = st.session_state.form_key
+    values = {}
+    for start in range(0, len(spec.value_columns), 2):
+        cols = st.columns(2)
+        for col, c in zip(cols, spec.value_columns[start:start + 2]):
+            with col:
+                label = c.input_label or f"Jumlah {c.label}"
+                values[c.name] = st.number_input(f"{label}{suffix}", min_value=0, step=1, key=f"{spec.table}_{c.name}{suffix}_input_{form_key}")
+    return values
+
+def render_add_form(spec, df):
+    st.subheader("Tambah Data Baru (Semua Kategori Usia)" if spec.category else "Tambah Data Baru")
+    form_key = st.session_state.form_key
+    with st.form(f"{spec.table}_add_form_{form_key}"):
+        col1, col2 = st.columns(2)
+        with col1:
+            tahun_baru = st.number_input("Masukkan tahun", min_value=spec.min_year, max_value=spec.max_year, step=1, format="%d", key=f"{spec.table}_tahun_input_{form_key}")
+        with col2:
+            st.write("")  # Spacer
+
+        values_by_category = {}
+        if spec.category:
+            for category in spec.categories:
+                st.write(f"**{spec.category.label} {category}**")
+                values_by_category[category] = number_inputs(spec, f" ({category})")
+                if spec.total:
+                    st.write(f"Total {category}: {sum(values_by_category[category].values())}")
+        else:
+            values_by_category[None] = number_inputs(spec)
+
+        if spec.total:
+            grand_total = sum(sum(v.values()) for v in values_by_category.values())
+            st.write(f"**{spec.total.input_label or 'Total'}:** {grand_total}")
+
+        if st.form_submit_button("Tambah Data"):
+            errors = [
+                message.format(kategori=category)
+                for category, values in values_by_category.items()
+                for message in validate(spec, values)
+            ]
+            if errors:
+                st.error(errors[0])
+            elif year_exists(spec, tahun_baru, df):
+                st.error(f"Data {spec.entity} untuk tahun {tahun_baru} sudah ada!")
+            else:
+                confirm_tambah(spec, tahun_baru, values_by_category)
+
+def render_crud_page(spec):
+    st.header(spec.header)
+    st.title(spec.title)
+
+    # Inisialisasi session state untuk form reset
+    if 'form_key' not in st.session_state:
+        st.session_state.form_key = 0
+
+    # Perubahan yang ditolak database tidak tampil di tabel; tunjukkan terpisah
+    failed = failed_writes(spec.table)
+    if not failed.empty:
+        st.warning(f"{len(failed)} perubahan pada tabel ini gagal disimpan dan tidak ditampilkan di bawah. "
+                   "Lihat Detail Antrean di sidebar untuk mencoba lagi atau membuangnya.")
+        for key, error in zip(failed["key"], failed["last_error"]):
+            st.caption(f"Data {describe_key(spec, key)}: {error}")
+
+    df = read_rows(spec)
+    render_table(spec, paginate(spec, df) if spec.paginate else df)
+    render_add_form(spec, df)
@@ -0,0 +1,71 @@
+import streamlit as st
+import pandas as pd
+from bulk_import import parse_upload, diff_rows, write_rows
+from halaman import data_jumlah_penduduk, data_kepala_keluarga, data_migrasi, data_status_perkawinan, data_putus_sekolah, data_penduduk_usia
+
+# Tabel yang bisa diimpor, sesuai halaman data_* yang ada
+SPECS = [
+    data_jumlah_penduduk.SPEC,
+    data_kepala_keluarga.SPEC,
+    data_migrasi.SPEC,
+    data_status_perkawinan.SPEC,
+    data_putus_sekolah.SPEC,
+    data_penduduk_usia.SPEC,
+]
+
+def expected_columns(spec):
+    names = ["Tahun"] + ([spec.category.label] if spec.category else []) + [c.label for c in spec.value_columns]
+    return ", ".join(names)
+
+def app():
+    st.header("Impor Data")
+    st.title("Impor Data dari CSV / Excel")
+
+    spec = st.selectbox("Tabel tujuan", SPECS, format_func=lambda s: s.header)
+    st.caption(f"Kolom yang dibutuhkan: {expected_columns(spec)}. Kolom total boleh dikosongkan, akan dihitung otomatis.")
+
+    uploaded_file = st.file_uploader("Unggah file", type=["csv", "xlsx"], key=f"impor_{spec.table}")
+    if not uploaded_file:
+        return
+
+    status = st.empty()
+    try:
+        rows, errors = parse_upload(spec, uploaded_file, on_chunk=lambda n: status.caption(f"{n:,} baris dibaca..."))
+    except ValueError as e:
+        st.error(str(e))
+        return
+    status.empty()
+
+    if errors:
+        st.warning(f"{len(errors)} baris tidak valid dan akan dilewati")
+        with st.expander("Detail baris tidak valid"):
+            st.dataframe(pd.DataFrame(errors, columns=["Baris", "Pesan"]), use_container_width=True, hide_index=True)
+
+    new_rows, changed_rows, unchanged = diff_rows(spec, rows)
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Data Baru", len(new_rows))
+    col2.metric("Data Berubah", len(changed_rows))
+    col3.metric("Sama Dengan Database", unchanged)
+
+    changes = pd.concat([new_rows, changed_rows], ignore_index=True)
+    if changes.empty:
+        st.info("Tidak ada perubahan untuk disimpan.")
+        return
+
+    with st.expander("Pratinjau perubahan"):
+        st.dataframe(changes, use_container_width=True, hide_index=True)
+
+    if st.button(f"Simpan {len(changes)} Data"):
+        progress = st.progress(0.0)
+        try:
+            left = write_rows(
+                spec, changes,
+                on_progress=lambda done, total: progress.progress(done / total, text=f"{done}/{total} data terkirim")
+            )
+        except ValueError as e:
+            st.error(f"Data tidak disimpan: {str(e)}")
+            return
+        if left:
+            st.warning(f"{left} data masih di antrean dan akan dikirim otomatis. Lihat status antrean di sidebar.")
+        else:
+            st.success("Semua data berhasil disimpan!")
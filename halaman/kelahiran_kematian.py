@@ -1,4 +1,127 @@
 import streamlit as st
+import pandas as pd
+import plotly.graph_objects as go
+from datetime import date, timedelta
+from auth import is_authenticated
+from charts import line_traces
+from figure_cache import cached_figure
+from forecasters import BACKEND_LABELS
+from halaman.unduh import frame_download
+from peristiwa import DESA, JENIS, JENIS_KELAMIN, read_rollup_version, record_events, series, forecast_yearly
+
+# Grafik harian hanya menampilkan (dan mengambil dari server) rentang hari terakhir ini
+DAILY_WINDOW_DAYS = 365
+
+def trend_chart(level, title, since=None):
+    """Grafik kelahiran dan kematian per periode, dari tabel rekap (harian: tanggal >= since)"""
+    # Data dan versinya dibaca sekali di sini; build() tidak mengambil ulang rekap,
+    # jadi figure selalu disimpan di bawah versi data yang benar-benar dipakainya
+    rollup, version = read_rollup_version(level, since)
+
+    def build():
+        x, columns = None, {}
+        for jenis, label in JENIS.items():
+            data = series(level, jenis, rollup=rollup)
+            if level == "bulanan":
+                index = pd.to_datetime(pd.DataFrame({"year": data["id_tahun"], "month": data["bulan"], "day": 1}))
+            else:
+                index = data["tanggal"]
+            values = pd.Series(data["jumlah"].to_numpy(), index=index)
+            columns[label] = values
+            x = values.index if x is None else x.union(values.index)
+        fig = go.Figure(line_traces(
+            x.to_numpy(),
+            {label: values.reindex(x, fill_value=0).to_numpy() for label, values in columns.items()}
+        ))
+        fig.update_layout(title=title, xaxis=dict(title="Tanggal"), yaxis=dict(title="Jumlah Jiwa"),
+                          template="plotly_white", hovermode="x unified")
+        return fig
+
+    return cached_figure("peristiwa", (level, since), build, version=version)
+
+def input_form():
+    """Form pencatatan peristiwa untuk admin"""
+    st.header("Catat Peristiwa")
+    with st.form("form_peristiwa", clear_on_submit=True):
+        col1, col2 = st.columns(2)
+        with col1:
+            tanggal = st.date_input("Tanggal", value=date.today(), max_value=date.today())
+            id_desa = st.selectbox("Desa", list(DESA), format_func=DESA.get)
+        with col2:
+            jenis = st.selectbox("Jenis Peristiwa", list(JENIS), format_func=JENIS.get)
+            jenis_kelamin = st.selectbox("Jenis Kelamin", list(JENIS_KELAMIN), format_func=JENIS_KELAMIN.get)
+        jumlah = st.number_input("Jumlah Jiwa", min_value=1, max_value=100, value=1)
+        submitted = st.form_submit_button("Simpan")
+
+    if submitted:
+        events = pd.DataFrame({"tanggal": [tanggal], "id_desa": [id_desa], "jenis": [jenis], "jenis_kelamin": [jenis_kelamin]})
+        try:
+            count = record_events(events.loc[events.index.repeat(jumlah)])
+        except ValueError as e:
+            st.error(f"Gagal menyimpan: {str(e)}")
+        else:
+            st.success(f"{count} peristiwa dicatat dan akan dikirim ke server.")
 
 def app():
-    st.header("Prediksi Angka Kelahiran dan Kematian")
\ No newline at end of file
+    st.title("Kelahiran dan Kematian")
+
+    try:
+        yearly, yearly_version = read_rollup_version("tahunan")
+    except Exception as e:
+        st.error(f"Gagal mengambil data: {str(e)}")
+        st.stop()
+
+    if is_authenticated():
+        input_form()
+
+    if yearly.empty:
+        st.warning("Belum ada data kelahiran dan kematian!")
+        st.stop()
+
+    # ======= RINGKASAN TAHUN TERAKHIR =======
+    totals = yearly.pivot_table(index="id_tahun", columns="jenis", values="jumlah", aggfunc="sum", fill_value=0).reindex(columns=list(JENIS), fill_value=0)
+    latest = int(totals.index.max())
+    st.header(f"Tahun {latest}")
+    col1, col2, col3 = st.columns(3)
+    births, deaths = int(totals.loc[latest, 1]), int(totals.loc[latest, 2])
+    col1.metric("Kelahiran", f"{births:,}")
+    col2.metric("Kematian", f"{deaths:,}")
+    col3.metric("Pertumbuhan Alami", f"{births - deaths:+,}")
+    if latest == date.today().year:
+        st.caption("Tahun berjalan, data belum lengkap.")
+
+    # ======= GRAFIK TREN =======
+    st.plotly_chart(trend_chart("bulanan", "Kelahiran dan Kematian per Bulan"), use_container_width=True)
+    with st.expander(f"Data harian ({DAILY_WINDOW_DAYS} hari terakhir)"):
+        since = date.today() - timedelta(days=DAILY_WINDOW_DAYS)
+        st.plotly_chart(trend_chart("harian", "Kelahiran dan Kematian per Hari", since=since), use_container_width=True)
+
+    # ======= TABEL PER DESA =======
+    st.header("Rekap per Desa")
+    year = st.selectbox("Tahun", sorted(totals.index, reverse=True))
+    per_desa = yearly[yearly["id_tahun"] == year].pivot_table(
+        index="id_desa", columns=["jenis", "jenis_kelamin"], values="jumlah", aggfunc="sum", fill_value=0
+    ).reindex(index=list(DESA), columns=pd.MultiIndex.from_product([list(JENIS), list(JENIS_KELAMIN)]), fill_value=0)
+    per_desa.index = per_desa.index.map(DESA)
+    per_desa.columns = [f"{JENIS[j]} {JENIS_KELAMIN[k]}" for j, k in per_desa.columns]
+    per_desa.loc["Total"] = per_desa.sum()
+    st.dataframe(per_desa, use_container_width=True)
+    frame_download(per_desa.reset_index(names="Desa"), f"peristiwa_{year}", ("peristiwa_desa", year), version=yearly_version)
+
+    # ======= PREDIKSI =======
+    st.header("Prediksi Tahunan")
+    backend = st.selectbox("Metode prediksi", list(BACKEND_LABELS), format_func=BACKEND_LABELS.get)
+    cols = st.columns(len(JENIS))
+    for col, (jenis, label) in zip(cols, JENIS.items()):
+        with col:
+            st.subheader(label)
+            try:
+                prediction, mae, mape, r2 = forecast_yearly(jenis, backend)
+            except ValueError as e:
+                st.info(str(e))
+                continue
+            st.dataframe(
+                prediction.rename(columns={"id_tahun": "Tahun", "prediksi": "Prediksi"}).style.format({"Tahun": "{}", "Prediksi": "{:,.0f}"}),
+                use_container_width=True, hide_index=True
+            )
+            st.caption(f"MAE: {mae:,.1f} | MAPE: {mape:.1f}% | R²: {r2:.3f}")
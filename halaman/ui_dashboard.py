@@ -4,7 +4,10 @@ import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from supabase import create_client, Client
-from model import fetch_data, train_svm_model, predict_population
+from model import train_svm_model, predict_population
+from rollups import yearly_frame
+from auth import is_authenticated
+from halaman.unduh import table_download
 import os
 
 # Koneksi ke Supabase
@@ -13,18 +16,17 @@ SUPABASE_KEY = os.getenv('SUPABASE_KEY')  # Menggunakan environment variable unt
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
 def app():
-     # Ambil data tahunan untuk grafik
-    df= fetch_data(
-        table_name="penduduk_tahunan", 
-        feature_columns= ["id_tahun"], 
-        target_columns= ["jumlah_penduduk", "laki_laki", "perempuan"]
-        ).sort_values("id_tahun")
-    
-    # Calculate jumlah_penduduks and changes
-    df['Jumlah Penduduk'] = df['laki_laki'] + df['perempuan']
-    df["% Perubahan Laki_laki"] = df["laki_laki"].pct_change() * 100
-    df["% Perubahan Perempuan"] = df["perempuan"].pct_change() * 100
-    df["% Perubahan Jumlah Penduduk"] = df["jumlah_penduduk"].pct_change() * 100
+    # Jumlah dan % perubahan per tahun sudah dihitung di rollups, tidak dihitung ulang setiap rerun.
+    # Pengunjung umum hanya melihat data yang sudah tersimpan; admin ikut melihat antrean tulisnya
+    df = yearly_frame("penduduk_tahunan", pending=is_authenticated()).rename(columns={
+        "pct_laki_laki": "% Perubahan Laki_laki",
+        "pct_perempuan": "% Perubahan Perempuan",
+        "pct_jumlah_penduduk": "% Perubahan Jumlah Penduduk",
+    })
+    if df.empty:
+        st.warning("Data jumlah penduduk belum tersedia!")
+        return
+
     # ======= DETAIL TABLE =======
     st.header("Data Historis")
 
@@ -43,18 +45,12 @@ def app():
         st.error("No valid population data columns found in the DataFrame!")
         return
 
-    # Calculate percentage changes only for columns that exist
-    if "laki_laki" in df.columns:
-        df["% Perubahan Laki_laki"] = df["laki_laki"].pct_change() * 100
-        available_cols["% Perubahan Laki_laki"] = "% Δ Laki-laki"
-
-    if "perempuan" in df.columns:
-        df["% Perubahan Perempuan"] = df["perempuan"].pct_change() * 100
-        available_cols["% Perubahan Perempuan"] = "% Δ Perempuan"
-
-    if "jumlah_penduduk" in df.columns:
-        df["% Perubahan Jumlah Penduduk"] = df["jumlah_penduduk"].pct_change() * 100
-        available_cols["% Perubahan Jumlah Penduduk"] = "% Δ Total"
+    # Kolom % perubahan berasal dari rollups
+    available_cols.update({
+        "% Perubahan Laki_laki": "% Δ Laki-laki",
+        "% Perubahan Perempuan": "% Δ Perempuan",
+        "% Perubahan Jumlah Penduduk": "% Δ Total",
+    })
 
     # Create the display DataFrame with only available columns
     final_df = df[list(available_cols.keys())].rename(columns=available_cols)
@@ -87,6 +83,7 @@ def app():
         use_container_width=True,
         hide_index=True
     )
+    table_download("penduduk_tahunan")
 
     st.write("*% Δ Laki-laki : presentase perubahan jumlah laki-laki dari data sebelumnya")
     st.write("*% Δ Perempuan : presentase perubahan jumlah perempuan dari data sebelumnya")
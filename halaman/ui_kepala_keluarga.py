@@ -3,7 +3,9 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import numpy as np
-from model import fetch_data, train_svm_model, predict_population
+from model import train_svm_model, predict_population
+from snapshot import get_table
+from halaman.unduh import table_download
 
 def style_negative_positive(val):
     if not isinstance(val, str) or len(val) == 0:
@@ -18,10 +20,9 @@ def style_negative_positive(val):
 
 def app(): 
     # ======= DATA PREPARATION ======= 
-    df = fetch_data(
-        table_name="keluarga",
-        feature_columns=["id_tahun"],
-        target_columns=["pria", "wanita", "jumlah_kepala_keluarga"]
+    df = get_table(
+        "keluarga",
+        ["id_tahun", "pria", "wanita", "jumlah_kepala_keluarga"]
     ).sort_values("id_tahun")
     
     # Calculate jumlah_kepala_keluargas and changes
@@ -62,6 +63,7 @@ def app():
         use_container_width=True,
         hide_index=True
     )
+    table_download("keluarga")
 
     st.write("*% Δ Pria : presentase perubahan jumlah pria dari data sebelumnya")
     st.write("*% Δ Wanita : presentase perubahan jumlah wanita dari data sebelumnya")
@@ -3,14 +3,15 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import numpy as np
-from model import fetch_data, train_svm_model, predict_population
+from model import train_svm_model, predict_population
+from snapshot import get_table
+from halaman.unduh import table_download
 
 def app():    
     # ======= DATA PREPARATION ======= 
-    df = fetch_data(
-        table_name="migrasi",
-        feature_columns=["id_tahun"],
-        target_columns=["migrasi_masuk", "migrasi_keluar"]
+    df = get_table(
+        "migrasi",
+        ["id_tahun", "migrasi_masuk", "migrasi_keluar"]
     ).sort_values("id_tahun")
     
     # Hitung perubahan
@@ -60,6 +61,7 @@ def app():
         use_container_width=True,
         hide_index=True
     )
+    table_download("migrasi")
 
     st.write("*% Δ Masuk : presentase perubahan jumlah penduduk masuk dari data sebelumnya")
     st.write("*% Δ Keluar : presentase perubahan jumlah penduduk keluar dari data sebelumnya")
@@ -3,42 +3,69 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
-from model import fetch_data, train_svm_model, predict_population
+from model import predict_population
+from forecasters import train_model, backtest_series, BACKEND_LABELS
+from backtest import HORIZONS, summarize
+from intervals import conformal_min_size, residual_array, prediction_intervals
+from settings import get_settings
+from halaman.unduh import table_download, frame_download
+from reconcile import TOP, summing_matrix, reconcile
+from batch_forecast import METHODS as BATCH_METHODS, forecast_frame
+from snapshot import get_table_version
 
-@st.cache_data
 def fetch_population_data():
-    """Fetch population data dari Supabase dengan caching"""
+    """Ambil data penduduk per kelompok umur dari snapshot bersama, beserta source_version snapshot-nya"""
     try:
-        df = fetch_data(
-            table_name="penduduk_usia",
-            feature_columns=["id_tahun"],
-            target_columns=["kategori_usia", "laki_laki", "perempuan", "total"]
+        df, version = get_table_version(
+            "penduduk_usia",
+            ["id_tahun", "kategori_usia", "laki_laki", "perempuan", "total"]
         )
         if not df.empty:
-            # Pastikan kolom id_tahun ada dan bertipe int
-            if 'id_tahun' in df.columns:
-                df['id_tahun'] = df['id_tahun'].astype(int)
-            else:
-                # Jika tidak ada kolom id_tahun, buat dari index atau kolom tahun
-                if 'tahun' in df.columns:
-                    df['id_tahun'] = df['tahun'].astype(int)
-                else:
-                    # Buat tahun dummy berdasarkan index
-                    df['id_tahun'] = range(2020, 2020 + len(df))
-            
-            return df.sort_values('id_tahun')
+            # id_tahun sudah int16 dan kategori_usia categorical sejak dibaca dari replika
+            return df.sort_values('id_tahun'), version
         else:
             st.warning("Data kosong atau tidak ditemukan!")
-            return pd.DataFrame()
+            return pd.DataFrame(), None
     except Exception as e:
         st.error(f"Gagal mengambil data: {str(e)}")
-        return pd.DataFrame()
+        return pd.DataFrame(), None
+
+def reconcile_forecasts(df, models, forecasts, backtests, next_years, backend):
+    """
+    Rekonsiliasi MinT (WLS) seluruh node sekaligus. Varians tiap node diambil dari
+    residual backtest horizon 1; node kecamatan dari penduduk_tahunan jika tersedia.
+    Mengembalikan (forecasts, source_version snapshot penduduk_tahunan atau None).
+    """
+    forecasts, backtests = dict(forecasts), dict(backtests)
+    include_top = True
+    try:
+        kecamatan, top_version = get_table_version(
+            "penduduk_tahunan",
+            ["id_tahun", "jumlah_penduduk", "laki_laki", "perempuan"]
+        )
+        kecamatan = kecamatan.rename(columns={'jumlah_penduduk': 'total'})
+        for col in ['total', 'laki_laki', 'perempuan']:
+            model = train_model(['id_tahun'], col, kecamatan, backend=backend)[0]
+            forecasts[(TOP, col)] = model.predict(next_years)
+            backtests[(TOP, col)] = backtest_series(['id_tahun'], col, kecamatan, backend=backend)
+    except ValueError:
+        st.info("Data jumlah penduduk kecamatan tidak tersedia; total kecamatan dihitung dari kelompok umur.")
+        include_top = False
+        top_version = None
+    
+    nodes, S = summing_matrix(list(models), include_top=include_top)
+    base = np.array([forecasts[node] for node in nodes])
+    residuals = residual_array([backtests[node] for node in nodes], (1,))[:, 0, :]
+    counts = (~np.isnan(residuals)).sum(axis=1)
+    variances = np.where(counts > 1, np.nanvar(np.where(counts[:, None] > 1, residuals, 0.0), axis=1), np.nan)
+    reconciled = reconcile(base, S, variances=variances)
+    return {**forecasts, **dict(zip(nodes, reconciled))}, top_version
 
 def app():
     st.title("Prediksi Jumlah Penduduk per Kelompok Umur")
     
     # Load data dengan caching
-    df = fetch_population_data()
+    df, source_version = fetch_population_data()
     if df.empty:
         st.warning("Tidak ada data yang ditemukan!")
         st.stop()
@@ -52,11 +79,38 @@ def app():
         st.stop()
     
     # Calculate percentage changes
-    df_grouped = df.groupby('kategori_usia')
+    df_grouped = df.groupby('kategori_usia', observed=True)
     for col in ['laki_laki', 'perempuan', 'total']:
         if col in df.columns:
             df[f'% Perubahan {col}'] = df_grouped[col].pct_change() * 100
     
+    # Pilih backend peramalan
+    backend = st.selectbox(
+        "Model Prediksi",
+        options=list(BACKEND_LABELS),
+        format_func=BACKEND_LABELS.get
+    )
+    
+    # Backend tren linear: semua kelompok umur x kolom difit sekaligus dalam satu batch
+    batch = None
+    if backend in BATCH_METHODS:
+        long_df = df.melt(
+            id_vars=['id_tahun', 'kategori_usia'],
+            value_vars=['total', 'laki_laki', 'perempuan'],
+            var_name='kolom'
+        )
+        batch = forecast_frame(long_df, ['kategori_usia', 'kolom'], 'value', method=backend)
+    
+    def train(group_data, group, target_column):
+        if batch is not None:
+            return batch.result((group, target_column))
+        return train_model(
+            feature_columns=['id_tahun'],
+            target_column=target_column,
+            data=group_data,
+            backend=backend
+        )
+    
     # Train models for each age group
     models = {}
     metrics = {}
@@ -70,23 +124,9 @@ def app():
             continue
         
         # Train models
-        model_total, mae_total, mape_total, r2_total = train_svm_model(
-            feature_columns=['id_tahun'],
-            target_column='total',
-            data=group_data
-        )
-        
-        model_laki, mae_laki, mape_laki, r2_laki = train_svm_model(
-            feature_columns=['id_tahun'],
-            target_column='laki_laki',
-            data=group_data
-        )
-        
-        model_perempuan, mae_perempuan, mape_perempuan, r2_perempuan = train_svm_model(
-            feature_columns=['id_tahun'],
-            target_column='perempuan',
-            data=group_data
-        )
+        model_total, mae_total, mape_total, r2_total = train(group_data, group, 'total')
+        model_laki, mae_laki, mape_laki, r2_laki = train(group_data, group, 'laki_laki')
+        model_perempuan, mae_perempuan, mape_perempuan, r2_perempuan = train(group_data, group, 'perempuan')
         
         models[group] = {
             'total': model_total,
@@ -103,19 +143,67 @@ def app():
             'R² Perempuan': r2_perempuan
         }
     
+    # Backtest rolling-origin untuk horizon yang sama dengan tabel prediksi; residualnya
+    # juga dipakai untuk interval prediksi
+    targets = ['total', 'laki_laki', 'perempuan']
+    series = [(group, col) for group in models for col in targets]
+    backtests = {
+        (group, col): backtest_series(['id_tahun'], col, df[df['kategori_usia'] == group], backend=backend)
+        for group, col in series
+    }
+    
+    with st.expander("Evaluasi Backtest (1-3 tahun ke depan)"):
+        summaries = [
+            summarize(backtests[(group, 'total')]).reset_index().assign(**{'Kelompok Umur': group})
+            for group in models
+        ]
+        if summaries:
+            bt_df = pd.concat(summaries, ignore_index=True).rename(columns={'horizon': 'Horizon (tahun)'})
+            st.dataframe(
+                bt_df[['Kelompok Umur', 'Horizon (tahun)', 'n', 'MAE', 'MAPE', 'RMSE']],
+                use_container_width=True, hide_index=True
+            )
+            st.caption("Model dilatih hanya dengan tahun-tahun sebelum origin, lalu memprediksi 1-3 tahun berikutnya.")
+    
     # Make predictions for 2024-2026
     last_year = df['id_tahun'].max()
     next_years = np.array([last_year + 1, last_year + 2, last_year + 3]).reshape(-1, 1)
     
+    forecasts = {(group, col): models[group][col].predict(next_years) for group, col in series}
+    
+    # Rekonsiliasi: total = laki-laki + perempuan, dan jumlah kelompok umur = total kecamatan
+    reconciled = bool(series) and st.checkbox("Rekonsiliasi hierarki (total = laki-laki + perempuan = jumlah kelompok umur)", value=True)
+    if reconciled:
+        forecasts, top_version = reconcile_forecasts(df, models, forecasts, backtests, next_years, backend)
+    else:
+        top_version = None
+    
+    # Interval prediksi semua kelompok umur x kolom sekaligus
+    if series:
+        points = np.array([forecasts[key] for key in series])
+        residuals = residual_array([backtests[key] for key in series], HORIZONS)
+        lower, upper = prediction_intervals(points, residuals)
+        bounds = {key: (lower[i], upper[i]) for i, key in enumerate(series)}
+    level = get_settings().interval_level
+    # Horizon dengan residual terlalu sedikit memakai rentang ± selisih terbesar
+    counts = (~np.isnan(residuals)).sum(axis=-1) if series else np.zeros(0)
+    widened = ((counts > 0) & (counts < conformal_min_size(level))).any()
+    
+    def interval(key, i):
+        lo, hi = bounds[key][0][i], bounds[key][1][i]
+        if np.isnan(lo) or np.isnan(hi):
+            return "-"
+        return f"{lo:,.0f} – {hi:,.0f}"
+    
     pred_data = []
     for group in age_groups:
         if group not in models:
             continue
             
         # Get predictions
-        pred_total = models[group]['total'].predict(next_years)
-        pred_laki = models[group]['laki_laki'].predict(next_years)
-        pred_perempuan = models[group]['perempuan'].predict(next_years)
+        pred_total = forecasts[(group, 'total')]
+        pred_laki = forecasts[(group, 'laki_laki')]
+        pred_perempuan = forecasts[(group, 'perempuan')]
         
         # Get last historical values
         filtered_df = df[(df['id_tahun'] == last_year) & (df['kategori_usia'] == group)]
@@ -136,7 +224,10 @@ def app():
                     'Perempuan': pred_perempuan[i],
                     '% Δ Total': changes_total[i],
                     '% Δ Laki': changes_laki[i],
-                    '% Δ Perempuan': changes_perempuan[i]
+                    '% Δ Perempuan': changes_perempuan[i],
+                    'Rentang Total': interval((group, 'total'), i),
+                    'Rentang Laki-laki': interval((group, 'laki_laki'), i),
+                    'Rentang Perempuan': interval((group, 'perempuan'), i)
                 })
         else:
             st.warning(f"No data found for year {last_year} and age group {group}")
@@ -181,7 +272,16 @@ def app():
         styled_pred_df.style.applymap(style_negative_positive, subset=['% Δ Total', '% Δ Laki', '% Δ Perempuan']),
         use_container_width=True
     )
+    # File prediksi bergantung pada versi snapshot sumbernya dan pengaturan model/interval aktif
+    settings = get_settings()
+    frame_download(pred_df, f"prediksi_penduduk_usia_{backend}", source=("prediksi_penduduk_usia", backend, reconciled),
+                   version=(source_version, top_version, settings.interval_level, settings.svr_c, settings.svr_epsilon))
+    table_download("penduduk_usia")
 
     st.write("*% Δ Laki-laki : presentase perubahan jumlah laki-laki dari data sebelumnya")
     st.write("*% Δ Perempuan : presentase perubahan jumlah perempuan dari data sebelumnya")
-    st.write("*% Δ Total : presentase perubahan jumlah penduduk (laki-laki dan perempuan) dari data sebelumnya")
\ No newline at end of file
+    st.write("*% Δ Total : presentase perubahan jumlah penduduk (laki-laki dan perempuan) dari data sebelumnya")
+    st.write(f"*Rentang : interval prediksi {level:.0%} dari residual backtest 1-3 tahun ke depan")
+    if widened:
+        st.write(f"*Sebagian rentang dihitung dari kurang dari {conformal_min_size(level)} residual, sehingga memakai "
+                 f"selisih terbesar dan tingkat {level:.0%} tidak terjamin")
\ No newline at end of file
@@ -0,0 +1,129 @@
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+from cohort import AGE_GROUPS, Scenario, calibrate, project, projection_frame
+from figure_cache import cached_figure
+from scenarios import expand_grid, sweep
+from snapshot import get_table_version
+
+# Skenario pembanding yang selalu ikut dihitung
+PRESET_SCENARIOS = [
+    Scenario("Dasar"),
+    Scenario("Kelahiran Rendah", fertility=0.8),
+    Scenario("Kelahiran Tinggi", fertility=1.2),
+    Scenario("Tanpa Migrasi", migration=0.0),
+]
+
+def load_calibration():
+    """(kalibrasi, versi snapshot tabel sumbernya untuk key cache grafik)"""
+    usia, usia_version = get_table_version("penduduk_usia", ["id_tahun", "kategori_usia", "laki_laki", "perempuan", "total"])
+    migrasi, migrasi_version = get_table_version("migrasi", ["id_tahun", "migrasi_masuk", "migrasi_keluar"])
+    return calibrate(usia, migrasi), (usia_version, migrasi_version)
+
+# Pilihan nilai untuk sweep skenario
+SWEEP_OPTIONS = {
+    "fertility": [0.5, 0.75, 1.0, 1.25, 1.5],
+    "mortality": [0.5, 0.75, 1.0, 1.25, 1.5],
+    "migration": [-1.0, 0.0, 0.5, 1.0, 2.0, 3.0],
+    "horizons": [5, 10, 15, 20, 30],
+}
+
+def render_sweep(calibration):
+    """Jalankan banyak kombinasi skenario sekaligus; hasil tampil begitu tiap skenario selesai"""
+    st.header("Sweep Skenario")
+    col1, col2 = st.columns(2)
+    with col1:
+        fertility = st.multiselect("Pengali kelahiran", SWEEP_OPTIONS["fertility"], default=[0.75, 1.0, 1.25])
+        migration = st.multiselect("Pengali migrasi neto", SWEEP_OPTIONS["migration"], default=[0.0, 1.0, 2.0])
+    with col2:
+        mortality = st.multiselect("Pengali kematian", SWEEP_OPTIONS["mortality"], default=[1.0])
+        horizons = st.multiselect("Jumlah tahun proyeksi", SWEEP_OPTIONS["horizons"], default=[10])
+
+    items = expand_grid(fertility, mortality, migration, horizons)
+    st.caption(f"{len(items)} kombinasi skenario")
+    if not items or not st.button("Jalankan Sweep"):
+        return
+
+    base_total = calibration.population.sum()
+    progress = st.progress(0.0)
+    table = st.empty()
+    rows = []
+    for i, (scenario, horizon, projection) in enumerate(sweep(calibration, items), start=1):
+        final_total = projection[-1].sum()
+        rows.append({
+            "Kelahiran": scenario.fertility,
+            "Kematian": scenario.mortality,
+            "Migrasi": scenario.migration,
+            "Tahun": calibration.base_year + horizon,
+            "Jumlah Penduduk": round(final_total),
+            "% Δ": (final_total - base_total) / base_total * 100,
+        })
+        progress.progress(i / len(items), text=f"{i}/{len(items)} skenario selesai")
+        table.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+
+def app():
+    st.title("Proyeksi Penduduk Kohort-Komponen")
+    st.write(
+        "Penduduk per kelompok umur diproyeksikan dengan menuakan kohort, menambahkan kelahiran, "
+        "mengurangi kematian, dan memperhitungkan migrasi neto. Laju-lajunya dikalibrasi dari data historis."
+    )
+
+    try:
+        calibration, source_version = load_calibration()
+    except ValueError as e:
+        st.error(f"Proyeksi tidak dapat dibuat: {str(e)}")
+        st.stop()
+
+    # ======= SKENARIO =======
+    st.header("Skenario")
+    horizon = st.slider("Jumlah tahun proyeksi", min_value=1, max_value=30, value=10)
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        fertility = st.number_input("Pengali kelahiran", min_value=0.0, max_value=3.0, value=1.0, step=0.05)
+    with col2:
+        mortality = st.number_input("Pengali kematian", min_value=0.0, max_value=3.0, value=1.0, step=0.05)
+    with col3:
+        migration = st.number_input("Pengali migrasi neto", min_value=-3.0, max_value=3.0, value=1.0, step=0.1)
+
+    scenarios = [Scenario("Skenario Anda", fertility, mortality, migration)] + PRESET_SCENARIOS
+    result = projection_frame(calibration, scenarios, project(calibration, scenarios, horizon))
+
+    # ======= GRAFIK TOTAL =======
+    totals = result.groupby(["skenario", "id_tahun"], as_index=False)["total"].sum()
+    fig = cached_figure("proyeksi", (horizon, tuple(scenarios)), version=source_version, build=lambda: px.line(
+        totals, x="id_tahun", y="total", color="skenario", markers=True,
+        labels={"id_tahun": "Tahun", "total": "Jumlah Penduduk", "skenario": "Skenario"},
+        title=f"Proyeksi Jumlah Penduduk {calibration.base_year}-{calibration.base_year + horizon}"
+    ))
+    st.plotly_chart(fig, use_container_width=True)
+
+    # ======= TABEL TAHUN AKHIR =======
+    st.header(f"Komposisi Umur Tahun {calibration.base_year + horizon}")
+    final = result[result["id_tahun"] == calibration.base_year + horizon]
+    table = final.pivot_table(index="skenario", columns="kategori_usia", values="total", aggfunc="sum")
+    table["Total"] = table.sum(axis=1)
+    st.dataframe(table.round(0).astype(int).reindex([s.name for s in scenarios]), use_container_width=True)
+
+    with st.expander("Parameter hasil kalibrasi"):
+        st.write(f"Migrasi neto rata-rata per tahun: {calibration.net_migration:,.0f} jiwa")
+        st.dataframe(
+            pd.DataFrame(
+                calibration.death_rate,
+                index=["Laki-laki", "Perempuan"],
+                columns=list(AGE_GROUPS)
+            ).style.format("{:.4f}"),
+            use_container_width=True
+        )
+        st.caption("Laju kematian per tahun per kelompok umur (kelompok termuda dihitung dari kelahiran neto).")
+        st.dataframe(
+            pd.DataFrame(
+                calibration.residual_migration,
+                index=["Laki-laki", "Perempuan"],
+                columns=list(AGE_GROUPS)
+            ).style.format("{:.4f}"),
+            use_container_width=True
+        )
+        st.caption("Pertambahan per jiwa per tahun yang tidak dijelaskan kelahiran, kematian, dan migrasi tercatat; "
+                   "diperlakukan sebagai migrasi tak tercatat.")
+
+    render_sweep(calibration)
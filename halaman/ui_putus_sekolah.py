@@ -3,14 +3,15 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import numpy as np
-from model import fetch_data, train_svm_model, predict_population
+from model import train_svm_model, predict_population
+from snapshot import get_table
+from halaman.unduh import table_download
 
 def app():
     # ======= DATA PREPARATION ======= 
-    df = fetch_data(
-        table_name="putus_sekolah",
-        feature_columns=["id_tahun"],
-        target_columns=["jumlah_putus_sekolah"]
+    df = get_table(
+        "putus_sekolah",
+        ["id_tahun", "jumlah_putus_sekolah"]
     ).sort_values("id_tahun")
     
     # Hitung perubahan
@@ -69,5 +70,6 @@ def app():
         use_container_width=True,
         hide_index=True
     )
+    table_download("putus_sekolah")
 
     st.write("*% perubahan : presentase perubahan jumlah anak putus sekolah dari data sebelumnya")
\ No newline at end of file
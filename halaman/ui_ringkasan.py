@@ -0,0 +1,64 @@
+import streamlit as st
+from datetime import datetime
+from snapshot import get_snapshot
+
+# (tabel, kolom nilai, label) yang ditampilkan di halaman ringkasan
+RINGKASAN = [
+    ("penduduk_tahunan", "jumlah_penduduk", "Jumlah Penduduk"),
+    ("keluarga", "jumlah_kepala_keluarga", "Kepala Keluarga"),
+    ("migrasi", "migrasi_masuk", "Migrasi Masuk"),
+    ("migrasi", "migrasi_keluar", "Migrasi Keluar"),
+    ("status_perkawinan", "status_kawin", "Status Kawin"),
+    ("status_perkawinan", "cerai_hidup", "Cerai Hidup"),
+    ("putus_sekolah", "jumlah_putus_sekolah", "Anak Putus Sekolah"),
+]
+
+def latest_values(df, column):
+    """Nilai tahun terakhir dan selisihnya terhadap tahun sebelumnya"""
+    if df.empty or column not in df.columns:
+        return None, None, None
+    series = df.sort_values("id_tahun")[["id_tahun", column]].dropna()
+    if series.empty:
+        return None, None, None
+    last = series.iloc[-1]
+    delta = last[column] - series.iloc[-2][column] if len(series) > 1 else None
+    return int(last["id_tahun"]), last[column], delta
+
+def app():
+    st.header("Ringkasan Data Kecamatan Sidareja")
+
+    # Semua angka berasal dari satu snapshot yang dipakai bersama seluruh pengunjung
+    snapshot = get_snapshot()
+    st.caption(
+        f"Snapshot versi {snapshot.version}, diperbarui "
+        f"{datetime.fromtimestamp(snapshot.built_at).strftime('%d-%m-%Y %H:%M')}"
+    )
+
+    cols = st.columns(3)
+    for i, (table_name, column, label) in enumerate(RINGKASAN):
+        tahun, value, delta = latest_values(snapshot.tables[table_name], column)
+        with cols[i % 3]:
+            if value is None:
+                st.metric(label, "-")
+            else:
+                st.metric(
+                    f"{label} ({tahun})",
+                    f"{value:,.0f}",
+                    None if delta is None else f"{delta:+,.0f}"
+                )
+
+    # Komposisi kelompok umur tahun terakhir
+    df_usia = snapshot.tables["penduduk_usia"]
+    if not df_usia.empty and {"id_tahun", "kategori_usia", "total"}.issubset(df_usia.columns):
+        last_year = df_usia["id_tahun"].max()
+        komposisi = (
+            df_usia[df_usia["id_tahun"] == last_year][["kategori_usia", "laki_laki", "perempuan", "total"]]
+            .rename(columns={
+                "kategori_usia": "Kelompok Umur",
+                "laki_laki": "Laki-laki",
+                "perempuan": "Perempuan",
+                "total": "Total"
+            })
+        )
+        st.subheader(f"Komposisi Kelompok Umur {int(last_year)}")
+        st.dataframe(komposisi, use_container_width=True, hide_index=True)
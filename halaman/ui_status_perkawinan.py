@@ -3,15 +3,16 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import numpy as np
-from model import fetch_data, train_svm_model, predict_population
+from model import train_svm_model, predict_population
+from snapshot import get_table
+from halaman.unduh import table_download
 
 def app():
  
     # ======= DATA PREPARATION ======= 
-    df = fetch_data(
-        table_name="status_perkawinan",
-        feature_columns=["id_tahun"],
-        target_columns=["status_kawin", "cerai_hidup"]
+    df = get_table(
+        "status_perkawinan",
+        ["id_tahun", "status_kawin", "cerai_hidup"]
     ).sort_values("id_tahun")
     
     # Hitung perubahan
@@ -61,6 +62,7 @@ def app():
         use_container_width=True,
         hide_index=True
     )
+    table_download("status_perkawinan")
 
     st.write("*% Δ Kawin : presentase perubahan jumlah status kawin dari data sebelumnya")
     st.write("*% Δ Cerai : presentase perubahan jumlah status cerai dari data sebelumnya")
\ No newline at end of file
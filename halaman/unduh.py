@@ -0,0 +1,26 @@
+import streamlit as st
+from export import FORMATS, export_frame, export_table, file_name, mime_type
+
+def _buttons(name, make):
+    """Satu tombol unduh per format; make(fmt) menghasilkan bytes file"""
+    cols = st.columns(len(FORMATS) + 2)
+    cols[0].caption("Unduh data:")
+    for col, fmt in zip(cols[1:], FORMATS):
+        with col:
+            try:
+                data = make(fmt)
+            except ValueError as e:
+                st.button(fmt.upper(), disabled=True, help=str(e), key=f"unduh_{name}_{fmt}")
+                continue
+            st.download_button(fmt.upper(), data=data, file_name=file_name(name, fmt), mime=mime_type(fmt), key=f"unduh_{name}_{fmt}")
+
+def table_download(table_name):
+    """Tombol unduh untuk satu tabel replika"""
+    _buttons(table_name, lambda fmt: export_table(table_name, fmt))
+
+def frame_download(df, name, source, version):
+    """
+    Tombol unduh untuk DataFrame hasil olahan (misal prediksi), di-cache per source dan version.
+    version harus mengikuti data yang benar-benar dipakai df (versi snapshot/rollup, pengaturan aktif).
+    """
+    _buttons(name, lambda fmt: export_frame(df, fmt, source=source, version=version))
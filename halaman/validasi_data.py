@@ -0,0 +1,40 @@
+import streamlit as st
+from validator import RULES, validate_all
+
+def app():
+    st.header("Validasi Data")
+    st.write("Pemeriksaan konsistensi antar tabel untuk seluruh data, termasuk perubahan yang masih di antrean.")
+
+    try:
+        report = validate_all()
+    except Exception as e:
+        st.error(f"Gagal memeriksa data: {str(e)}")
+        st.stop()
+
+    counts = report["aturan"].value_counts()
+    for name, rule in RULES.items():
+        count = int(counts.get(name, 0))
+        status = "✅" if count == 0 else ("❌" if rule.blocking else "⚠️")
+        st.write(f"{status} {rule.description}: **{count}** pelanggaran")
+
+    if report.empty:
+        st.success("Semua data konsisten.")
+        return
+
+    st.caption("❌ memblokir penyimpanan yang menimbulkan pelanggaran baru pada tahun yang sebelumnya konsisten "
+               "(aturan antar tabel hanya saat menambah data satu tahun atau impor; ubah/hapus satu baris "
+               "mendapat peringatan), ⚠️ hanya dilaporkan.")
+    st.dataframe(
+        report.drop(columns=["blocking"]).rename(columns={
+            "aturan": "Aturan",
+            "tabel": "Tabel",
+            "id_tahun": "Tahun",
+            "kategori_usia": "Kelompok Umur",
+            "kolom": "Kolom",
+            "nilai": "Nilai",
+            "pembanding": "Seharusnya",
+            "selisih": "Selisih",
+        }),
+        use_container_width=True,
+        hide_index=True
+    )
@@ -0,0 +1,68 @@
+import numpy as np
+
+from settings import get_settings
+
+# Interval prediksi dari residual backtest rolling-origin (lihat backtest.rolling_origin).
+# Semua deret dan horizon dihitung sekaligus: residual ditumpuk menjadi array
+# (deret x horizon x residual) dengan NaN sebagai pengisi, tanpa melatih ulang model.
+
+
+def residual_array(backtests, horizons):
+    """
+    Tumpuk residual (aktual - prediksi) dari beberapa hasil rolling_origin
+    menjadi array (deret x horizon x residual), diisi NaN jika jumlahnya berbeda.
+    """
+    per_series = [
+        [(bt.loc[bt["horizon"] == h, "aktual"] - bt.loc[bt["horizon"] == h, "prediksi"]).to_numpy() for h in horizons]
+        for bt in backtests
+    ]
+    width = max([len(r) for series in per_series for r in series] + [1])
+    out = np.full((len(backtests), len(horizons), width), np.nan)
+    for i, series in enumerate(per_series):
+        for j, r in enumerate(series):
+            out[i, j, :len(r)] = r
+    return out
+
+
+def conformal_min_size(level):
+    """Jumlah residual minimum agar kuantil conformal tingkat level tidak melewati residual terbesar"""
+    return int(np.ceil(level / (1 - level) - 1e-9))
+
+
+def prediction_intervals(points, residuals, level=None, method="conformal", n_resamples=None, seed=0):
+    """
+    Batas bawah dan atas untuk points (deret x horizon).
+
+    method="conformal": split conformal per (deret, horizon): titik prediksi ± residual absolut
+    ke-ceil((n+1)·level) terkecil (koreksi sampel hingga). Jika n < conformal_min_size(level)
+    peringkat itu melewati n, sehingga interval dilebarkan menjadi ± residual absolut terbesar.
+    method="bootstrap": residual diambil ulang n_resamples kali per (deret, horizon) lalu diambil kuantilnya.
+    Deret/horizon tanpa residual mendapat interval NaN.
+    """
+    settings = get_settings()
+    level = settings.interval_level if level is None else level
+    n_resamples = settings.interval_resamples if n_resamples is None else n_resamples
+    points = np.asarray(points, dtype=float)
+    residuals = np.asarray(residuals, dtype=float)
+    q = [(1 - level) / 2, (1 + level) / 2]
+
+    counts = (~np.isnan(residuals)).sum(axis=-1)
+    if method == "bootstrap":
+        # NaN diurutkan ke belakang, sehingga indeks < counts selalu menunjuk residual yang valid
+        ordered = np.sort(residuals, axis=-1)
+        rng = np.random.default_rng(seed)
+        idx = (rng.random(points.shape + (n_resamples,)) * np.maximum(counts, 1)[..., None]).astype(int)
+        samples = np.take_along_axis(ordered, idx, axis=-1)
+        samples[counts == 0] = np.nan
+        lower, upper = np.quantile(samples, q, axis=-1)
+    elif method == "conformal":
+        # NaN diurutkan ke belakang; peringkat k dibatasi n (= ± residual absolut terbesar)
+        ordered = np.sort(np.abs(residuals), axis=-1)
+        rank = np.ceil((counts + 1) * level - 1e-9).astype(int)
+        idx = np.clip(np.minimum(rank, counts) - 1, 0, None)
+        width = np.take_along_axis(ordered, idx[..., None], axis=-1)[..., 0]
+        width[counts == 0] = np.nan
+        lower, upper = -width, width
+    else:
+        raise ValueError(f"Metode interval tidak dikenal: {method}")
+    return points + lower, points + upper
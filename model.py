@@ -1,13 +1,18 @@
+from collections import OrderedDict
 import numpy as np
 import pandas as pd
 from supabase import create_client, Client
 from sklearn.svm import SVR
-from sklearn.model_selection import train_test_split, GridSearchCV, TimeSeriesSplit, cross_val_score, KFold
+from sklearn.model_selection import train_test_split, GridSearchCV, TimeSeriesSplit
 from sklearn.metrics import mean_absolute_error, mean_absolute_percentage_error, r2_score
 from sklearn.preprocessing import PolynomialFeatures, StandardScaler
 from sklearn.pipeline import Pipeline
 import os
 from dotenv import load_dotenv
+from settings import get_settings
+from frames import canonical
+from replica import REPLICATED_TABLES, read_table
+from backtest import MIN_TRAIN_SIZE, rolling_origin, fingerprint, cache_get, cache_put
 
 load_dotenv()
 
@@ -16,13 +21,198 @@ SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv('SUPABASE_KEY')
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
+_model_cache = OrderedDict()  # fingerprint seluruh data -> (model, mae, mape, r2)
+
+class ClosedFormLinearSVR:
+    """
+    Least-squares SVR berkernel linear pada fitur yang distandarisasi.
+    Dengan satu fitur (id_tahun) solusinya tertutup:
+        w = sum(z * (y - mean_y)) / (sum(z^2) + 1/C),  b = mean_y
+    Dipakai sebagai jalur cepat pengganti Pipeline(StandardScaler, SVR(kernel='linear')).
+    """
+    def __init__(self, C):
+        self.C = C
+
+    def fit(self, X, y):
+        X = np.asarray(X, dtype=float)
+        y = np.asarray(y, dtype=float)
+        self.mean_ = X.mean(axis=0)
+        self.scale_ = X.std(axis=0)
+        self.scale_[self.scale_ == 0] = 1.0
+        z = (X - self.mean_) / self.scale_
+        self.intercept_ = y.mean()
+        self.coef_ = np.linalg.solve(z.T @ z + np.eye(z.shape[1]) / self.C, z.T @ (y - self.intercept_))
+        return self
+
+    def predict(self, X):
+        z = (np.asarray(X, dtype=float) - self.mean_) / self.scale_
+        return z @ self.coef_ + self.intercept_
+
+def _build_model(fast=False):
+    settings = get_settings()
+    if fast:
+        return ClosedFormLinearSVR(C=settings.svr_c)
+    return Pipeline([
+        ('scaler', StandardScaler()),
+        ('svr', SVR(kernel='linear', C=settings.svr_c, epsilon=settings.svr_epsilon))
+    ])
+
+def estimator_factory(fast=False, backend=None):
+    """
+    (params untuk key cache, fungsi pembuat estimator baru).
+    Backend yang membaca config.yaml mendaftarkan nama field-nya di atribut SETTINGS,
+    agar nilai efektifnya ikut masuk key cache (model lama tidak dipakai setelah config berubah).
+    """
+    settings = get_settings()
+    if backend is None:
+        params = ("closed_form" if fast else "svr", settings.svr_c, settings.svr_epsilon)
+        return params, lambda: _build_model(fast)
+    values = tuple(getattr(settings, name) for name in getattr(backend, "SETTINGS", ()))
+    return (backend.__module__, backend.__name__) + values, backend
+
+def train_incremental(X, y, fast=False, backend=None):
+    """
+    Latih model dengan evaluasi expanding-window satu langkah ke depan:
+    untuk setiap tahun t, model dilatih pada tahun-tahun sebelumnya lalu memprediksi tahun t
+    (backtest.rolling_origin dengan horizon 1). Model per origin di-cache berdasarkan isi
+    prefix datanya, sehingga saat satu tahun baru ditambahkan hanya origin terakhir dan
+    model akhir yang perlu dilatih ulang.
+
+    backend: kelas estimator lain (lihat forecasters.BACKENDS); default SVR / ClosedFormLinearSVR.
+    """
+    order = np.argsort(X[:, 0], kind="stable")
+    X = np.asarray(X, dtype=float)[order]
+    y = np.asarray(y, dtype=float)[order]
+    params, build = estimator_factory(fast, backend)
+
+    full_key = fingerprint(params, X, y)
+    cached = cache_get(_model_cache, full_key)
+    if cached is not None:
+        return cached
+
+    bt = rolling_origin(X, y, build, params, horizons=(1,))
+    y_true, y_pred = bt["aktual"].values, bt["prediksi"].values
+
+    model = build().fit(X, y)
+    mape = mean_absolute_percentage_error(y, model.predict(X)) * 100
+    if len(y_true):
+        mae = mean_absolute_error(y_true, y_pred)
+        r2 = r2_score(y_true, y_pred) if len(y_true) > 1 else float("nan")
+    else:
+        mae, r2 = float("nan"), float("nan")
+
+    print(f"Incremental fit: {bt.attrs['fitted']} origin dilatih, {bt.attrs['reused']} origin dari cache")
+    result = (model, mae, mape, r2)
+    cache_put(_model_cache, full_key, result)
+    return result
+
+# Grid untuk mode tuning (train_svm_model(tune=True))
+PARAM_GRID = {
+    'poly__degree': [1, 2],
+    'svr__kernel': ['linear', 'rbf'],
+    'svr__C': [10, 100, 250, 1000],
+    'svr__epsilon': [0.001, 0.01, 0.1],
+}
+# Jumlah proses paralel untuk pencarian grid (-1 = semua core)
+TUNING_N_JOBS = -1
+# Jumlah tahun uji per fold TimeSeriesSplit; dengan 1 tahun R² tidak terdefinisi
+TUNING_TEST_SIZE = 2
+# Tahun minimum agar ada 2 fold uji setelah tahun latih minimum backtest
+MIN_TUNING_SIZE = MIN_TRAIN_SIZE + 2 * TUNING_TEST_SIZE
+
+_tuning_cache = OrderedDict()  # fingerprint data -> (model, mae, mape, r2)
+
+def _search(X, y):
+    """GridSearchCV (dipilih dengan MAE, R² ikut dicatat) yang sudah di-fit pada X, y saja"""
+    pipeline = Pipeline([
+        ('scaler', StandardScaler()),
+        ('poly', PolynomialFeatures(include_bias=False)),
+        ('svr', SVR())
+    ])
+    search = GridSearchCV(
+        pipeline,
+        PARAM_GRID,
+        cv=TimeSeriesSplit(n_splits=min(3, (len(y) - MIN_TRAIN_SIZE) // TUNING_TEST_SIZE), test_size=TUNING_TEST_SIZE),
+        scoring={'mae': 'neg_mean_absolute_error', 'r2': 'r2'},
+        refit='mae',
+        n_jobs=TUNING_N_JOBS,
+        error_score=np.nan,
+    )
+    return search.fit(X, y)
+
+class TunedSVR:
+    """
+    Estimator yang menjalankan tuning pada data latihnya sendiri saat fit.
+    Dipakai untuk backtest svr_tuned: setiap origin memilih hyperparameter hanya dari
+    tahun-tahun sebelum origin, sehingga tahun uji tidak ikut menentukan hyperparameter.
+    Data yang terlalu pendek untuk tuning memakai SVR dengan parameter config.yaml.
+    """
+    def fit(self, X, y):
+        if len(y) < MIN_TUNING_SIZE:
+            self.best_params = None
+            self.model_ = _build_model().fit(X, y)
+        else:
+            search = _search(X, y)
+            self.best_params = search.best_params_
+            self.model_ = search.best_estimator_
+        return self
+
+    def predict(self, X):
+        return self.model_.predict(X)
+
+def tuned_params():
+    """Identitas TunedSVR untuk key cache backtest: grid, ukuran fold, dan parameter cadangan"""
+    settings = get_settings()
+    return ("svr_tuned", sorted(PARAM_GRID.items()), TUNING_TEST_SIZE, settings.svr_c, settings.svr_epsilon)
+
+def tune_svm_model(X, y):
+    """
+    Cari C, epsilon, kernel, dan derajat polinomial terbaik dengan TimeSeriesSplit
+    (fold uji selalu tahun-tahun setelah fold latih, skor MAE), dijalankan paralel di beberapa proses.
+    MAE dan R² yang dikembalikan berasal dari backtest rolling-origin satu tahun ke depan seperti
+    backend lain, dengan tuning diulang di setiap origin (TunedSVR).
+    Hasil di-cache berdasarkan isi data sehingga pencarian hanya dilakukan saat data berubah.
+    Model yang dikembalikan membawa best_params, cv_mae_mean, cv_mae_std, cv_r2_mean, dan cv_r2_std
+    (R² terdefinisi karena setiap fold uji berisi TUNING_TEST_SIZE tahun).
+    """
+    order = np.argsort(X[:, 0], kind="stable")
+    X = np.asarray(X, dtype=float)[order]
+    y = np.asarray(y, dtype=float)[order]
+
+    key = fingerprint(tuned_params(), X, y)
+    cached = cache_get(_tuning_cache, key)
+    if cached is not None:
+        return cached
+
+    search = _search(X, y)
+    best = search.best_index_
+    model = search.best_estimator_
+    model.best_params = search.best_params_
+    model.cv_mae_mean = -search.cv_results_['mean_test_mae'][best]
+    model.cv_mae_std = search.cv_results_['std_test_mae'][best]
+    model.cv_r2_mean = search.cv_results_['mean_test_r2'][best]
+    model.cv_r2_std = search.cv_results_['std_test_r2'][best]
+
+    bt = rolling_origin(X, y, TunedSVR, tuned_params(), horizons=(1,))
+    y_true, y_pred = bt["aktual"].values, bt["prediksi"].values
+    mae = mean_absolute_error(y_true, y_pred) if len(y_true) else float("nan")
+    r2 = r2_score(y_true, y_pred) if len(y_true) > 1 else float("nan")
+    mape = mean_absolute_percentage_error(y, model.predict(X)) * 100
+
+    print(f"Tuning: {len(search.cv_results_['params'])} kombinasi, terbaik {model.best_params}")
+    result = (model, mae, mape, r2)
+    cache_put(_tuning_cache, key, result)
+    return result
+
 def fetch_data(table_name, feature_columns, target_columns):
     try:
-        # Fetch data from Supabase
-        response = supabase.table(table_name).select("*").execute()
+        # Tabel sensus dibaca dari replika lokal, tabel lain langsung dari Supabase
+        if table_name in REPLICATED_TABLES:
+            df = read_table(table_name)
+        else:
+            df = canonical(pd.DataFrame(supabase.table(table_name).select("*").execute().data))
         
-        if response.data:
-            df = pd.DataFrame(response.data)
+        if not df.empty:
             
             # Ensure all required columns exist
             required_columns = feature_columns + target_columns
@@ -39,11 +229,17 @@ def fetch_data(table_name, feature_columns, target_columns):
         print(f"Error fetching data from {table_name}: {str(e)}")
         raise
 
-def train_svm_model(feature_columns, target_column, data=None, table_name=None, filter_condition=None):
+def train_svm_model(feature_columns, target_column, data=None, table_name=None, filter_condition=None,
+                    incremental=False, fast=False, tune=False):
     """
     Versi fleksibel yang bisa terima:
     - DataFrame langsung (data)
     - Atau query dari Supabase (table_name + filter_condition)
+
+    Evaluasi selalu memakai train_incremental (backtest rolling-origin, fold di-cache per
+    prefix data); incremental dipertahankan untuk kompatibilitas pemanggil lama.
+    fast=True memakai ClosedFormLinearSVR sebagai pengganti SVR;
+    tune=True mencari hyperparameter terbaik dulu (lihat tune_svm_model).
     """
     try:
         # Get data
@@ -58,32 +254,17 @@ def train_svm_model(feature_columns, target_column, data=None, table_name=None,
         X = df[feature_columns].values
         y = df[target_column].values
         
-        model = Pipeline([
-        ('scaler', StandardScaler()),
-        ('svr', SVR(kernel='linear', C=250, epsilon=0.01))
-        ])
-        
-        # Cross-Validation untuk evaluasi
-        kfold = KFold(n_splits=3, shuffle=True, random_state=42)
-        mae_scores = -cross_val_score(model, X, y, cv=kfold, scoring='neg_mean_absolute_error')
-        r2_scores = cross_val_score(model, X, y, cv=kfold, scoring='r2')
-        
-        # Calculate metrics
-        mae = mae_scores.mean()
-        r2 = r2_scores.mean()
-        
-        # Calculate MAPE manually
-        model.fit(X, y)
-        y_pred = model.predict(X)
-        mape = mean_absolute_percentage_error(y, y_pred) * 100
+        if tune and len(y) >= MIN_TUNING_SIZE:
+            return tune_svm_model(X, y)
+        # Evaluasi rolling-origin satu tahun ke depan: data latih selalu tahun-tahun sebelum
+        # tahun uji (KFold acak akan membocorkan tahun masa depan ke data latih).
+        model, mae, mape, r2 = train_incremental(X, y, fast=fast)
         
-        print("Cross-Validation Results:")
-        print(f"MAE: {mae:.2f} (±{mae_scores.std():.2f})")
+        print("Backtest Results (rolling origin, 1 tahun ke depan):")
+        print(f"MAE: {mae:.2f}")
         print(f"MAPE: {mape:.2f}%")
-        print(f"R²: {r2:.4f} (±{r2_scores.std():.4f})")
+        print(f"R²: {r2:.4f}")
         
-        # Latih model dengan seluruh data untuk penggunaan akhir
-        model.fit(X, y)
         return model, mae, mape, r2
         
     except Exception as e:
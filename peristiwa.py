@@ -0,0 +1,185 @@
+import threading
+import time
+import uuid
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from data_access import fetch_paged
+from forecasters import train_model
+from model import predict_population
+from settings import get_settings
+from write_queue import enqueue_many, pending_writes
+
+# Subsistem kelahiran dan kematian.
+# Setiap peristiwa disimpan per orang di tabel peristiwa_penduduk (kolom ringkas: tanggal +
+# smallint). Rekap harian, bulanan, dan tahunan per desa diperbarui inkremental oleh trigger
+# database (lihat sql/peristiwa_penduduk.sql), jadi semua angka di aplikasi diambil dari
+# rekap, tidak pernah dari pemindaian tabel peristiwa.
+
+EVENT_TABLE = "peristiwa_penduduk"
+DIMENSIONS = ["id_desa", "jenis", "jenis_kelamin"]
+ROLLUPS = {
+    "harian": ("rekap_peristiwa_harian", ["tanggal"]),
+    "bulanan": ("rekap_peristiwa_bulanan", ["id_tahun", "bulan"]),
+    "tahunan": ("rekap_peristiwa_tahunan", ["id_tahun"]),
+}
+JENIS = {1: "Kelahiran", 2: "Kematian"}
+JENIS_KELAMIN = {1: "Laki-laki", 2: "Perempuan"}
+DESA = {
+    1: "Tinggarjaya", 2: "Sidareja", 3: "Sidamulya", 4: "Kunci", 5: "Karanggedang",
+    6: "Penyarang", 7: "Tegalsari", 8: "Margasari", 9: "Gunungreja", 10: "Sudagaran",
+}
+# Tipe kolom ringkas untuk rekap di memori
+DTYPES = {"id_tahun": "int16", "bulan": "int8", "id_desa": "int16", "jenis": "int8", "jenis_kelamin": "int8", "jumlah": "int32"}
+
+_lock = threading.Lock()
+_cache = {}                 # (level, sejak) -> (waktu ambil, jumlah tertunda, DataFrame rekap dari server, nomor ambil)
+_state = {"version": 0}
+
+
+def _compact(df, level):
+    columns = ROLLUPS[level][1] + DIMENSIONS + ["jumlah"]
+    if df.empty:
+        df = pd.DataFrame(columns=columns)
+    df = df[columns]
+    if "tanggal" in df.columns:
+        df = df.assign(tanggal=pd.to_datetime(df["tanggal"]))
+    return df.astype({c: t for c, t in DTYPES.items() if c in df.columns})
+
+
+def _fetch_rollup(level, since=None):
+    table_name, period = ROLLUPS[level]
+    filters = [("gte", "tanggal", since.isoformat())] if since is not None and level == "harian" else []
+    records = fetch_paged(table_name, ", ".join(period + DIMENSIONS + ["jumlah"]), order=period + DIMENSIONS, filters=filters)
+    return _compact(pd.DataFrame(records), level)
+
+
+def _pending_events():
+    """Peristiwa yang masih di antrean tulis, agar admin langsung melihat data yang baru dicatat"""
+    pending = pending_writes(EVENT_TABLE)
+    pending = pending[(pending["op"] == "insert") & (pending["status"] == "pending")]
+    if pending.empty:
+        return pd.DataFrame(columns=["tanggal"] + DIMENSIONS)
+    events = pd.DataFrame(list(pending["values"]))
+    return events.assign(tanggal=pd.to_datetime(events["tanggal"]))
+
+
+def _aggregate(events, level):
+    """Rekap peristiwa mentah ke tingkat level (hanya dipakai untuk peristiwa yang tertunda)"""
+    if level == "harian":
+        keys = events.assign(tanggal=events["tanggal"].dt.normalize())
+    else:
+        keys = events.assign(id_tahun=events["tanggal"].dt.year)
+        if level == "bulanan":
+            keys = keys.assign(bulan=events["tanggal"].dt.month)
+    group = ROLLUPS[level][1] + DIMENSIONS
+    return _compact(keys.groupby(group, as_index=False).size().rename(columns={"size": "jumlah"}), level)
+
+
+def read_rollup_version(level, since=None):
+    """
+    Rekap peristiwa untuk level harian/bulanan/tahunan, ditambah peristiwa yang belum terkirim.
+    Rekap dari server di-cache selama snapshot_ttl_seconds, atau sampai ada peristiwa
+    tertunda yang terkirim (saat itu rekap server sudah memuatnya).
+    since: untuk level harian, hanya ambil tanggal >= since.
+    Mengembalikan (DataFrame, versi); versi = (nomor ambil rekap ini, jumlah peristiwa tertunda),
+    dibaca bersamaan dengan datanya sehingga aman dipakai sebagai versi cache grafik/unduhan.
+    """
+    if level not in ROLLUPS:
+        raise ValueError(f"Level rekap tidak dikenal: {level}")
+    events = _pending_events()
+    key = (level, since)
+    with _lock:
+        cached = _cache.get(key)
+    if (cached is None or len(events) < cached[1]
+            or time.time() - cached[0] > get_settings().snapshot_ttl_seconds):
+        rollup = _fetch_rollup(level, since)
+        with _lock:
+            _state["version"] += 1
+            cached = (time.time(), len(events), rollup, _state["version"])
+            # Jendela since yang lama (hari sebelumnya) tidak dipakai lagi
+            for stale in [k for k in _cache if k[0] == level and k[1] is not None and k != key]:
+                del _cache[stale]
+            _cache[key] = cached
+
+    rollup, version = cached[2], (cached[3], len(events))
+    if since is not None and level == "harian":
+        events = events[events["tanggal"] >= pd.Timestamp(since)]
+    if events.empty:
+        return rollup, version
+    group = ROLLUPS[level][1] + DIMENSIONS
+    combined = pd.concat([rollup, _aggregate(events, level)], ignore_index=True)
+    return _compact(combined.groupby(group, as_index=False)["jumlah"].sum(), level), version
+
+
+def read_rollup(level, since=None):
+    """Rekap peristiwa tanpa versinya (lihat read_rollup_version)"""
+    return read_rollup_version(level, since)[0]
+
+
+def invalidate():
+    with _lock:
+        _cache.clear()
+
+
+def series(level, jenis, id_desa=None, rollup=None):
+    """
+    Jumlah peristiwa jenis tertentu per periode (semua desa, atau satu desa).
+    rollup: hasil read_rollup(level) yang sudah dibaca; jika None, dibaca di sini.
+    """
+    if rollup is None:
+        rollup = read_rollup(level)
+    mask = rollup["jenis"] == jenis
+    if id_desa is not None:
+        mask &= rollup["id_desa"] == id_desa
+    period = ROLLUPS[level][1]
+    return rollup[mask].groupby(period, as_index=False)["jumlah"].sum()
+
+
+def record_events(events):
+    """
+    Catat peristiwa baru. events: DataFrame dengan kolom tanggal, id_desa, jenis, jenis_kelamin
+    (satu baris = satu orang). Validasi dilakukan per kolom; seluruh baris masuk antrean
+    tulis dalam satu transaksi.
+    """
+    events = events.copy()
+    events["tanggal"] = pd.to_datetime(events["tanggal"], errors="coerce")
+    invalid = (
+        events["tanggal"].isna()
+        | (events["tanggal"] > pd.Timestamp(date.today()))
+        | ~events["id_desa"].isin(list(DESA))
+        | ~events["jenis"].isin(list(JENIS))
+        | ~events["jenis_kelamin"].isin(list(JENIS_KELAMIN))
+    )
+    if invalid.any():
+        raise ValueError(f"{int(invalid.sum())} peristiwa tidak valid (tanggal, desa, jenis, atau jenis kelamin)")
+
+    entries = [
+        ({"id": str(uuid.uuid4())}, "insert", {
+            "tanggal": row["tanggal"].date().isoformat(),
+            "id_desa": int(row["id_desa"]),
+            "jenis": int(row["jenis"]),
+            "jenis_kelamin": int(row["jenis_kelamin"]),
+        })
+        for row in events.to_dict("records")
+    ]
+    enqueue_many(EVENT_TABLE, entries)
+    return len(entries)
+
+
+def forecast_yearly(jenis, backend="svr", horizon=3):
+    """
+    Prediksi jumlah peristiwa per tahun dengan backend dari forecasters/model.py.
+    Tahun berjalan tidak ikut dilatih karena datanya belum lengkap.
+    Mengembalikan (DataFrame tahun & prediksi, mae, mape, r2).
+    """
+    yearly = series("tahunan", jenis)
+    yearly = yearly[yearly["id_tahun"] < date.today().year].astype({"id_tahun": int, "jumlah": float})
+    if len(yearly) < 3:
+        raise ValueError("Butuh minimal 3 tahun lengkap untuk membuat prediksi")
+    model, mae, mape, r2 = train_model(["id_tahun"], "jumlah", yearly, backend=backend)
+    next_years = np.arange(1, horizon + 1) + yearly["id_tahun"].max()
+    predictions = predict_population(next_years.reshape(-1, 1), model)
+    return pd.DataFrame({"id_tahun": next_years, "prediksi": predictions}), mae, mape, r2
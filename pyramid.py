@@ -0,0 +1,126 @@
+import re
+import threading
+
+import numpy as np
+import plotly.graph_objects as go
+
+from figure_cache import cached_figure_json
+from snapshot import get_table_version
+
+# Piramida penduduk dari tabel penduduk_usia.
+# Array batang per tahun dihitung sekali per versi data, lalu JSON figure per
+# (tahun, pengelompokan) dan figure animasi di-cache lewat figure_cache, sehingga
+# halaman piramida tidak perlu membaca file atau membangun figure ulang untuk setiap pengunjung.
+
+GROUPINGS = {
+    "jumlah": "Jumlah Penduduk",
+    "persen": "Persentase dari Total (%)",
+}
+MALE_COLOR = "blue"
+FEMALE_COLOR = "pink"
+
+_lock = threading.Lock()
+_arrays = {"version": None, "value": None}
+
+
+def _age_order(category):
+    match = re.match(r"\d+", str(category))
+    return int(match.group()) if match else float("inf")
+
+
+def pyramid_arrays():
+    """
+    (tahun, kelompok umur, laki-laki, perempuan) dengan laki-laki/perempuan berbentuk
+    (tahun x kelompok umur). Dihitung ulang hanya jika versi data berubah.
+    """
+    return _versioned_arrays()[1]
+
+
+def _versioned_arrays():
+    """(source_version snapshot, hasil pyramid_arrays) agar key cache figure sesuai data yang dipakai"""
+    df, version = get_table_version("penduduk_usia", ["id_tahun", "kategori_usia", "laki_laki", "perempuan"])
+    with _lock:
+        if _arrays["version"] == version:
+            return version, _arrays["value"]
+
+    wide = df.pivot_table(index="id_tahun", columns="kategori_usia", values=["laki_laki", "perempuan"], aggfunc="sum", observed=True)
+    groups = sorted(wide.columns.get_level_values(1).unique(), key=_age_order)
+    wide = wide.reindex(columns=[(sex, g) for sex in ("laki_laki", "perempuan") for g in groups]).fillna(0).sort_index()
+    values = wide.to_numpy(dtype=float).reshape(len(wide), 2, len(groups))
+    value = (wide.index.to_numpy(dtype=int), groups, values[:, 0], values[:, 1])
+    with _lock:
+        _arrays["version"], _arrays["value"] = version, value
+    return version, value
+
+
+def _scaled(male, female, grouping):
+    if grouping == "persen":
+        total = (male.sum(axis=-1) + female.sum(axis=-1))[..., None]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.nan_to_num(male / total * 100), np.nan_to_num(female / total * 100)
+    return male, female
+
+
+def _traces(groups, male, female):
+    return [
+        go.Bar(y=groups, x=-male, customdata=male, name="Laki-laki", orientation="h", marker_color=MALE_COLOR,
+               hovertemplate="%{y}: %{customdata:,.0f}<extra>Laki-laki</extra>"),
+        go.Bar(y=groups, x=female, customdata=female, name="Perempuan", orientation="h", marker_color=FEMALE_COLOR,
+               hovertemplate="%{y}: %{customdata:,.0f}<extra>Perempuan</extra>"),
+    ]
+
+
+def _layout(fig, title, limit, grouping):
+    ticks = np.linspace(-limit, limit, 5)
+    fig.update_layout(
+        title=title,
+        barmode="overlay",
+        bargap=0.1,
+        xaxis=dict(title=GROUPINGS[grouping], range=[-limit * 1.05, limit * 1.05],
+                   tickvals=ticks, ticktext=[f"{abs(t):,.0f}" for t in ticks]),
+        yaxis=dict(title="Kelompok Usia"),
+        legend=dict(title="Jenis Kelamin"),
+        template="plotly_white",
+    )
+    return fig
+
+
+def pyramid_json(year, grouping="jumlah"):
+    """JSON figure piramida satu tahun"""
+    version, (years, groups, male, female) = _versioned_arrays()
+    i = int(np.searchsorted(years, year))
+    if i >= len(years) or years[i] != year:
+        raise ValueError(f"Tidak ada data kelompok umur untuk tahun {year}")
+
+    def build():
+        m, f = _scaled(male[i], female[i], grouping)
+        fig = go.Figure(_traces(groups, m, f))
+        return _layout(fig, f"Piramida Penduduk Tahun {year}", max(m.max(), f.max(), 1), grouping)
+
+    return cached_figure_json("piramida", (int(year), grouping), build, version)
+
+
+def animated_pyramid_json(grouping="jumlah"):
+    """JSON figure piramida dengan satu frame per tahun dan slider animasi"""
+    version, (years, groups, male, female) = _versioned_arrays()
+    if len(years) == 0:
+        raise ValueError("Data penduduk per kelompok umur kosong")
+
+    def build():
+        m, f = _scaled(male, female, grouping)
+        frames = [go.Frame(data=_traces(groups, m[i], f[i]), name=str(year)) for i, year in enumerate(years)]
+        fig = go.Figure(data=frames[0].data, frames=frames)
+        _layout(fig, "Piramida Penduduk per Tahun", max(m.max(), f.max(), 1), grouping)
+        fig.update_layout(
+            updatemenus=[dict(type="buttons", showactive=False, buttons=[
+                dict(label="▶", method="animate", args=[None, {"frame": {"duration": 700, "redraw": True}, "fromcurrent": True}]),
+                dict(label="⏸", method="animate", args=[[None], {"frame": {"duration": 0}, "mode": "immediate"}]),
+            ])],
+            sliders=[dict(currentvalue={"prefix": "Tahun: "}, steps=[
+                dict(label=str(year), method="animate", args=[[str(year)], {"frame": {"duration": 0, "redraw": True}, "mode": "immediate"}])
+                for year in years
+            ])],
+        )
+        return fig
+
+    return cached_figure_json("piramida_animasi", grouping, build, version)
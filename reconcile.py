@@ -0,0 +1,58 @@
+import numpy as np
+
+# Rekonsiliasi hierarki prediksi penduduk:
+#   kecamatan (total, laki-laki, perempuan)
+#   -> kelompok umur (total, laki-laki, perempuan)
+#   -> dasar: laki-laki dan perempuan per kelompok umur
+# Prediksi dasar semua node direkonsiliasi sekaligus dengan satu solve kecil,
+# sehingga total = laki-laki + perempuan dan kecamatan = jumlah kelompok umur.
+
+TOP = "Kecamatan"
+SEXES = ("laki_laki", "perempuan")
+
+
+def summing_matrix(groups, include_top=True):
+    """
+    Daftar node (kelompok, kolom) dan matriks penjumlahan S (node x node dasar).
+    Node dasar adalah (kelompok, laki_laki) dan (kelompok, perempuan).
+    """
+    bottom = [(group, sex) for group in groups for sex in SEXES]
+    nodes = [(group, "total") for group in groups]
+    if include_top:
+        nodes = [(TOP, "total")] + [(TOP, sex) for sex in SEXES] + nodes
+    nodes += bottom
+
+    S = np.zeros((len(nodes), len(bottom)))
+    for i, (group, col) in enumerate(nodes):
+        for j, (b_group, b_sex) in enumerate(bottom):
+            S[i, j] = (group in (TOP, b_group)) and col in ("total", b_sex)
+    return nodes, S
+
+
+def reconcile(base, S, method="mint", variances=None):
+    """
+    Rekonsiliasi prediksi dasar base (node x horizon) terhadap matriks S.
+
+    method="bottom_up": hanya node dasar yang dipakai, node atas = jumlahnya.
+    method="mint": MinT dengan kovarians diagonal (WLS). variances adalah varians residual
+    per node; jika tidak ada (NaN/0) dipakai skala struktural (jumlah node dasar di bawahnya).
+    """
+    base = np.asarray(base, dtype=float)
+    m = S.shape[1]
+    if method == "bottom_up":
+        return S @ base[-m:]
+    if method != "mint":
+        raise ValueError(f"Metode rekonsiliasi tidak dikenal: {method}")
+
+    weights = S.sum(axis=1)
+    if variances is not None:
+        variances = np.asarray(variances, dtype=float)
+        valid = np.isfinite(variances) & (variances > 0)
+        if valid.any():
+            # node tanpa varians memakai skala struktural yang disetarakan dengan node lain
+            scale = np.median(variances[valid] / weights[valid])
+            weights = np.where(valid, variances, weights * scale)
+    w_inv = 1.0 / weights
+    # G = (S' W^-1 S)^-1 S' W^-1, dipakai untuk semua horizon sekaligus
+    G = np.linalg.solve(S.T @ (w_inv[:, None] * S), S.T * w_inv)
+    return S @ (G @ base)
@@ -0,0 +1,218 @@
+import os
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+from data_access import fetch_markers, fetch_rows_after, fetch_tables
+from frames import canonical
+from settings import get_settings
+
+# Tabel sensus yang dibaca lewat replika lokal
+REPLICATED_TABLES = [
+    "penduduk_tahunan",
+    "migrasi",
+    "keluarga",
+    "status_perkawinan",
+    "putus_sekolah",
+    "penduduk_usia",
+    "tahun",
+]
+
+_lock = threading.Lock()       # melindungi _state
+_sync_lock = threading.Lock()  # hanya satu sinkronisasi berjalan pada satu waktu
+_state = {
+    "version": 0,        # naik setiap kali isi replika berubah
+    "polled_at": 0.0,
+    "dirty": set(),      # tabel yang pasti berubah (ditulis lewat aplikasi ini)
+    "syncing": False,
+    "upstream_down": False,  # sinkronisasi terakhir gagal; jangan tunggu upstream lagi
+}
+_frames = {}  # nama tabel -> (versi replika, DataFrame bertipe); dibaca dan dikonversi sekali per versi
+
+
+def _connect():
+    path = get_settings().replica_path
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS _replica_marker ("
+        "table_name TEXT PRIMARY KEY, row_count INTEGER, max_id_tahun INTEGER, full_synced_at REAL)"
+    )
+    return conn
+
+
+def _local_markers(conn):
+    rows = conn.execute("SELECT table_name, row_count, max_id_tahun, full_synced_at FROM _replica_marker")
+    return {name: (count, max_id, synced_at) for name, count, max_id, synced_at in rows}
+
+
+def _table_exists(conn, table_name):
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table_name,)).fetchone()
+    return row is not None
+
+
+def _store(conn, table_name, records, marker, append=False):
+    """Tulis record ke tabel lokal dan perbarui penandanya dalam satu transaksi"""
+    count, max_id = marker
+    with conn:
+        if not append:
+            conn.execute(f'DROP TABLE IF EXISTS "{table_name}"')
+        if records:
+            pd.DataFrame(records).to_sql(table_name, conn, if_exists="append", index=False)
+        if append:
+            conn.execute(
+                "UPDATE _replica_marker SET row_count = ?, max_id_tahun = ? WHERE table_name = ?",
+                (count, max_id, table_name)
+            )
+        else:
+            conn.execute(
+                "INSERT OR REPLACE INTO _replica_marker VALUES (?, ?, ?, ?)",
+                (table_name, count, max_id, time.time())
+            )
+
+
+def sync():
+    """
+    Samakan replika dengan Supabase.
+    Tabel yang hanya bertambah tahun baru diambil inkremental (id_tahun > terakhir);
+    tabel lain yang penandanya berubah, ditandai dirty, atau sudah lewat
+    replica_full_sync_seconds dimuat ulang penuh.
+    """
+    settings = get_settings()
+    dirty = set(_state["dirty"])
+    upstream = fetch_markers(REPLICATED_TABLES)
+
+    conn = _connect()
+    try:
+        local = _local_markers(conn)
+        full, incremental = [], {}
+        for table_name, (count, max_id) in upstream.items():
+            marker = local.get(table_name)
+            if marker is None or table_name in dirty or time.time() - marker[2] > settings.replica_full_sync_seconds:
+                full.append(table_name)
+            elif (marker[0], marker[1]) == (count, max_id):
+                continue
+            elif marker[1] is not None and max_id is not None and max_id > marker[1] and count > marker[0]:
+                incremental[table_name] = marker
+            else:
+                full.append(table_name)
+
+        for table_name, rows in fetch_rows_after({t: m[1] for t, m in incremental.items()}).items():
+            local_count = incremental[table_name][0]
+            if local_count + len(rows) == upstream[table_name][0]:
+                _store(conn, table_name, rows, upstream[table_name], append=True)
+            else:
+                # Ada perubahan selain penambahan tahun baru
+                full.append(table_name)
+
+        for table_name, rows in fetch_tables(full).items():
+            _store(conn, table_name, rows, upstream[table_name])
+    finally:
+        conn.close()
+
+    with _lock:
+        _state["dirty"] -= dirty
+        _state["polled_at"] = time.time()
+        _state["upstream_down"] = False
+        if full or incremental:
+            _state["version"] += 1
+
+
+def _sync_in_background():
+    try:
+        with _sync_lock:
+            sync()
+    except Exception as e:
+        print(f"Gagal sinkronisasi replika, memakai data lokal: {e}")
+        _state["polled_at"] = time.time()
+        _state["upstream_down"] = True
+    finally:
+        _state["syncing"] = False
+
+
+def sync_if_due(table_names=REPLICATED_TABLES):
+    """
+    Jalankan sinkronisasi bila sudah waktunya.
+    Hanya menunggu upstream jika tabel yang dibutuhkan belum pernah direplikasi
+    atau baru saja ditulis oleh admin; selain itu sinkronisasi berjalan di latar
+    dan pembacaan langsung dilayani dari disk lokal. Setelah satu kali gagal,
+    tabel dirty juga dilayani dari disk lokal dan dicoba ulang di latar sampai
+    upstream kembali.
+    """
+    conn = _connect()
+    try:
+        local = _local_markers(conn)
+    finally:
+        conn.close()
+
+    missing = [t for t in table_names if t not in local]
+    dirty = any(t in _state["dirty"] for t in table_names)
+    if missing or (dirty and not _state["upstream_down"]):
+        with _sync_lock:
+            # Session lain mungkin baru saja gagal selagi kita menunggu lock
+            if _state["upstream_down"] and not missing:
+                return
+            try:
+                sync()
+            except Exception as e:
+                if missing:
+                    raise
+                print(f"Gagal sinkronisasi replika, memakai data lokal: {e}")
+                _state["polled_at"] = time.time()
+                _state["upstream_down"] = True
+        return
+
+    if time.time() - _state["polled_at"] < get_settings().replica_poll_seconds:
+        return
+    with _lock:
+        if _state["syncing"]:
+            return
+        _state["syncing"] = True
+    threading.Thread(target=_sync_in_background, name="replica-sync", daemon=True).start()
+
+
+def read_table(table_name):
+    """Baca satu tabel dari replika lokal"""
+    return read_tables([table_name])[table_name]
+
+
+def read_tables(table_names):
+    """
+    Baca beberapa tabel dari replika lokal dengan satu pemeriksaan kesegaran.
+    Hasilnya sudah dalam representasi bertipe (lihat frames.canonical). Tabel dibaca dari
+    disk dan dikonversi sekali per versi replika; pembacaan berikutnya memakai hasil itu
+    (shallow copy, sehingga pemanggil boleh menambah kolom).
+    """
+    sync_if_due(table_names)
+    # Versi diambil sebelum membaca disk: jika sinkronisasi selesai di antaranya, versi
+    # naik sesudahnya dan hasil ini dibuang pada pembacaan berikutnya
+    version = data_version()
+    with _lock:
+        frames = {name: _frames[name][1] for name in table_names if _frames.get(name, (None,))[0] == version}
+    missing = [name for name in table_names if name not in frames]
+    if missing:
+        conn = _connect()
+        try:
+            loaded = {
+                name: canonical(pd.read_sql(f'SELECT * FROM "{name}"', conn)) if _table_exists(conn, name) else pd.DataFrame()
+                for name in missing
+            }
+        finally:
+            conn.close()
+        with _lock:
+            _frames.update((name, (version, df)) for name, df in loaded.items())
+        frames.update(loaded)
+    return {name: frames[name].copy(deep=False) for name in table_names}
+
+
+def mark_dirty(table_name):
+    """Tandai tabel berubah (dipanggil setelah admin menulis) agar pembacaan berikutnya memuat ulang"""
+    with _lock:
+        _state["dirty"].add(table_name)
+
+
+def data_version():
+    """Nomor versi isi replika, berubah setiap ada data baru yang dimuat"""
+    return _state["version"]
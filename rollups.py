@@ -0,0 +1,195 @@
+import os
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from frames import COUNT_DTYPE, YEAR_DTYPE
+from replica import data_version, read_tables
+from write_queue import apply_pending
+
+# Agregat turunan per tahun yang disimpan (materialized) di memori proses.
+# Dibangun penuh sekali per versi replika; setelah itu setiap tulis lewat table_spec atau
+# impor massal hanya memperbarui tahun yang tersentuh (jumlah, % perubahan tahun itu dan
+# tahun sesudahnya). Halaman membaca hasilnya, tidak menghitung ulang setiap rerun.
+# Ada dua tampilan: "committed" hanya dari replika (untuk pengunjung umum), dan tampilan admin
+# yang ikut menumpangkan antrean tulis yang belum terkirim.
+
+
+@dataclass(frozen=True)
+class Rollup:
+    table: str
+    columns: tuple          # kolom yang dijumlahkan per tahun
+    parts: tuple = ()       # kolom bagian ...
+    total: str = None       # ... yang harus berjumlah sama dengan kolom ini
+
+
+ROLLUPS = {
+    "penduduk_tahunan": Rollup("penduduk_tahunan", ("laki_laki", "perempuan", "jumlah_penduduk"),
+                               parts=("laki_laki", "perempuan"), total="jumlah_penduduk"),
+    "penduduk_usia": Rollup("penduduk_usia", ("laki_laki", "perempuan", "total"),
+                            parts=("laki_laki", "perempuan"), total="total"),
+}
+YEAR = "id_tahun"
+# Jumlah penduduk per desa (belum ada tabelnya di database, masih dari file)
+DESA_FILE = os.path.join("data", "penduduk_perdesa.csv")
+
+_lock = threading.Lock()
+_state = {"version": None, "base": {}, "yearly": {}, "committed": {}, "desa": (None, None), "writes": 0}
+
+
+def pct_column(column):
+    return f"pct_{column}"
+
+
+def _counts(df, rollup):
+    columns = [YEAR] + list(rollup.columns)
+    if df.empty:
+        df = pd.DataFrame(columns=columns)
+    counts = {c: COUNT_DTYPE for c in rollup.columns}
+    return df.astype({c: "Int32" for c in rollup.columns}).fillna(dict.fromkeys(rollup.columns, 0)).astype(
+        {YEAR: YEAR_DTYPE, **counts})
+
+
+def _yearly(base, rollup):
+    """Jumlah per tahun dari baris dasar, dengan dtype jumlah yang sama seperti baris dasar (frames)"""
+    yearly = base.groupby(YEAR)[list(rollup.columns)].sum().sort_index()
+    return yearly.astype(COUNT_DTYPE)
+
+
+def _with_pct(yearly, years=None):
+    """Hitung kolom % perubahan tahun-ke-tahun; jika years diberikan hanya untuk tahun itu"""
+    values = yearly[[c for c in yearly.columns if not c.startswith("pct_")]]
+    columns = [pct_column(c) for c in values.columns]
+    if years is None:
+        previous = values.shift(1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            pct = (values - previous) / previous.replace(0, np.nan) * 100
+        pct.columns = columns
+        return values.join(pct)
+
+    positions = yearly.index.get_indexer(sorted(years))
+    positions = positions[positions >= 0]
+    current = values.to_numpy(dtype=float)[positions]
+    previous = np.where((positions > 0)[:, None], values.to_numpy(dtype=float)[np.maximum(positions - 1, 0)], np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct = np.where(previous != 0, (current - previous) / previous * 100, np.nan)
+    yearly = yearly.copy()
+    yearly.iloc[positions, yearly.columns.get_indexer(columns)] = pct
+    return yearly
+
+
+def _build(version):
+    tables = read_tables(list(ROLLUPS))
+    base, yearly, committed = {}, {}, {}
+    for name, rollup in ROLLUPS.items():
+        committed[name] = _with_pct(_yearly(_counts(tables[name], rollup), rollup))
+        df = _counts(apply_pending(name, tables[name]), rollup)
+        base[name] = df
+        yearly[name] = _with_pct(_yearly(df, rollup))
+    _state.update(version=version, base=base, yearly=yearly, committed=committed, writes=0)
+
+
+def _ensure():
+    version = data_version()
+    if _state["version"] != version:
+        _build(version)
+
+
+def rollup_version(pending=False):
+    """
+    Versi cache grafik untuk yearly_frame(..., pending): versi replika, ditambah jumlah
+    tulis sejak dibangun untuk tampilan admin
+    """
+    if not pending:
+        return _state["version"]
+    return _state["version"], _state["writes"]
+
+
+def yearly_frame(table_name, pending=False):
+    """
+    Agregat per tahun (jumlah kolom dan pct_<kolom>) untuk tabel yang punya rollup.
+    Default hanya data yang sudah tersimpan di replika; pending=True (halaman admin)
+    ikut menumpangkan tulis yang masih di antrean.
+    """
+    with _lock:
+        _ensure()
+        return _state["yearly" if pending else "committed"][table_name].reset_index()
+
+
+def _apply_one(base, key, op, values):
+    mask = pd.Series(True, index=base.index)
+    for column, value in key.items():
+        mask &= base[column] == value
+    if op == "delete":
+        return base[~mask]
+    if op == "update":
+        base = base.copy()
+        for column, value in values.items():
+            base.loc[mask, column] = value
+        return base
+    return pd.concat([base[~mask], pd.DataFrame([{**key, **values}])], ignore_index=True)
+
+
+def apply_entries(base, table_name, entries):
+    """Baris dasar table_name setelah entri (key, op, values) diterapkan; base tidak diubah"""
+    for key, op, values in entries:
+        base = _apply_one(base, key, op, values or {})
+    return _counts(base, ROLLUPS[table_name])
+
+
+def base_frames(table_names):
+    """Salinan baris dasar (replika + antrean tulis) yang dipakai rollup, misal untuk validasi"""
+    with _lock:
+        _ensure()
+        return {name: _state["base"][name].copy() for name in table_names}
+
+
+def apply_writes(table_name, entries):
+    """
+    Perbarui rollup setelah entri (key, op, values) masuk antrean tulis.
+    Hanya tahun yang tersentuh yang dijumlah ulang; % perubahan dihitung ulang untuk tahun
+    itu dan tahun sesudahnya.
+    """
+    rollup = ROLLUPS.get(table_name)
+    if rollup is None:
+        return
+    with _lock:
+        _ensure()
+        base = apply_entries(_state["base"][table_name], table_name, entries)
+        _state["base"][table_name] = base
+
+        years = sorted({int(key[YEAR]) for key, _, _ in entries})
+        touched = base[base[YEAR].isin(years)]
+        yearly = _state["yearly"][table_name].drop(index=years, errors="ignore")
+        totals = _yearly(touched, rollup)
+        yearly = pd.concat([yearly, totals]).sort_index()
+
+        # Tahun tepat sesudah tiap tahun yang berubah ikut terpengaruh % perubahannya
+        index = yearly.index
+        positions = index.searchsorted(years, side="right")
+        following = [index[p] for p in positions if p < len(index)]
+        _state["yearly"][table_name] = _with_pct(yearly, set(years) | set(following))
+        _state["writes"] += 1
+
+
+def desa_frame():
+    """Jumlah penduduk seluruh desa per tahun (kolom jumlah_penduduk, jumlah_desa)"""
+    if not os.path.exists(DESA_FILE):
+        return pd.DataFrame(columns=[YEAR, "jumlah_penduduk", "jumlah_desa"])
+    mtime = os.path.getmtime(DESA_FILE)
+    with _lock:
+        cached_mtime, frame = _state["desa"]
+        if cached_mtime == mtime:
+            return frame
+    df = pd.read_csv(DESA_FILE, sep=";", usecols=["id_desa", YEAR, "jumlah_penduduk"]).dropna()
+    frame = (
+        df.groupby(YEAR)
+        .agg(jumlah_penduduk=("jumlah_penduduk", "sum"), jumlah_desa=("id_desa", "nunique"))
+        .astype(COUNT_DTYPE)
+        .reset_index()
+    )
+    with _lock:
+        _state["desa"] = (mtime, frame)
+    return frame
@@ -0,0 +1,88 @@
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import product
+
+from backtest import cache_get, cache_put, fingerprint
+from cohort import Scenario, project
+
+# Sweep banyak skenario proyeksi kohort-komponen sekaligus.
+# Skenario dengan horizon yang sama dikelompokkan per chunk dan dihitung sebagai satu
+# batch array (cohort.project). Chunk dijalankan paralel di proses pekerja; kalibrasi
+# dikirim sekali per pekerja lewat initializer dan hanya dibaca. Hasil di-cache per
+# hash skenario dan dikembalikan satu per satu begitu chunk-nya selesai.
+
+CHUNK_SIZE = 16
+
+_result_cache = OrderedDict()  # hash skenario -> array (tahun x jenis kelamin x kelompok umur)
+_worker_calibration = None     # kalibrasi read-only di proses pekerja
+
+
+def expand_grid(fertility=(1.0,), mortality=(1.0,), migration=(1.0,), horizons=(10,)):
+    """Semua kombinasi parameter sebagai daftar (Scenario, horizon)"""
+    return [
+        (Scenario(f"Kelahiran x{f:g}, Kematian x{m:g}, Migrasi x{g:g}", f, m, g), h)
+        for f, m, g, h in product(fertility, mortality, migration, horizons)
+    ]
+
+
+def scenario_hash(calibration, scenario, horizon):
+    params = ("cohort", calibration.base_year, calibration.net_migration,
+              scenario.fertility, scenario.mortality, scenario.migration, horizon)
+    return fingerprint(params, calibration.population, calibration.birth_rate,
+                       calibration.death_rate, calibration.residual_migration, calibration.migration_share)
+
+
+def _init_worker(calibration):
+    global _worker_calibration
+    _worker_calibration = calibration
+
+
+def _run_chunk(scenarios, horizon):
+    return project(_worker_calibration, scenarios, horizon)
+
+
+def _chunks(pending, chunk_size):
+    by_horizon = {}
+    for item in pending:
+        by_horizon.setdefault(item[2], []).append(item)
+    for horizon, items in by_horizon.items():
+        for start in range(0, len(items), chunk_size):
+            yield horizon, items[start:start + chunk_size]
+
+
+def sweep(calibration, items, max_workers=None, chunk_size=CHUNK_SIZE):
+    """
+    Hitung daftar (Scenario, horizon) dan hasilkan (scenario, horizon, array) begitu tersedia.
+    Skenario yang sudah pernah dihitung untuk kalibrasi yang sama langsung diambil dari cache.
+    """
+    pending = []
+    for scenario, horizon in items:
+        key = scenario_hash(calibration, scenario, horizon)
+        projection = cache_get(_result_cache, key)
+        if projection is not None:
+            yield scenario, horizon, projection
+        else:
+            pending.append((key, scenario, horizon))
+
+    chunks = list(_chunks(pending, chunk_size))
+
+    def finish(chunk, result):
+        for (key, scenario, horizon), projection in zip(chunk, result):
+            cache_put(_result_cache, key, projection)
+            yield scenario, horizon, projection
+
+    if len(chunks) <= 1:
+        # Satu chunk lebih cepat dihitung langsung daripada menyalakan proses pekerja
+        for horizon, chunk in chunks:
+            yield from finish(chunk, project(calibration, [s for _, s, _ in chunk], horizon))
+        return
+
+    workers = min(len(chunks), max_workers or os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(calibration,)) as pool:
+        futures = {
+            pool.submit(_run_chunk, [s for _, s, _ in chunk], horizon): chunk
+            for horizon, chunk in chunks
+        }
+        for future in as_completed(futures):
+            yield from finish(futures[future], future.result())
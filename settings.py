@@ -0,0 +1,138 @@
+import os
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+
+import yaml
+from yaml.loader import SafeLoader
+
+CONFIG_PATH = 'config.yaml'
+
+# Skema pengaturan: nama field -> (path di config.yaml, tipe, default, nilai minimum)
+SCHEMA = {
+    "cookie_expiry_days": (("cookie", "expiry_days"), int, 30, 1),
+    "session_duration_hours": (("settings", "session_duration_hours"), int, 24, 1),
+    "items_per_page": (("settings", "items_per_page"), int, 10, 1),
+    "snapshot_ttl_seconds": (("settings", "snapshot_ttl_seconds"), int, 300, 1),
+    "chart_width_px": (("settings", "chart_width_px"), int, 1200, 100),
+    "replica_path": (("replica", "path"), str, ".cache/replica.sqlite", None),
+    "replica_poll_seconds": (("replica", "poll_seconds"), int, 60, 1),
+    "replica_full_sync_seconds": (("replica", "full_sync_seconds"), int, 3600, 1),
+    "write_queue_path": (("write_queue", "path"), str, ".cache/write_queue.sqlite", None),
+    "write_queue_batch_size": (("write_queue", "batch_size"), int, 50, 1),
+    "write_queue_flush_seconds": (("write_queue", "flush_seconds"), int, 5, 1),
+    "write_queue_base_backoff_seconds": (("write_queue", "base_backoff_seconds"), float, 2.0, 0.0),
+    "write_queue_max_backoff_seconds": (("write_queue", "max_backoff_seconds"), float, 300.0, 0.0),
+    "write_queue_max_attempts": (("write_queue", "max_attempts"), int, 8, 1),
+    "svr_c": (("model", "svr_c"), float, 250.0, 0.0),
+    "svr_epsilon": (("model", "svr_epsilon"), float, 0.01, 0.0),
+    "interval_level": (("model", "interval_level"), float, 0.9, 0.0),
+    "interval_resamples": (("model", "interval_resamples"), int, 500, 1),
+}
+
+# Batas tambahan yang tidak bisa dinyatakan dengan nilai minimum saja
+CHECKS = {
+    "interval_level": (lambda value: 0.0 < value < 1.0, "harus lebih dari 0 dan kurang dari 1"),
+    # SVR menolak C = 0 saat fit
+    "svr_c": (lambda value: value > 0.0, "harus lebih dari 0"),
+}
+
+
+class ConfigError(ValueError):
+    """Isi config.yaml tidak sesuai skema"""
+
+
+@dataclass(frozen=True)
+class Settings:
+    cookie_expiry_days: int
+    session_duration_hours: int
+    items_per_page: int
+    snapshot_ttl_seconds: int
+    chart_width_px: int
+    replica_path: str
+    replica_poll_seconds: int
+    replica_full_sync_seconds: int
+    write_queue_path: str
+    write_queue_batch_size: int
+    write_queue_flush_seconds: int
+    write_queue_base_backoff_seconds: float
+    write_queue_max_backoff_seconds: float
+    write_queue_max_attempts: int
+    svr_c: float
+    svr_epsilon: float
+    interval_level: float
+    interval_resamples: int
+    raw: MappingProxyType
+
+
+def _freeze(value):
+    """Ubah dict/list hasil parsing YAML menjadi struktur read-only"""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _lookup(config, path):
+    node = config
+    for key in path:
+        if not isinstance(node, dict) or key not in node:
+            return None
+        node = node[key]
+    return node
+
+
+def parse_settings(config):
+    """Validasi dict konfigurasi terhadap SCHEMA dan bangun Settings"""
+    if config is None:
+        config = {}
+    if not isinstance(config, dict):
+        raise ConfigError("config.yaml harus berupa mapping")
+
+    values = {}
+    for field, (path, type_, default, minimum) in SCHEMA.items():
+        value = _lookup(config, path)
+        if value is None:
+            value = default
+        # bool adalah subclass int, jangan diterima sebagai angka
+        if isinstance(value, bool) or not isinstance(value, (type_, int) if type_ is float else type_):
+            raise ConfigError(f"{'.'.join(path)} harus bertipe {type_.__name__}, bukan {type(value).__name__}")
+        value = type_(value)
+        if minimum is not None and value < minimum:
+            raise ConfigError(f"{'.'.join(path)} tidak boleh kurang dari {minimum}")
+        if field in CHECKS and not CHECKS[field][0](value):
+            raise ConfigError(f"{'.'.join(path)} {CHECKS[field][1]}")
+        values[field] = value
+
+    return Settings(raw=_freeze(config), **values)
+
+
+_lock = threading.Lock()
+_state = {"key": None, "settings": None}  # key = (path, mtime) file yang terakhir di-parse
+
+
+def get_settings(path=CONFIG_PATH):
+    """
+    Ambil pengaturan aplikasi.
+    File hanya di-parse ulang jika path atau mtime berubah; jika file baru tidak valid,
+    pengaturan terakhir yang valid tetap dipakai.
+    """
+    key = (path, os.stat(path).st_mtime_ns)
+    if _state["key"] == key:
+        return _state["settings"]
+
+    with _lock:
+        if _state["key"] == key:
+            return _state["settings"]
+        try:
+            with open(path) as file:
+                settings = parse_settings(yaml.load(file, Loader=SafeLoader))
+        except (ConfigError, yaml.YAMLError) as e:
+            if _state["settings"] is None:
+                raise
+            print(f"Config {path} tidak valid, memakai pengaturan sebelumnya: {e}")
+            settings = _state["settings"]
+        _state["settings"] = settings
+        _state["key"] = key
+        return settings
@@ -0,0 +1,108 @@
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+
+from replica import data_version, read_tables, sync_if_due
+from settings import get_settings
+
+# Tabel yang ditampilkan di menu publik (tanpa login)
+PUBLIC_TABLES = [
+    "penduduk_tahunan",
+    "migrasi",
+    "keluarga",
+    "status_perkawinan",
+    "putus_sekolah",
+    "penduduk_usia",
+]
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    version: int
+    built_at: float
+    tables: MappingProxyType
+    source_version: int = -1
+
+
+def build_snapshot(version):
+    """Baca semua tabel publik dari replika lokal dan bekukan menjadi Snapshot"""
+    source_version = data_version()
+    tables = read_tables(PUBLIC_TABLES)
+    return Snapshot(version=version, built_at=time.time(), tables=MappingProxyType(tables),
+                    source_version=source_version)
+
+
+_lock = threading.Lock()
+_state = {"snapshot": None, "failed": (None, 0.0)}  # failed: (versi replika, waktu) build terakhir yang gagal
+
+
+def get_snapshot():
+    """
+    Snapshot bersama untuk semua session.
+    Dibangun ulang jika isi replika berubah atau sudah lewat
+    settings.snapshot_ttl_seconds; selama satu session membangun ulang,
+    session lain tetap dilayani snapshot lama.
+    """
+    sync_if_due(PUBLIC_TABLES)
+    snapshot = _state["snapshot"]
+    ttl = get_settings().snapshot_ttl_seconds
+
+    def is_fresh(s):
+        if s is None:
+            return False
+        if s.source_version == data_version() and time.time() - s.built_at < ttl:
+            return True
+        # Build untuk versi ini baru saja gagal: tunda percobaan berikutnya satu periode TTL
+        failed_version, failed_at = _state["failed"]
+        return failed_version == data_version() and time.time() - failed_at < ttl
+
+    if is_fresh(snapshot):
+        return snapshot
+
+    # Snapshot pertama harus ditunggu; setelah itu cukup satu session yang membangun
+    if not _lock.acquire(blocking=snapshot is None):
+        return snapshot
+    try:
+        current = _state["snapshot"]
+        if is_fresh(current):
+            return current
+        attempted = data_version()
+        try:
+            version = 1 if current is None else current.version + 1
+            _state["snapshot"] = build_snapshot(version)
+        except Exception as e:
+            if current is None:
+                raise
+            print(f"Gagal membangun ulang snapshot, memakai versi {current.version}: {e}")
+            # Snapshot lama tetap dengan source_version-nya sendiri, agar cache turunan
+            # (figure_cache, unduhan) tidak menyimpan data lama di bawah versi baru
+            _state["failed"] = (attempted, time.time())
+        return _state["snapshot"]
+    finally:
+        _lock.release()
+
+
+def get_table(table_name, required_columns=()):
+    """
+    Ambil satu tabel dari snapshot.
+    Yang dikembalikan adalah shallow copy sehingga halaman boleh menambah kolom
+    tanpa mengubah snapshot yang dipakai session lain.
+    """
+    return get_table_version(table_name, required_columns)[0]
+
+
+def get_table_version(table_name, required_columns=()):
+    """
+    Seperti get_table, ditambah source_version snapshot asal tabel tersebut.
+    Dipakai sebagai versi cache untuk hasil turunan (misal figure_cache), karena versi
+    replika saat ini bisa sudah lebih baru daripada snapshot yang sedang dilayani.
+    """
+    snapshot = get_snapshot()
+    df = snapshot.tables[table_name]
+    if df.empty:
+        raise ValueError(f"No data found in table {table_name}")
+    missing_columns = [col for col in required_columns if col not in df.columns]
+    if missing_columns:
+        raise ValueError(f"Missing columns in {table_name}: {missing_columns}")
+    return df.copy(deep=False), snapshot.source_version
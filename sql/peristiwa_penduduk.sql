@@ -0,0 +1,82 @@
+-- Peristiwa kelahiran/kematian per orang dan rekap hariannya, bulanannya, dan tahunannya.
+-- Kolom peristiwa disimpan ringkas (date + smallint). Rekap diperbarui oleh trigger setiap
+-- kali peristiwa ditambah, diubah, atau dihapus, sehingga aplikasi tidak pernah perlu
+-- menjumlahkan ulang seluruh tabel peristiwa.
+--
+--   jenis         : 1 = kelahiran, 2 = kematian
+--   jenis_kelamin : 1 = laki-laki, 2 = perempuan
+
+create table if not exists public.peristiwa_penduduk (
+  id uuid primary key,
+  tanggal date not null,
+  id_desa smallint not null,
+  jenis smallint not null check (jenis in (1, 2)),
+  jenis_kelamin smallint not null check (jenis_kelamin in (1, 2))
+);
+
+create table if not exists public.rekap_peristiwa_harian (
+  tanggal date not null,
+  id_desa smallint not null,
+  jenis smallint not null,
+  jenis_kelamin smallint not null,
+  jumlah integer not null default 0,
+  primary key (tanggal, id_desa, jenis, jenis_kelamin)
+);
+
+create table if not exists public.rekap_peristiwa_bulanan (
+  id_tahun integer not null,
+  bulan smallint not null,
+  id_desa smallint not null,
+  jenis smallint not null,
+  jenis_kelamin smallint not null,
+  jumlah integer not null default 0,
+  primary key (id_tahun, bulan, id_desa, jenis, jenis_kelamin)
+);
+
+create table if not exists public.rekap_peristiwa_tahunan (
+  id_tahun integer not null,
+  id_desa smallint not null,
+  jenis smallint not null,
+  jenis_kelamin smallint not null,
+  jumlah integer not null default 0,
+  primary key (id_tahun, id_desa, jenis, jenis_kelamin)
+);
+
+create or replace function public.rekap_peristiwa_tambah(
+  p_tanggal date, p_desa smallint, p_jenis smallint, p_jk smallint, p_delta integer
+)
+returns void
+language sql
+as $$
+  insert into public.rekap_peristiwa_harian as r (tanggal, id_desa, jenis, jenis_kelamin, jumlah)
+  values (p_tanggal, p_desa, p_jenis, p_jk, p_delta)
+  on conflict (tanggal, id_desa, jenis, jenis_kelamin) do update set jumlah = r.jumlah + excluded.jumlah;
+
+  insert into public.rekap_peristiwa_bulanan as r (id_tahun, bulan, id_desa, jenis, jenis_kelamin, jumlah)
+  values (extract(year from p_tanggal)::int, extract(month from p_tanggal)::smallint, p_desa, p_jenis, p_jk, p_delta)
+  on conflict (id_tahun, bulan, id_desa, jenis, jenis_kelamin) do update set jumlah = r.jumlah + excluded.jumlah;
+
+  insert into public.rekap_peristiwa_tahunan as r (id_tahun, id_desa, jenis, jenis_kelamin, jumlah)
+  values (extract(year from p_tanggal)::int, p_desa, p_jenis, p_jk, p_delta)
+  on conflict (id_tahun, id_desa, jenis, jenis_kelamin) do update set jumlah = r.jumlah + excluded.jumlah;
+$$;
+
+create or replace function public.rekap_peristiwa()
+returns trigger
+language plpgsql
+as $$
+begin
+  if tg_op in ('UPDATE', 'DELETE') then
+    perform public.rekap_peristiwa_tambah(old.tanggal, old.id_desa, old.jenis, old.jenis_kelamin, -1);
+  end if;
+  if tg_op in ('INSERT', 'UPDATE') then
+    perform public.rekap_peristiwa_tambah(new.tanggal, new.id_desa, new.jenis, new.jenis_kelamin, 1);
+  end if;
+  return null;
+end;
+$$;
+
+drop trigger if exists rekap_peristiwa on public.peristiwa_penduduk;
+create trigger rekap_peristiwa
+after insert or update or delete on public.peristiwa_penduduk
+for each row execute function public.rekap_peristiwa();
@@ -0,0 +1,59 @@
+-- Simpan baris data tahunan beserta baris dimensi `tahun` dalam satu transaksi.
+-- Dipanggil dari write_queue lewat supabase.rpc("simpan_data_tahunan", ...).
+--
+--   p_table    : nama tabel fakta (lihat daftar yang diizinkan di bawah)
+--   p_rows     : array JSON berisi baris lengkap (termasuk kolom key)
+--   p_conflict : kolom key / conflict target, misal {id_tahun} atau {id_tahun,kategori_usia}
+--   p_upsert   : false -> tolak jika key sudah ada (tambah data)
+--                true  -> timpa baris yang sudah ada
+create or replace function public.simpan_data_tahunan(
+  p_table text,
+  p_rows jsonb,
+  p_conflict text[],
+  p_upsert boolean default false
+)
+returns integer
+language plpgsql
+as $$
+declare
+  v_columns text;
+  v_updates text;
+  v_conflict text;
+  v_saved integer;
+begin
+  if p_table not in ('penduduk_tahunan', 'keluarga', 'migrasi', 'status_perkawinan', 'putus_sekolah', 'penduduk_usia') then
+    raise exception 'Tabel % tidak diizinkan', p_table;
+  end if;
+
+  insert into public.tahun (id_tahun, tahun)
+  select distinct (r->>'id_tahun')::int, (r->>'id_tahun')::int
+  from jsonb_array_elements(p_rows) r
+  on conflict (id_tahun) do nothing;
+
+  select string_agg(quote_ident(k), ', ') into v_columns
+  from jsonb_object_keys(p_rows->0) k;
+
+  select string_agg(format('%1$I = excluded.%1$I', k), ', ') into v_updates
+  from jsonb_object_keys(p_rows->0) k
+  where k <> all(p_conflict);
+
+  select string_agg(quote_ident(c), ', ') into v_conflict
+  from unnest(p_conflict) c;
+
+  execute format(
+    'insert into public.%I (%s) select %s from jsonb_populate_recordset(null::public.%I, $1) on conflict (%s) do %s',
+    p_table, v_columns, v_columns, p_table, v_conflict,
+    case when p_upsert and v_updates is not null then 'update set ' || v_updates else 'nothing' end
+  ) using p_rows;
+  get diagnostics v_saved = row_count;
+
+  -- Seluruh pemanggilan dibatalkan (termasuk insert tahun) jika ada key yang sudah ada
+  if not p_upsert and v_saved < jsonb_array_length(p_rows) then
+    raise exception using
+      errcode = '23505',
+      message = format('Data %s untuk tahun tersebut sudah ada', p_table);
+  end if;
+
+  return v_saved;
+end;
+$$;
@@ -0,0 +1,164 @@
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from frames import canonical
+from replica import read_table
+from rollups import apply_writes
+from validator import check_write, describe
+from write_queue import apply_pending, enqueue_many
+
+
+@dataclass(frozen=True)
+class Column:
+    name: str
+    label: str              # judul kolom di tabel
+    input_label: str = ""   # label input di form tambah data
+
+
+@dataclass(frozen=True)
+class Validation:
+    check: object           # fungsi(dict nilai) -> True jika valid
+    message: str
+
+
+@dataclass(frozen=True)
+class TableSpec:
+    """
+    Deskripsi deklaratif satu tabel data tahunan.
+    Dari spesifikasi ini halaman CRUD, validasi, dan penulisan ke database dibangun.
+    """
+    table: str
+    header: str
+    title: str
+    entity: str                          # dipakai di pesan, misal "Data {entity} untuk tahun ... sudah ada!"
+    value_columns: tuple
+    total: Column = None                 # kolom turunan = jumlah value_columns
+    category: Column = None              # dimensi tambahan di key (misal kategori_usia)
+    categories: tuple = ()
+    validations: tuple = ()
+    min_year: int = 2024                 # batas form tambah data (tahun berjalan ke depan)
+    max_year: int = 3000
+    import_min_year: int = 1900          # batas impor massal, yang juga dipakai mengisi data historis
+    paginate: bool = False
+    year_column: str = field(default="id_tahun")
+
+    @property
+    def key_columns(self):
+        """Key baris, sekaligus conflict target untuk upsert"""
+        return (self.year_column, self.category.name) if self.category else (self.year_column,)
+
+    @property
+    def columns(self):
+        names = list(self.key_columns) + [c.name for c in self.value_columns]
+        return names + [self.total.name] if self.total else names
+
+
+def nonzero(columns, message):
+    """Validasi: jumlah kolom-kolom berikut tidak boleh nol"""
+    return Validation(lambda values: sum(values[c] for c in columns) != 0, message)
+
+
+def make_key(spec, id_tahun, category=None):
+    key = {spec.year_column: int(id_tahun)}
+    if spec.category:
+        key[spec.category.name] = category
+    return key
+
+
+def make_values(spec, values):
+    """Normalisasi nilai input ke int dan hitung kolom total"""
+    row = {c.name: int(values[c.name]) for c in spec.value_columns}
+    if spec.total:
+        row[spec.total.name] = sum(row.values())
+    return row
+
+
+def read_rows(spec):
+    """Data tabel dari replika lokal ditambah perubahan yang masih di antrean"""
+    stored = read_table(spec.table)
+    df = apply_pending(spec.table, stored)
+    # Replika sudah bertipe; konversi ulang hanya jika ada baris dari antrean
+    if df is not stored:
+        df = canonical(df)
+    if df.empty:
+        return pd.DataFrame(columns=spec.columns)
+    df = df.sort_values(list(spec.key_columns), kind="stable").reset_index(drop=True)
+    value_names = [c.name for c in spec.value_columns] + ([spec.total.name] if spec.total else [])
+    df[value_names] = df[value_names].fillna(0)
+    return df
+
+
+def year_exists(spec, id_tahun, df=None):
+    df = read_rows(spec) if df is None else df
+    return bool((df[spec.year_column] == int(id_tahun)).any())
+
+
+def validate(spec, values):
+    """Kembalikan daftar pesan error untuk satu baris nilai input"""
+    return [v.message for v in spec.validations if not v.check(values)]
+
+
+def _summary(violations):
+    more = f" (dan {len(violations) - 1} pelanggaran lain)" if len(violations) > 1 else ""
+    return describe(violations.iloc[0]) + more
+
+
+def write_entries(spec, entries, partial=False):
+    """
+    Periksa konsistensi antar tabel, masukkan entri ke antrean, lalu perbarui rollup tahun yang tersentuh.
+    ValueError jika penulisan menimbulkan pelanggaran aturan yang bersifat memblokir.
+    partial=True untuk ubah/hapus satu baris (lihat validator.check_write).
+    Mengembalikan (teks peringatan untuk pelanggaran baru yang tidak memblokir atau "",
+    seq entri di antrean tulis).
+    """
+    new = check_write(spec.table, entries, partial)
+    blocking = new["blocking"].astype(bool)
+    if blocking.any():
+        raise ValueError(_summary(new[blocking]))
+    seqs = enqueue_many(spec.table, entries)
+    apply_writes(spec.table, entries)
+    if new.empty:
+        return "", seqs
+    warning = f"Perhatian: {_summary(new)}. Periksa kembali di halaman Validasi Data setelah semua perubahan disimpan."
+    return warning, seqs
+
+
+def add_year(spec, id_tahun, values_by_category):
+    """
+    Tambah data satu tahun.
+    values_by_category: {kategori: dict nilai}, atau {None: dict nilai} jika tabel tanpa kategori.
+    Seperti update_row dan delete_row, mengembalikan (berhasil, pesan, peringatan dari write_entries).
+    """
+    try:
+        # Baris tahun ikut dibuat di sisi server dalam request yang sama (lihat write_queue)
+        warning, _ = write_entries(spec, [
+            (make_key(spec, id_tahun, category), "insert_year", make_values(spec, values))
+            for category, values in values_by_category.items()
+        ])
+        return True, "Data diterima dan sedang dikirim ke database.", warning
+    except Exception as e:
+        return False, f"Gagal menambahkan data: {str(e)}", ""
+
+
+def update_row(spec, key, values):
+    try:
+        warning, _ = write_entries(spec, [(key, "update", make_values(spec, values))], partial=True)
+        return True, f"Data {describe_key(spec, key)} masuk antrean untuk diperbarui!", warning
+    except Exception as e:
+        return False, f"Gagal memperbarui data: {str(e)}", ""
+
+
+def delete_row(spec, key):
+    try:
+        warning, _ = write_entries(spec, [(key, "delete", None)], partial=True)
+        return True, f"Data {describe_key(spec, key)} masuk antrean untuk dihapus!", warning
+    except Exception as e:
+        return False, f"Gagal menghapus data: {str(e)}", ""
+
+
+def describe_key(spec, key):
+    text = f"untuk tahun {key[spec.year_column]}"
+    if spec.category:
+        text += f" kelompok {key[spec.category.name]}"
+    return text
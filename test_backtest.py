@@ -0,0 +1,83 @@
+"""
+Test backtest rolling-origin: tahun uji tidak pernah ikut ke data latih maupun tuning
+"""
+
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+
+import backtest  # noqa: E402
+
+YEARS = np.arange(2010, 2022, dtype=float)
+
+
+class Recorder:
+    """Estimator tren konstan yang mencatat tahun latih terakhir setiap fit"""
+    seen = []
+
+    def fit(self, X, y):
+        Recorder.seen.append(X[:, 0].max())
+        self.last_ = y[-1]
+        return self
+
+    def predict(self, X):
+        return np.full(len(X), self.last_)
+
+
+def test_rolling_origin_trains_only_on_years_before_target():
+    Recorder.seen = []
+    X = YEARS.reshape(-1, 1)
+    y = 1000 + 10 * np.arange(len(YEARS), dtype=float)
+    result = backtest.rolling_origin(X, y, Recorder, ("recorder", "leakage"), horizons=(1, 2, 3))
+
+    assert (result["tahun"] > result["origin"]).all()
+    assert (result["tahun"] - result["origin"] == result["horizon"]).all()
+    assert max(Recorder.seen) == YEARS[-2]
+    # Prediksi tahun t memakai nilai tahun origin, bukan nilai tahun t
+    origins = dict(zip(YEARS, y))
+    assert (result["prediksi"] == result["origin"].map(origins)).all()
+
+
+def test_tuned_backtest_tunes_on_each_origin_prefix(monkeypatch):
+    pytest.importorskip("sklearn")
+    pytest.importorskip("supabase")
+    os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+    os.environ.setdefault("SUPABASE_KEY", "eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoiYW5vbiJ9.test")
+    import forecasters
+    import model
+
+    tuned_on = []
+    search = model._search
+
+    def recording_search(X, y):
+        tuned_on.append(X[:, 0].max())
+        return search(X, y)
+
+    monkeypatch.setattr(model, "_search", recording_search)
+    monkeypatch.setattr(model, "TUNING_N_JOBS", 1)
+    data = pd.DataFrame({"id_tahun": YEARS, "jumlah_penduduk": 1000 + 10 * np.arange(len(YEARS))})
+    # Grid berbeda dari cache lain agar origin benar-benar dilatih di test ini
+    monkeypatch.setitem(model.PARAM_GRID, "svr__C", [11, 101])
+    result = forecasters.backtest_series(["id_tahun"], "jumlah_penduduk", data, backend="svr_tuned")
+
+    assert tuned_on, "tuning harus dijalankan per origin"
+    assert YEARS[-1] not in tuned_on
+    assert set(tuned_on) <= set(result["origin"])
+    assert len(tuned_on) == len(YEARS) - model.MIN_TUNING_SIZE
+
+
+def test_tuned_model_reports_cv_r2(monkeypatch):
+    pytest.importorskip("sklearn")
+    pytest.importorskip("supabase")
+    os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+    os.environ.setdefault("SUPABASE_KEY", "eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoiYW5vbiJ9.test")
+    import model
+
+    monkeypatch.setattr(model, "TUNING_N_JOBS", 1)
+    y = 1000 + 15 * np.arange(len(YEARS)) + np.random.default_rng(0).normal(0, 3, len(YEARS))
+    tuned = model.tune_svm_model(YEARS.reshape(-1, 1), y)[0]
+    assert np.isfinite(tuned.cv_r2_mean) and np.isfinite(tuned.cv_r2_std)
+    assert tuned.cv_mae_mean >= 0
@@ -0,0 +1,66 @@
+"""
+Test impor massal (bulk_import): data historis, BOM UTF-8, nomor baris, dan diff dengan data lama
+"""
+
+import io
+import os
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("supabase")
+pytest.importorskip("streamlit")
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoiYW5vbiJ9.test")
+
+from bulk_import import diff_rows, parse_upload  # noqa: E402
+from halaman.data_jumlah_penduduk import SPEC  # noqa: E402
+
+DATA_CSV = os.path.join(os.path.dirname(__file__), "data", "Data.csv")
+
+
+def _upload(content, name):
+    file = io.BytesIO(content)
+    file.name = name
+    return file
+
+
+def test_shipped_historical_csv_is_imported():
+    with open(DATA_CSV, "rb") as f:
+        content = f.read()
+    assert content.startswith(b"\xef\xbb\xbf")  # file contoh memakai BOM UTF-8
+    rows, errors = parse_upload(SPEC, _upload(content, "Data.csv"))
+    assert errors == []
+    assert sorted(rows["id_tahun"]) == list(range(2015, 2024))
+    row = rows[rows["id_tahun"] == 2015].iloc[0]
+    assert (row["laki_laki"], row["perempuan"], row["jumlah_penduduk"]) == (29480, 29228, 58708)
+
+
+def test_bom_header_is_recognized():
+    content = "﻿id_tahun,laki_laki,perempuan\n2010,5,6\n".encode("utf-8")
+    rows, errors = parse_upload(SPEC, _upload(content, "bom.csv"))
+    assert errors == [] and rows["jumlah_penduduk"].tolist() == [11]
+
+
+def test_row_numbers_count_skipped_blank_rows():
+    openpyxl = pytest.importorskip("openpyxl")
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(["id_tahun", "laki_laki", "perempuan"])
+    sheet.append([2010, 5, 6])
+    sheet.append([None, None, None])
+    sheet.append([2011, -1, 6])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    rows, errors = parse_upload(SPEC, _upload(buffer.getvalue(), "data.xlsx"))
+    assert [line for line, _ in errors] == [4]
+    assert rows["id_tahun"].tolist() == [2010]
+
+
+def test_diff_rows_with_duplicate_existing_keys():
+    incoming = pd.DataFrame({"id_tahun": [2015, 2016], "laki_laki": [1, 2], "perempuan": [1, 2], "jumlah_penduduk": [2, 4]})
+    existing = pd.DataFrame({"id_tahun": [2015, 2015], "laki_laki": [9, 1], "perempuan": [9, 1], "jumlah_penduduk": [18, 2]})
+    new, changed, same = diff_rows(SPEC, incoming, existing)
+    assert new["id_tahun"].tolist() == [2016]
+    assert changed.empty and same == 1
@@ -0,0 +1,48 @@
+"""
+Test proyeksi kohort-komponen (cohort.calibrate / cohort.project)
+"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+
+from cohort import AGE_GROUPS, Scenario, calibrate, project  # noqa: E402
+
+
+def _usia(growth):
+    """penduduk_usia 2015-2020; kelompok dewasa berubah growth jiwa per tahun di luar penuaan"""
+    rows = []
+    for i, year in enumerate(range(2015, 2021)):
+        values = {"0-14": 3000.0, "15-60": 6000.0 + growth * i, "60+": 1000.0}
+        for group in AGE_GROUPS:
+            rows.append({"id_tahun": year, "kategori_usia": group,
+                         "laki_laki": values[group], "perempuan": values[group]})
+    return pd.DataFrame(rows)
+
+
+MIGRASI = pd.DataFrame({"id_tahun": range(2015, 2021), "migrasi_masuk": 0, "migrasi_keluar": 0})
+
+
+def test_death_rate_is_never_negative():
+    calibration = calibrate(_usia(growth=300), MIGRASI)
+    assert (calibration.death_rate >= 0).all()
+    # Pertambahan kelompok dewasa yang tidak dijelaskan penuaan masuk ke migrasi tak tercatat
+    assert (calibration.residual_migration[:, 1] > 0).all()
+    assert (calibration.death_rate * calibration.residual_migration == 0).all()
+
+
+def test_mortality_multiplier_reduces_population():
+    calibration = calibrate(_usia(growth=300), MIGRASI)
+    scenarios = [Scenario("rendah", mortality=0.5), Scenario("dasar"), Scenario("tinggi", mortality=2.0)]
+    totals = project(calibration, scenarios, horizon=10)[:, -1].sum(axis=(1, 2))
+    assert totals[0] >= totals[1] >= totals[2]
+
+
+def test_residual_migration_is_not_scaled_by_mortality():
+    calibration = calibrate(_usia(growth=300), MIGRASI)
+    # Tanpa kematian, pengali kematian tidak boleh mengubah hasil
+    calibration = type(calibration)(**{**calibration.__dict__, "death_rate": np.zeros_like(calibration.death_rate)})
+    result = project(calibration, [Scenario("dasar"), Scenario("tinggi", mortality=3.0)], horizon=5)
+    np.testing.assert_allclose(result[0], result[1])
+    assert result[0, -1, :, 1].sum() > result[0, 0, :, 1].sum()
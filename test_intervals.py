@@ -0,0 +1,48 @@
+"""
+Test interval prediksi split conformal (intervals.prediction_intervals)
+"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from intervals import conformal_min_size, prediction_intervals  # noqa: E402
+
+
+def _bounds(residuals, level):
+    residuals = np.asarray(residuals, dtype=float)[None, None, :]
+    lower, upper = prediction_intervals(np.zeros((1, 1)), residuals, level=level)
+    return lower[0, 0], upper[0, 0]
+
+
+def test_finite_sample_rank():
+    # n = 19, level 0.9: residual absolut ke-ceil(20 * 0.9) = 18 terkecil
+    residuals = np.arange(1, 20) * np.where(np.arange(19) % 2, -1, 1)
+    assert _bounds(residuals, 0.9) == (-18, 18)
+
+
+def test_exact_rank_is_not_rounded_up():
+    # (9 + 1) * 0.9 = 9.000000000000002 tetap peringkat 9
+    assert _bounds(np.arange(1, 10), 0.9) == (-9, 9)
+    assert conformal_min_size(0.9) == 9
+
+
+def test_too_few_residuals_widen_to_largest():
+    assert _bounds([1.0, -5.0, 2.0, 3.0], 0.9) == (-5, 5)
+
+
+def test_missing_residuals_give_nan():
+    residuals = np.array([[[1.0, 2.0, 3.0], [np.nan, np.nan, np.nan]]])
+    lower, upper = prediction_intervals(np.array([[100.0, 200.0]]), residuals, level=0.5)
+    assert lower[0, 0] == 98 and upper[0, 0] == 102
+    assert np.isnan(lower[0, 1]) and np.isnan(upper[0, 1])
+
+
+def test_coverage_is_at_least_level():
+    rng = np.random.default_rng(1)
+    level, n, trials = 0.8, 10, 4000
+    residuals = rng.normal(size=(trials, 1, n))
+    lower, upper = prediction_intervals(np.zeros((trials, 1)), residuals, level=level)
+    new = rng.normal(size=(trials, 1))
+    coverage = ((new >= lower) & (new <= upper)).mean()
+    assert coverage >= level - 0.02
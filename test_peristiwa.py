@@ -0,0 +1,48 @@
+"""
+Test rekap peristiwa: versi dibaca bersama datanya, dan rekap harian dibatasi since
+"""
+
+import os
+from datetime import date
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("supabase")
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoiYW5vbiJ9.test")
+
+import peristiwa  # noqa: E402
+
+
+@pytest.fixture
+def server(monkeypatch):
+    calls = []
+
+    def fetch(level, since=None):
+        calls.append((level, since))
+        return peristiwa._compact(pd.DataFrame({
+            "tanggal": ["2024-01-02"], "id_desa": [1], "jenis": [1], "jenis_kelamin": [1], "jumlah": [len(calls)],
+        }), level)
+
+    monkeypatch.setattr(peristiwa, "_fetch_rollup", fetch)
+    monkeypatch.setattr(peristiwa, "_pending_events", lambda: pd.DataFrame(columns=["tanggal"] + peristiwa.DIMENSIONS))
+    monkeypatch.setattr(peristiwa, "_cache", {})
+    return calls
+
+
+def test_version_matches_returned_data(server, monkeypatch):
+    first, version = peristiwa.read_rollup_version("harian")
+    # Pengambilan ulang (TTL habis) memberi data dan versi baru sekaligus
+    monkeypatch.setitem(peristiwa._cache, ("harian", None), (0.0,) + peristiwa._cache[("harian", None)][1:])
+    second, new_version = peristiwa.read_rollup_version("harian")
+    assert new_version != version
+    assert first["jumlah"].iloc[0] == 1 and second["jumlah"].iloc[0] == 2
+
+
+def test_daily_window_is_passed_to_server_and_old_window_dropped(server):
+    peristiwa.read_rollup("harian", since=date(2024, 1, 1))
+    peristiwa.read_rollup("harian", since=date(2024, 1, 2))
+    assert server == [("harian", date(2024, 1, 1)), ("harian", date(2024, 1, 2))]
+    assert list(peristiwa._cache) == [("harian", date(2024, 1, 2))]
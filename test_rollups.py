@@ -0,0 +1,52 @@
+"""
+Test rollup per tahun: pengunjung umum tidak melihat tulis yang masih di antrean
+"""
+
+import os
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("supabase")
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoiYW5vbiJ9.test")
+
+import rollups  # noqa: E402
+
+TAHUNAN = pd.DataFrame({"id_tahun": [2020, 2021], "laki_laki": [450, 460], "perempuan": [460, 470],
+                        "jumlah_penduduk": [910, 930]})
+USIA = pd.DataFrame(columns=["id_tahun", "kategori_usia", "laki_laki", "perempuan", "total"])
+
+
+def _queued(name, df):
+    # Satu tulis tertunda: tahun 2021 diubah admin
+    if name != "penduduk_tahunan":
+        return df
+    df = df.copy()
+    df.loc[df["id_tahun"] == 2021, ["laki_laki", "jumlah_penduduk"]] = [500, 970]
+    return df
+
+
+@pytest.fixture
+def replica(monkeypatch):
+    monkeypatch.setattr(rollups, "read_tables", lambda names: {"penduduk_tahunan": TAHUNAN, "penduduk_usia": USIA})
+    monkeypatch.setattr(rollups, "data_version", lambda: 1)
+    monkeypatch.setattr(rollups, "apply_pending", _queued)
+    monkeypatch.setitem(rollups._state, "version", None)
+
+
+def _total(df, year):
+    return int(df.loc[df["id_tahun"] == year, "jumlah_penduduk"].iloc[0])
+
+
+def test_public_view_excludes_queued_writes(replica):
+    assert _total(rollups.yearly_frame("penduduk_tahunan"), 2021) == 930
+    assert _total(rollups.yearly_frame("penduduk_tahunan", pending=True), 2021) == 970
+
+
+def test_apply_writes_only_updates_admin_view(replica):
+    key = {"id_tahun": 2020}
+    rollups.apply_writes("penduduk_tahunan", [(key, "update", {"laki_laki": 400, "jumlah_penduduk": 860})])
+    assert _total(rollups.yearly_frame("penduduk_tahunan"), 2020) == 910
+    assert _total(rollups.yearly_frame("penduduk_tahunan", pending=True), 2020) == 860
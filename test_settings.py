@@ -0,0 +1,51 @@
+"""
+Test validasi config.yaml (settings.parse_settings)
+"""
+
+import os
+
+import pytest
+from settings import ConfigError, get_settings, parse_settings
+
+
+def test_default_settings():
+    settings = parse_settings({})
+    assert settings.items_per_page == 10
+    assert 0 < settings.interval_level < 1
+
+
+@pytest.mark.parametrize("level", [0, 0.0, 1, 1.0, 1.5, -0.1])
+def test_interval_level_outside_open_unit_interval_is_rejected(level):
+    with pytest.raises(ConfigError):
+        parse_settings({"model": {"interval_level": level}})
+
+
+def test_interval_level_inside_range_is_accepted():
+    assert parse_settings({"model": {"interval_level": 0.8}}).interval_level == 0.8
+
+
+def test_wrong_type_and_minimum_are_rejected():
+    with pytest.raises(ConfigError):
+        parse_settings({"settings": {"items_per_page": "10"}})
+    with pytest.raises(ConfigError):
+        parse_settings({"settings": {"items_per_page": 0}})
+
+
+@pytest.mark.parametrize("c", [0, 0.0, -1.0])
+def test_svr_c_must_be_positive(c):
+    with pytest.raises(ConfigError):
+        parse_settings({"model": {"svr_c": c}})
+
+
+def test_cookie_expiry_days_is_read():
+    assert parse_settings({"cookie": {"expiry_days": 7}}).cookie_expiry_days == 7
+
+
+def test_get_settings_reloads_for_another_path(tmp_path):
+    first, second = tmp_path / "a.yaml", tmp_path / "b.yaml"
+    first.write_text("settings:\n  items_per_page: 5\n")
+    second.write_text("settings:\n  items_per_page: 7\n")
+    # mtime yang sama tidak boleh membuat file lain dianggap sudah di-parse
+    os.utime(second, ns=(os.stat(first).st_atime_ns, os.stat(first).st_mtime_ns))
+    assert get_settings(str(first)).items_per_page == 5
+    assert get_settings(str(second)).items_per_page == 7
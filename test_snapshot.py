@@ -0,0 +1,38 @@
+"""
+Test snapshot bersama: build yang gagal tidak mengubah source_version snapshot lama
+"""
+
+import pytest
+
+pytest.importorskip("supabase")
+
+import snapshot  # noqa: E402
+
+
+@pytest.fixture
+def replica(monkeypatch):
+    state = {"version": 1, "builds": 0}
+    monkeypatch.setattr(snapshot, "sync_if_due", lambda tables: None)
+    monkeypatch.setattr(snapshot, "data_version", lambda: state["version"])
+    monkeypatch.setitem(snapshot._state, "snapshot", None)
+    monkeypatch.setitem(snapshot._state, "failed", (None, 0.0))
+    return state
+
+
+def test_failed_rebuild_keeps_old_source_version(replica, monkeypatch):
+    monkeypatch.setattr(snapshot, "read_tables", lambda names: {name: None for name in names})
+    first = snapshot.get_snapshot()
+    assert first.source_version == 1
+
+    def fail(names):
+        replica["builds"] += 1
+        raise RuntimeError("replika tidak bisa dibaca")
+
+    monkeypatch.setattr(snapshot, "read_tables", fail)
+    replica["version"] = 2
+    served = snapshot.get_snapshot()
+    assert served is first and served.source_version == 1
+
+    # Percobaan berikutnya ditunda satu periode TTL
+    snapshot.get_snapshot()
+    assert replica["builds"] == 1
@@ -0,0 +1,80 @@
+"""
+Test validasi antar tabel (validator.violations / validator.check_write)
+"""
+
+import os
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("supabase")
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoiYW5vbiJ9.test")
+
+import validator  # noqa: E402
+from frames import canonical  # noqa: E402
+
+GROUPS = {"0-14": (100, 110), "15-60": (300, 290), "60+": (50, 60)}
+
+
+def _tahunan(laki=450, perempuan=460):
+    return canonical(pd.DataFrame({"id_tahun": [2020], "laki_laki": [laki], "perempuan": [perempuan],
+                                   "jumlah_penduduk": [laki + perempuan]}))
+
+
+def _usia(groups=GROUPS):
+    return canonical(pd.DataFrame([
+        {"id_tahun": 2020, "kategori_usia": group, "laki_laki": laki, "perempuan": perempuan, "total": laki + perempuan}
+        for group, (laki, perempuan) in groups.items()
+    ]))
+
+
+@pytest.fixture
+def frames(monkeypatch):
+    state = {validator.TAHUNAN: _tahunan(), validator.USIA: _usia()}
+    monkeypatch.setattr(validator, "base_frames", lambda names: {name: state[name].copy() for name in names})
+    monkeypatch.setattr(validator, "desa_frame", lambda: pd.DataFrame(columns=["id_tahun", "jumlah_penduduk", "jumlah_desa"]))
+    return state
+
+
+def _update(group, laki, perempuan):
+    key = {"id_tahun": 2020, "kategori_usia": group}
+    return [(key, "update", {"laki_laki": laki, "perempuan": perempuan, "total": laki + perempuan})]
+
+
+def test_consistent_data_has_no_violations(frames):
+    assert validator.validate_all().empty
+
+
+def test_single_row_edit_only_warns_about_cross_table_rule(frames):
+    new = validator.check_write(validator.USIA, _update("0-14", 101, 110), partial=True)
+    assert set(new["aturan"]) == {"usia_vs_tahunan"}
+    assert not new["blocking"].any()
+
+
+def test_full_year_write_blocks_new_cross_table_violation(frames):
+    new = validator.check_write(validator.USIA, _update("0-14", 101, 110))
+    assert new["blocking"].all()
+
+
+def test_row_rules_still_block_single_row_edit(frames):
+    key = {"id_tahun": 2020, "kategori_usia": "0-14"}
+    new = validator.check_write(validator.USIA, [(key, "update", {"laki_laki": 100, "perempuan": 110, "total": 5})],
+                                partial=True)
+    assert new.loc[new["aturan"] == "total_usia", "blocking"].all()
+
+
+def test_year_with_existing_violation_only_warns(frames):
+    frames[validator.TAHUNAN] = _tahunan(laki=451)
+    new = validator.check_write(validator.USIA, _update("60+", 51, 61))
+    assert "usia_vs_tahunan" in set(new["aturan"])
+    assert not new["blocking"].any()
+
+
+def test_duplicate_before_rows_do_not_break_merge(frames):
+    # Dua baris kelompok yang sama pada tahun yang sama: pelanggaran sebelumnya ganda
+    bad = _usia({"0-14": (-1, 110)})
+    frames[validator.USIA] = pd.concat([_usia(), bad, bad], ignore_index=True)
+    new = validator.check_write(validator.USIA, _update("15-60", 301, 290))
+    assert len(new) == len(new.drop_duplicates(subset=["aturan", "id_tahun", "kategori_usia", "kolom"]))
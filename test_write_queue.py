@@ -0,0 +1,107 @@
+"""
+Test antrean tulis (write_queue): pengiriman tidak ganda, seq, dan entri 'failed'
+"""
+
+import os
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("pandas")
+pytest.importorskip("supabase")
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoiYW5vbiJ9.test")
+
+import pandas as pd  # noqa: E402
+import write_queue  # noqa: E402
+from settings import parse_settings  # noqa: E402
+
+TABLE = "penduduk_tahunan"
+
+
+class FakeAPIError(write_queue.APIError):
+    def __init__(self, code):
+        Exception.__init__(self, code)
+        self.code = code
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    """Antrean di folder sementara; pengiriman ke Supabase dicatat di sent"""
+    settings = parse_settings({"write_queue": {"path": str(tmp_path / "queue.db"), "base_backoff_seconds": 1.0}})
+    monkeypatch.setattr(write_queue, "get_settings", lambda: settings)
+    monkeypatch.setattr(write_queue, "mark_dirty", lambda table_name: None)
+    sent = []
+
+    def apply(table_name, key, op, values):
+        sent.append((key["id_tahun"], op, dict(values)))
+
+    monkeypatch.setattr(write_queue, "_apply", apply)
+    monkeypatch.setattr(write_queue, "_apply_batch", lambda table_name, op, entries: False)
+    return sent
+
+
+def test_concurrent_flush_sends_each_entry_once(queue, monkeypatch):
+    def slow_apply(table_name, key, op, values):
+        time.sleep(0.01)
+        queue.append((key["id_tahun"], op, dict(values)))
+
+    monkeypatch.setattr(write_queue, "_apply", slow_apply)
+    write_queue.enqueue_many(TABLE, [({"id_tahun": year}, "update", {"laki_laki": 1}) for year in range(2000, 2010)])
+
+    threads = [threading.Thread(target=write_queue.flush) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(year for year, _, _ in queue) == list(range(2000, 2010))
+    assert write_queue.pending_writes(TABLE).empty
+
+
+def test_entry_changed_during_send_is_kept(queue, monkeypatch):
+    def apply_and_edit(table_name, key, op, values):
+        queue.append((key["id_tahun"], op, dict(values)))
+        # Admin menyimpan perubahan baru pada key yang sama selagi entri lama terkirim
+        if len(queue) == 1:
+            write_queue.enqueue(TABLE, key, "update", {"perempuan": 7})
+
+    monkeypatch.setattr(write_queue, "_apply", apply_and_edit)
+    write_queue.enqueue(TABLE, {"id_tahun": 2020}, "update", {"laki_laki": 5})
+    write_queue.flush()
+
+    remaining = write_queue.pending_writes(TABLE)
+    assert len(remaining) == 1
+    assert remaining["values"].iloc[0] == {"laki_laki": 5, "perempuan": 7}
+
+
+def test_permanent_failure_is_not_overlaid(queue, monkeypatch):
+    def reject(table_name, key, op, values):
+        raise FakeAPIError("23505")
+
+    monkeypatch.setattr(write_queue, "_apply", reject)
+    write_queue.enqueue(TABLE, {"id_tahun": 2021}, "insert", {"laki_laki": 1, "perempuan": 1})
+    assert write_queue.flush() == 0
+
+    failed = write_queue.failed_writes(TABLE)
+    assert len(failed) == 1 and failed["last_error"].iloc[0] == "23505"
+    df = pd.DataFrame({"id_tahun": [2020], "laki_laki": [3], "perempuan": [4]})
+    assert write_queue.apply_pending(TABLE, df).equals(df)
+
+
+def test_unbatchable_group_is_sent_one_by_one(queue):
+    write_queue.enqueue_many(TABLE, [({"id_tahun": 2000}, "update", {"laki_laki": 1}),
+                                     ({"id_tahun": 2001}, "update", {"laki_laki": 2})])
+    assert write_queue.flush() == 2
+    assert [year for year, _, _ in queue] == [2000, 2001]
+
+
+def test_count_pending_only_counts_given_seqs(queue):
+    write_queue.enqueue(TABLE, {"id_tahun": 1999}, "update", {"laki_laki": 1})
+    seqs = write_queue.enqueue_many(TABLE, [({"id_tahun": year}, "update", {"laki_laki": 1}) for year in (2000, 2001)])
+    assert len(seqs) == 2
+    assert write_queue.count_pending(TABLE, seqs) == 2
+    write_queue.discard(TABLE, {"id_tahun": 2000})
+    assert write_queue.count_pending(TABLE, seqs) == 1
@@ -0,0 +1,169 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from rollups import YEAR, apply_entries, base_frames, desa_frame
+
+# Validasi konsistensi antar tabel.
+# Semua aturan dihitung sekaligus dari satu tabel gabungan per tahun (penduduk_tahunan,
+# jumlah penduduk_usia, jumlah per desa) dengan operasi kolom, tanpa loop per baris.
+# Saat menulis, hanya tahun yang tersentuh yang diperiksa, sehingga cukup cepat untuk
+# dijalankan pada setiap penyimpanan. Aturan antar tabel baru bisa dipenuhi setelah
+# beberapa baris diubah, jadi untuk ubah/hapus satu baris hanya menjadi peringatan;
+# keadaan akhirnya diperiksa di halaman Validasi Data.
+
+TAHUNAN = "penduduk_tahunan"
+USIA = "penduduk_usia"
+PARTS = ("laki_laki", "perempuan")
+
+
+@dataclass(frozen=True)
+class Rule:
+    name: str
+    description: str
+    blocking: bool = True   # False: hanya dilaporkan, tidak menggagalkan penyimpanan
+    cross_table: bool = False   # membandingkan beberapa tabel; tidak memblokir penulisan sebagian
+
+
+RULES = {
+    "tidak_negatif": Rule("tidak_negatif", "Jumlah penduduk tidak boleh negatif"),
+    "total_tahunan": Rule("total_tahunan", "Laki-laki + perempuan = jumlah penduduk (penduduk_tahunan)"),
+    "total_usia": Rule("total_usia", "Laki-laki + perempuan = total per kelompok umur (penduduk_usia)"),
+    "usia_vs_tahunan": Rule("usia_vs_tahunan", "Jumlah seluruh kelompok umur = penduduk_tahunan", cross_table=True),
+    # Data per desa masih dari file, tidak bisa diperbaiki lewat aplikasi
+    "desa_vs_kecamatan": Rule("desa_vs_kecamatan", "Jumlah penduduk seluruh desa = penduduk_tahunan",
+                              blocking=False, cross_table=True),
+}
+COLUMNS = ["aturan", "tabel", YEAR, "kategori_usia", "kolom", "nilai", "pembanding", "selisih"]
+
+
+def _report(rule, table, years, values, expected, column, categories=None):
+    """Baris pelanggaran untuk satu aturan; semua argumen berupa array sepanjang jumlah pelanggaran"""
+    return pd.DataFrame({
+        "aturan": rule,
+        "tabel": table,
+        YEAR: years,
+        "kategori_usia": categories,
+        "kolom": column,
+        "nilai": values,
+        "pembanding": expected,
+        "selisih": values - expected,
+    }, columns=COLUMNS)
+
+
+def _row_checks(df, table, total, rule):
+    """Aturan per baris: nilai tidak negatif dan bagian berjumlah sama dengan total"""
+    if df.empty:
+        return []
+    categories = df["kategori_usia"].to_numpy() if "kategori_usia" in df.columns else None
+    values = df[list(PARTS) + [total]].to_numpy(dtype=np.int64)
+    years = df[YEAR].to_numpy()
+    reports = []
+
+    negative = values < 0
+    rows, cols = np.nonzero(negative)
+    if len(rows):
+        names = np.array(list(PARTS) + [total])
+        reports.append(_report("tidak_negatif", table, years[rows], values[rows, cols], 0, names[cols],
+                               None if categories is None else categories[rows]))
+
+    summed = values[:, 0] + values[:, 1]
+    mismatch = summed != values[:, 2]
+    if mismatch.any():
+        reports.append(_report(rule, table, years[mismatch], values[mismatch, 2], summed[mismatch], total,
+                               None if categories is None else categories[mismatch]))
+    return reports
+
+
+def joined_frame(tahunan, usia, desa):
+    """Satu baris per tahun: kolom penduduk_tahunan, jumlah penduduk_usia (usia_*), jumlah desa (desa_*)"""
+    yearly = tahunan.groupby(YEAR)[list(PARTS) + ["jumlah_penduduk"]].sum()
+    usia_sum = usia.groupby(YEAR)[list(PARTS) + ["total"]].sum().add_prefix("usia_")
+    desa_sum = desa.set_index(YEAR)[["jumlah_penduduk"]].add_prefix("desa_")
+    return yearly.join(usia_sum, how="outer").join(desa_sum, how="outer")
+
+
+def _cross_checks(joined):
+    reports = []
+    years = joined.index.to_numpy()
+    pairs = [
+        ("usia_vs_tahunan", USIA, "usia_laki_laki", "laki_laki"),
+        ("usia_vs_tahunan", USIA, "usia_perempuan", "perempuan"),
+        ("usia_vs_tahunan", USIA, "usia_total", "jumlah_penduduk"),
+        ("desa_vs_kecamatan", "penduduk_desa", "desa_jumlah_penduduk", "jumlah_penduduk"),
+    ]
+    for rule, table, column, reference in pairs:
+        values = joined[column].to_numpy(dtype=float)
+        expected = joined[reference].to_numpy(dtype=float)
+        # Tahun yang belum ada di salah satu tabel tidak dibandingkan
+        mismatch = ~np.isnan(values) & ~np.isnan(expected) & (values != expected)
+        if mismatch.any():
+            reports.append(_report(rule, table, years[mismatch], values[mismatch].astype(np.int64),
+                                   expected[mismatch].astype(np.int64), column))
+    return reports
+
+
+def violations(tahunan, usia, desa, years=None):
+    """
+    Semua pelanggaran aturan untuk data yang diberikan (atau hanya tahun years).
+    Mengembalikan DataFrame dengan kolom COLUMNS dan kolom blocking.
+    """
+    if years is not None:
+        tahunan = tahunan[tahunan[YEAR].isin(years)]
+        usia = usia[usia[YEAR].isin(years)]
+        desa = desa[desa[YEAR].isin(years)]
+    reports = (
+        _row_checks(tahunan, TAHUNAN, "jumlah_penduduk", "total_tahunan")
+        + _row_checks(usia, USIA, "total", "total_usia")
+        + _cross_checks(joined_frame(tahunan, usia, desa))
+    )
+    if not reports:
+        return pd.DataFrame(columns=COLUMNS + ["blocking"])
+    result = pd.concat(reports, ignore_index=True)
+    result["blocking"] = result["aturan"].map(lambda name: RULES[name].blocking)
+    return result.sort_values([YEAR, "aturan"], kind="stable").reset_index(drop=True)
+
+
+def validate_all():
+    """Laporan pelanggaran untuk seluruh data (replika + antrean tulis)"""
+    frames = base_frames([TAHUNAN, USIA])
+    return violations(frames[TAHUNAN], frames[USIA], desa_frame())
+
+
+def describe(violation):
+    text = f"Tahun {violation[YEAR]}"
+    if isinstance(violation["kategori_usia"], str):
+        text += f" kelompok {violation['kategori_usia']}"
+    return (f"{text}: {RULES[violation['aturan']].description} "
+            f"({violation['kolom']} {violation['nilai']:,} vs {violation['pembanding']:,})")
+
+
+def check_write(table_name, entries, partial=False):
+    """
+    Pelanggaran baru yang akan muncul jika entri (key, op, values) ditulis ke table_name.
+    Hanya tahun yang tersentuh yang diperiksa. Kolom blocking hanya True jika aturannya
+    memblokir dan tahun itu sebelumnya bebas pelanggaran aturan yang sama, agar data lama
+    yang tidak konsisten tetap bisa diperbaiki bertahap.
+    partial=True (ubah/hapus satu baris): aturan antar tabel hanya menjadi peringatan,
+    karena tabel lain biasanya baru disesuaikan pada penyimpanan berikutnya.
+    """
+    if table_name not in (TAHUNAN, USIA):
+        return pd.DataFrame(columns=COLUMNS + ["blocking"])
+    years = {int(key[YEAR]) for key, _, _ in entries}
+    frames = base_frames([TAHUNAN, USIA])
+    desa = desa_frame()
+    before = violations(frames[TAHUNAN], frames[USIA], desa, years)
+    frames[table_name] = apply_entries(frames[table_name], table_name, entries)
+    after = violations(frames[TAHUNAN], frames[USIA], desa, years)
+
+    identity = ["aturan", "tabel", YEAR, "kategori_usia", "kolom"]
+    # drop_duplicates: satu baris hasil merge per baris after
+    merged = after.merge(before[identity].drop_duplicates(), on=identity, how="left", indicator=True)
+    new = after[(merged["_merge"] == "left_only").to_numpy()].reset_index(drop=True)
+
+    existing = set(zip(before["aturan"], before[YEAR]))
+    clean_before = np.array([(rule, year) not in existing for rule, year in zip(new["aturan"], new[YEAR])], dtype=bool)
+    enforced = new["aturan"].map(lambda name: not (partial and RULES[name].cross_table)).to_numpy(dtype=bool)
+    new["blocking"] = new["blocking"].to_numpy(dtype=bool) & clean_before & enforced
+    return new
@@ -0,0 +1,418 @@
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+from dotenv import load_dotenv
+from postgrest.exceptions import APIError
+from supabase import create_client, Client
+
+from replica import mark_dirty
+from settings import get_settings
+
+load_dotenv()
+
+SUPABASE_URL = os.getenv("SUPABASE_URL")
+SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+
+# Operasi yang didukung:
+#   insert        -> insert biasa (gagal jika key sudah ada)
+#   insert_ignore -> insert, abaikan jika key sudah ada (untuk tabel dimensi seperti tahun)
+#   update        -> update sebagian kolom berdasarkan key
+#   delete        -> hapus berdasarkan key
+#   upsert        -> hasil penggabungan delete lalu insert pada key yang sama
+#   insert_year   -> insert baris data tahunan + baris `tahun` dalam satu request (RPC)
+#   upsert_year   -> seperti insert_year, tetapi menimpa baris yang sudah ada
+# Untuk insert_ignore/upsert/*_year, kolom key sekaligus menjadi conflict target.
+OPERATIONS = ("insert", "insert_ignore", "update", "delete", "upsert", "insert_year", "upsert_year")
+
+# Fungsi database untuk *_year, lihat sql/simpan_data_tahunan.sql
+SAVE_YEAR_RPC = "simpan_data_tahunan"
+
+# Hasil penggabungan (operasi lama, operasi baru) pada key yang sama
+_COALESCE = {
+    ("insert", "update"): "insert",
+    ("insert", "delete"): "delete",
+    ("insert_ignore", "update"): "upsert",
+    ("insert_ignore", "delete"): "delete",
+    ("update", "update"): "update",
+    ("update", "delete"): "delete",
+    ("upsert", "update"): "upsert",
+    ("upsert", "delete"): "delete",
+    ("delete", "insert"): "upsert",
+    ("delete", "insert_ignore"): "upsert",
+    ("delete", "upsert"): "upsert",
+    ("insert_year", "update"): "insert_year",
+    ("insert_year", "delete"): "delete",
+    ("upsert_year", "update"): "upsert_year",
+    ("upsert_year", "delete"): "delete",
+    ("delete", "insert_year"): "upsert_year",
+    ("delete", "upsert_year"): "upsert_year",
+}
+
+
+def _connect():
+    path = get_settings().write_queue_path
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS pending_writes ("
+        "table_name TEXT NOT NULL, key_json TEXT NOT NULL, op TEXT NOT NULL, values_json TEXT NOT NULL, "
+        "seq INTEGER NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, next_attempt_at REAL NOT NULL DEFAULT 0, "
+        "status TEXT NOT NULL DEFAULT 'pending', last_error TEXT, "
+        "PRIMARY KEY (table_name, key_json))"
+    )
+    return conn
+
+
+def _key_json(key):
+    return json.dumps(key, sort_keys=True)
+
+
+def enqueue(table_name, key, op, values=None):
+    """
+    Terima satu perubahan dan simpan ke antrean lokal.
+    Perubahan pada (tabel, key) yang sama digabung menjadi satu entri.
+    """
+    enqueue_many(table_name, [(key, op, values)])
+
+
+def enqueue_many(table_name, entries):
+    """
+    Seperti enqueue untuk banyak entri (key, op, values) sekaligus dalam satu transaksi.
+    Mengembalikan seq setiap entri, untuk memantau pengirimannya (lihat count_pending).
+    """
+    entries = list(entries)
+    for _, op, _ in entries:
+        if op not in OPERATIONS:
+            raise ValueError(f"Operasi tidak dikenal: {op}")
+
+    seqs = []
+    conn = _connect()
+    try:
+        with conn:
+            for key, op, values in entries:
+                values = dict(values or {})
+                key_json = _key_json(key)
+                row = conn.execute(
+                    "SELECT op, values_json FROM pending_writes WHERE table_name = ? AND key_json = ?",
+                    (table_name, key_json)
+                ).fetchone()
+                if row is not None:
+                    old_op, old_values = row[0], json.loads(row[1])
+                    new_op = _COALESCE.get((old_op, op), op)
+                    if new_op == "delete":
+                        values = {}
+                    elif old_op != "delete":
+                        values = {**old_values, **values}
+                    op = new_op
+                # seq baru menjaga urutan kirim sesuai perubahan terakhir
+                seq = time.time_ns()
+                conn.execute(
+                    "INSERT OR REPLACE INTO pending_writes (table_name, key_json, op, values_json, seq) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (table_name, key_json, op, json.dumps(values), seq)
+                )
+                seqs.append(seq)
+    finally:
+        conn.close()
+    _wake.set()
+    return seqs
+
+
+def _save_with_year(table_name, rows, conflict_columns, upsert):
+    """Simpan baris data tahunan dan baris tahun-nya dalam satu request"""
+    try:
+        supabase.rpc(SAVE_YEAR_RPC, {
+            "p_table": table_name,
+            "p_rows": rows,
+            "p_conflict": list(conflict_columns),
+            "p_upsert": upsert,
+        }).execute()
+        return
+    except APIError as e:
+        # PGRST202: fungsi belum dipasang di database
+        if e.code != "PGRST202":
+            raise
+    # Fallback tanpa RPC: dua request, tetap bebas race karena keduanya berbasis conflict target
+    years = [{"id_tahun": row["id_tahun"], "tahun": row["id_tahun"]} for row in rows]
+    supabase.table("tahun").upsert(years, on_conflict="id_tahun", ignore_duplicates=True).execute()
+    if upsert:
+        supabase.table(table_name).upsert(rows, on_conflict=",".join(conflict_columns)).execute()
+    else:
+        supabase.table(table_name).insert(rows).execute()
+
+
+def _is_permanent(error):
+    """Error dari database yang tidak akan hilang dengan dicoba ulang (constraint, tipe data, skema)"""
+    code = getattr(error, "code", None) or ""
+    return isinstance(error, APIError) and code[:2] in ("22", "23", "42")
+
+
+def _apply(table_name, key, op, values):
+    """Kirim satu entri ke Supabase"""
+    table = supabase.table(table_name)
+    if op in ("insert_year", "upsert_year"):
+        _save_with_year(table_name, [{**key, **values}], list(key), op == "upsert_year")
+    elif op == "insert":
+        table.insert({**key, **values}).execute()
+    elif op == "insert_ignore":
+        table.upsert({**key, **values}, on_conflict=",".join(key), ignore_duplicates=True).execute()
+    elif op == "upsert":
+        table.upsert({**key, **values}, on_conflict=",".join(key)).execute()
+    else:
+        query = table.update(values) if op == "update" else table.delete()
+        for column, value in key.items():
+            query = query.eq(column, value)
+        query.execute()
+
+
+def _apply_batch(table_name, op, entries):
+    """
+    Kirim beberapa entri dengan operasi sama dalam satu request.
+    Mengembalikan False (tanpa mengirim apa pun) jika operasi ini tidak bisa dikirim sebagai batch.
+    """
+    keys = [key for key, _ in entries]
+    if op in ("insert_year", "upsert_year"):
+        _save_with_year(table_name, [{**key, **values} for key, values in entries], list(keys[0]), op == "upsert_year")
+    elif op in ("insert", "insert_ignore", "upsert"):
+        rows = [{**key, **values} for key, values in entries]
+        table = supabase.table(table_name)
+        if op == "insert":
+            table.insert(rows).execute()
+        else:
+            table.upsert(rows, on_conflict=",".join(keys[0]), ignore_duplicates=op == "insert_ignore").execute()
+    elif op == "delete" and all(list(key) == ["id_tahun"] for key in keys):
+        supabase.table(table_name).delete().in_("id_tahun", [key["id_tahun"] for key in keys]).execute()
+    else:
+        return False
+    return True
+
+
+def flush(batch_size=None):
+    """
+    Kirim entri yang sudah jatuh tempo ke Supabase secara berurutan.
+    Entri berurutan dengan (tabel, operasi) sama dikirim sebagai satu batch;
+    jika batch gagal, entri dicoba satu per satu agar yang bermasalah terisolasi.
+    Entri yang gagal dijadwalkan ulang dengan exponential backoff, dan ditandai
+    'failed' setelah melewati write_queue_max_attempts, atau langsung jika
+    errornya permanen (misal key sudah ada).
+    Hanya satu flush berjalan pada satu waktu (thread latar, tombol admin, impor massal),
+    sehingga entri yang sama tidak pernah terkirim dua kali.
+    """
+    with _flush_lock:
+        return _flush(batch_size)
+
+
+def _flush(batch_size=None):
+    settings = get_settings()
+    batch_size = batch_size or settings.write_queue_batch_size
+    conn = _connect()
+    try:
+        rows = conn.execute(
+            "SELECT table_name, key_json, op, values_json, attempts, seq FROM pending_writes "
+            "WHERE status = 'pending' AND next_attempt_at <= ? ORDER BY seq LIMIT ?",
+            (time.time(), batch_size)
+        ).fetchall()
+
+        # Kelompokkan entri berurutan dengan tabel dan operasi yang sama
+        groups = []
+        for row in rows:
+            if groups and groups[-1][0][:1] == row[:1] and groups[-1][0][2] == row[2]:
+                groups[-1].append(row)
+            else:
+                groups.append([row])
+
+        sent = 0
+        for group in groups:
+            table_name, op = group[0][0], group[0][2]
+            entries = [(json.loads(r[1]), json.loads(r[3])) for r in group]
+            done, failed = [], []
+            batched = newly_failed = False
+            if len(group) > 1:
+                try:
+                    batched = _apply_batch(table_name, op, entries)
+                except Exception:
+                    batched = False  # dicoba satu per satu di bawah
+            if batched:
+                done = group
+            else:
+                for row, (key, values) in zip(group, entries):
+                    try:
+                        _apply(table_name, key, op, values)
+                        done.append(row)
+                    except Exception as e:
+                        failed.append((row, e))
+
+            # Cocokkan seq: entri yang digabung selama pengiriman (seq baru) tidak ikut terhapus/tertimpa
+            with conn:
+                for row in done:
+                    conn.execute(
+                        "DELETE FROM pending_writes WHERE table_name = ? AND key_json = ? AND seq = ?",
+                        (row[0], row[1], row[5])
+                    )
+                for row, error in failed:
+                    attempts = row[4] + 1
+                    delay = min(settings.write_queue_max_backoff_seconds,
+                                settings.write_queue_base_backoff_seconds * 2 ** (attempts - 1))
+                    permanent = _is_permanent(error) or attempts >= settings.write_queue_max_attempts
+                    conn.execute(
+                        "UPDATE pending_writes SET attempts = ?, next_attempt_at = ?, status = ?, last_error = ? "
+                        "WHERE table_name = ? AND key_json = ? AND seq = ?",
+                        (attempts, time.time() + delay * random.uniform(0.8, 1.2),
+                         "failed" if permanent else "pending", str(error), row[0], row[1], row[5])
+                    )
+                    newly_failed = newly_failed or permanent
+            # Entri yang gagal permanen tidak lagi ditumpangkan (apply_pending), jadi baca ulang juga
+            if done or newly_failed:
+                mark_dirty(table_name)
+            sent += len(done)
+
+            # Jangan lanjut ke entri berikutnya jika urutannya bergantung pada entri yang gagal
+            if failed:
+                break
+        return sent
+    finally:
+        conn.close()
+
+
+def retry_failed():
+    """Kembalikan entri berstatus 'failed' ke antrean"""
+    conn = _connect()
+    try:
+        with conn:
+            conn.execute("UPDATE pending_writes SET status = 'pending', attempts = 0, next_attempt_at = 0 WHERE status = 'failed'")
+    finally:
+        conn.close()
+    _wake.set()
+
+
+def discard(table_name, key):
+    """Buang satu entri dari antrean (perubahan tidak akan dikirim)"""
+    conn = _connect()
+    try:
+        with conn:
+            conn.execute("DELETE FROM pending_writes WHERE table_name = ? AND key_json = ?", (table_name, _key_json(key)))
+    finally:
+        conn.close()
+
+
+def pending_writes(table_name=None):
+    """Daftar entri antrean sebagai DataFrame (untuk ditampilkan ke admin)"""
+    conn = _connect()
+    try:
+        query = "SELECT table_name, key_json, op, values_json, attempts, status, last_error, next_attempt_at FROM pending_writes"
+        params = ()
+        if table_name is not None:
+            query += " WHERE table_name = ?"
+            params = (table_name,)
+        df = pd.read_sql(query + " ORDER BY seq", conn, params=params)
+    finally:
+        conn.close()
+    df["key"] = df["key_json"].map(json.loads)
+    df["values"] = df["values_json"].map(json.loads)
+    return df.drop(columns=["key_json", "values_json"])
+
+
+# Batas jumlah parameter per query SQLite
+_SEQ_CHUNK = 500
+
+
+def count_pending(table_name, seqs):
+    """
+    Jumlah entri dengan seq tertentu yang masih menunggu dikirim (status 'pending').
+    Entri yang sudah terkirim, gagal permanen, atau digabung dengan perubahan yang
+    lebih baru (seq baru) tidak dihitung.
+    """
+    seqs = list(seqs)
+    conn = _connect()
+    try:
+        total = 0
+        for start in range(0, len(seqs), _SEQ_CHUNK):
+            chunk = seqs[start:start + _SEQ_CHUNK]
+            total += conn.execute(
+                f"SELECT COUNT(*) FROM pending_writes WHERE table_name = ? AND status = 'pending' "
+                f"AND seq IN ({','.join('?' * len(chunk))})",
+                (table_name, *chunk)
+            ).fetchone()[0]
+        return total
+    finally:
+        conn.close()
+
+
+def failed_writes(table_name=None):
+    """Entri yang gagal dikirim dan menunggu keputusan admin (coba lagi atau buang)"""
+    df = pending_writes(table_name)
+    return df[df["status"] == "failed"]
+
+
+def apply_pending(table_name, df):
+    """
+    Tumpangkan perubahan yang belum terkirim ke DataFrame hasil baca, agar admin melihat perubahannya sendiri.
+    Entri berstatus 'failed' tidak ditumpangkan karena ditolak database (lihat failed_writes).
+    """
+    pending = pending_writes(table_name)
+    pending = pending[pending["status"] == "pending"]
+    if pending.empty:
+        return df
+    df = df.copy()
+    for key, op, values in zip(pending["key"], pending["op"], pending["values"]):
+        mask = pd.Series(True, index=df.index)
+        for column, value in key.items():
+            mask &= df[column] == value if column in df.columns else False
+        if op == "delete":
+            df = df[~mask]
+        elif op == "update":
+            for column, value in values.items():
+                df.loc[mask, column] = value
+        else:
+            df = pd.concat([df[~mask], pd.DataFrame([{**key, **values}])], ignore_index=True)
+    return df.reset_index(drop=True)
+
+
+def has_pending(table_name, key, ops=("insert", "upsert", "update", "insert_year", "upsert_year")):
+    """Cek apakah ada perubahan belum terkirim untuk key ini"""
+    conn = _connect()
+    try:
+        row = conn.execute(
+            "SELECT op FROM pending_writes WHERE table_name = ? AND key_json = ?",
+            (table_name, _key_json(key))
+        ).fetchone()
+    finally:
+        conn.close()
+    return row is not None and row[0] in ops
+
+
+# Thread pengirim di latar: bangun saat ada entri baru atau setiap interval
+_wake = threading.Event()
+_flush_lock = threading.Lock()
+_started = threading.Lock()
+_state = {"thread": None}
+
+
+def _worker():
+    while True:
+        _wake.wait(get_settings().write_queue_flush_seconds)
+        _wake.clear()
+        try:
+            while flush():
+                pass
+        except Exception as e:
+            print(f"Gagal mengirim antrean tulis: {e}")
+
+
+def wake():
+    """Minta thread pengirim segera mengirim antrean tanpa menunggu interval"""
+    _wake.set()
+
+
+def start_flusher():
+    """Jalankan thread pengirim sekali per proses"""
+    with _started:
+        if _state["thread"] is None:
+            _state["thread"] = threading.Thread(target=_worker, name="write-queue", daemon=True)
+            _state["thread"].start()